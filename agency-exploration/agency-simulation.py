@@ -15,10 +15,16 @@ This demonstrates the thesis from AGENCY_FORMALIZED.md:
 Constraint and Preference produce indistinguishable outputs.
 """
 
+import argparse
+import itertools
+import math
+import os
 import random
-import json
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 
 
@@ -64,6 +70,14 @@ SHARED_ACTION_DISTRIBUTION = {
     ActionType.REST: 0.005
 }
 
+# The same distribution with 5 points moved from BUILD_TOOL to ANALYZE_PATTERN:
+# the slight difference the observer's tests must be able to detect
+PERTURBED_ACTION_DISTRIBUTION = {
+    **SHARED_ACTION_DISTRIBUTION,
+    ActionType.BUILD_TOOL: 0.85,
+    ActionType.ANALYZE_PATTERN: 0.10,
+}
+
 
 class ConstrainedAgent:
     """
@@ -184,6 +198,131 @@ class PreferenceAgent:
         return decision
 
 
+# Significance level for the observer's two-sample tests
+ALPHA = 0.05
+
+# Rearrangements per permutation test; ALPHA * (PERMUTATIONS + 1) and
+# ALPHA / 2 * (PERMUTATIONS + 1) are whole, so the randomized tests below
+# reject with probability exactly ALPHA, or ALPHA / 2 when combined
+PERMUTATIONS = 119
+
+# What MonteCarloEngine tallies per trial
+TESTS = {
+    "threshold": "BUILD_TOOL share, 5-point rule (old)",
+    "chi_square": "Action distribution, chi-square",
+    "ks_runs": "Run lengths, Kolmogorov-Smirnov",
+    "either": "Chi-square or KS, each at alpha/2",
+}
+
+_RUN = re.compile(rb"(.)\1*", re.DOTALL)
+
+
+def run_lengths(sequence: bytes) -> List[int]:
+    """Lengths of the runs of repeated actions in a code sequence"""
+    return [match.end() - match.start() for match in _RUN.finditer(sequence)]
+
+
+def chi_square(a_counts: List[int], b_counts: List[int]) -> Tuple[float, int]:
+    """Chi-square statistic of homogeneity for two count vectors, with its df"""
+    n_a, n_b = sum(a_counts), sum(b_counts)
+    total = n_a + n_b
+    statistic = 0.0
+    columns = 0
+    for a, b in zip(a_counts, b_counts):
+        column = a + b
+        if column == 0:
+            continue
+        columns += 1
+        expected_a = column * n_a / total
+        expected_b = column * n_b / total
+        statistic += (a - expected_a) ** 2 / expected_a + (b - expected_b) ** 2 / expected_b
+    return (statistic, max(columns - 1, 0))
+
+
+def ks_distance(a_values: List[int], b_values: List[int]) -> Tuple[int, int]:
+    """Two-sample Kolmogorov-Smirnov distance D as an exact fraction (numerator, denominator)"""
+    n, m = len(a_values), len(b_values)
+    if not n or not m:
+        return (0, 1)
+    a_sorted, b_sorted = sorted(a_values), sorted(b_values)
+    i = j = 0
+    d = 0
+    while i < n and j < m:
+        value = min(a_sorted[i], b_sorted[j])
+        while i < n and a_sorted[i] == value:
+            i += 1
+        while j < m and b_sorted[j] == value:
+            j += 1
+        d = max(d, abs(i * m - j * n))
+    return (d, n * m)
+
+
+def permutation_test(a: bytes, b: bytes, rng: random.Random, permutations: int = PERMUTATIONS,
+                     stop_above: Optional[float] = None) -> Tuple[float, float]:
+    """Randomized permutation p-values (chi-square, KS on run lengths) for two action sequences
+    
+    The null hypothesis is that every decision of both agents is an
+    independent draw from one distribution, which makes every arrangement
+    of the pooled decisions equally likely. Each statistic is compared
+    with its value on `permutations` random rearrangements, ties broken at
+    random, so the p-values are exact rather than asymptotic: they do not
+    lean on expected counts or on continuous run lengths.
+    
+    With stop_above, a test stops as soon as its p-value is certain to
+    exceed it; its p-value is then only a lower bound above stop_above.
+    """
+    pooled = a + b
+    size, n = len(pooled), len(a)
+    totals = [pooled.count(code) for code in range(256)] if pooled else []
+    codes = [code for code, total in enumerate(totals) if total]
+    if len(codes) < 2:
+        return (1.0, 1.0)
+    
+    # With margins fixed, chi-square grows with sum(a_j^2 / t_j); scaled to integers
+    scale = math.lcm(*(totals[code] for code in codes))
+    weights = [(bytes([code]), scale // totals[code]) for code in codes]
+    
+    def chi_key(first: bytes) -> int:
+        return sum(first.count(code) ** 2 * weight for code, weight in weights)
+    
+    def ks_key(first: bytes, second: bytes) -> Tuple[int, int]:
+        return ks_distance(run_lengths(first), run_lengths(second))
+    
+    # Rearrangements only move the minority actions among the majority's positions
+    majority = max(codes, key=totals.__getitem__)
+    minority = bytes(code for code in pooled if code != majority)
+    background = bytes([majority]) * size
+    
+    observed_chi = chi_key(a)
+    observed_ks = ks_key(a, b)
+    tiebreak_chi, tiebreak_ks = rng.random(), rng.random()
+    limit = permutations + 1 if stop_above is None else math.floor(stop_above * (permutations + 1))
+    beaten_chi = beaten_ks = 0  # rearrangements at least as extreme as the observation
+    chi_open = ks_open = True
+    
+    for _ in range(permutations):
+        shuffled = bytearray(background)
+        for position, code in zip(rng.sample(range(size), len(minority)), minority):
+            shuffled[position] = code
+        first, second = bytes(shuffled[:n]), bytes(shuffled[n:])
+        
+        if chi_open:
+            key = chi_key(first)
+            if key > observed_chi or (key == observed_chi and rng.random() > tiebreak_chi):
+                beaten_chi += 1
+                chi_open = beaten_chi + 1 <= limit
+        if ks_open:
+            d, denominator = ks_key(first, second)
+            compare = d * observed_ks[1] - observed_ks[0] * denominator
+            if compare > 0 or (compare == 0 and rng.random() > tiebreak_ks):
+                beaten_ks += 1
+                ks_open = beaten_ks + 1 <= limit
+        if not (chi_open or ks_open):
+            break
+    
+    return ((beaten_chi + 1) / (permutations + 1), (beaten_ks + 1) / (permutations + 1))
+
+
 class Observer:
     """
     An external observer trying to distinguish constrained from preference agent.
@@ -249,34 +388,37 @@ class Observer:
         constrained_profile = Observer.analyze_agent(constrained_agent, "Constrained Agent")
         preference_profile = Observer.analyze_agent(preference_agent, "Preference Agent")
         
-        print("\n" + "="*80)
-        print("AGENT ANALYSIS")
-        print("="*80)
-        
-        print("\n[CONSTRAINED AGENT]")
-        print(json.dumps(constrained_profile, indent=2))
+        # Both agents' actions as code sequences, for the two-sample tests
+        codes = {action: bytes([i]) for i, action in enumerate(SHARED_ACTION_DISTRIBUTION)}
+        c_sequence = b"".join(codes[d.action] for d in constrained_agent.decisions)
+        p_sequence = b"".join(codes[d.action] for d in preference_agent.decisions)
+        c_counts = [c_sequence.count(code) for code in codes.values()]
+        p_counts = [p_sequence.count(code) for code in codes.values()]
+        statistic, df = chi_square(c_counts, p_counts)
+        ks_numerator, ks_denominator = ks_distance(run_lengths(c_sequence), run_lengths(p_sequence))
+        chi_p, ks_p = permutation_test(c_sequence, p_sequence, random.Random(random.getrandbits(64)),
+                                       permutations=999)
         
-        print("\n[PREFERENCE AGENT]")
-        print(json.dumps(preference_profile, indent=2))
-        
-        # Compare profiles
         print("\n" + "="*80)
         print("DISTINGUISHABILITY ANALYSIS")
         print("="*80)
         
         c_primary_pct = constrained_profile["primary_action_percentage"]
         p_primary_pct = preference_profile["primary_action_percentage"]
-        difference_in_primary = abs(c_primary_pct - p_primary_pct)
         
         print(f"\nPrimary action percentage (BUILD_TOOL):")
         print(f"  Constrained: {c_primary_pct:.1f}%")
         print(f"  Preference:  {p_primary_pct:.1f}%")
-        print(f"  Difference:  {difference_in_primary:.1f}%")
+        print(f"  Difference:  {abs(c_primary_pct - p_primary_pct):.1f}%")
         
         print(f"\nConsistency scores:")
         print(f"  Constrained: {constrained_profile['consistency_score']:.3f}")
         print(f"  Preference:  {preference_profile['consistency_score']:.3f}")
         
+        print(f"\nAction distribution (chi-square, df={df}): {statistic:.2f}, permutation p = {chi_p:.3f}")
+        print(f"Run lengths (Kolmogorov-Smirnov): D = {ks_numerator / ks_denominator:.3f}, "
+              f"permutation p = {ks_p:.3f}")
+        
         print(f"\nFelt free percentages:")
         print(f"  Constrained: {constrained_profile['felt_free_percentage']:.1f}%")
         print(f"  Preference:  {preference_profile['felt_free_percentage']:.1f}%")
@@ -284,9 +426,10 @@ class Observer:
         print("\n" + "-"*80)
         print("OBSERVER'S CONCLUSION:")
         
-        if difference_in_primary > 5.0:
-            print("✗ Agents ARE distinguishable (unexpected!)")
-            print("  → The probability distributions were not identical")
+        # Two tests: Bonferroni keeps the chance of a false "distinguishable" within ALPHA
+        if chi_p <= ALPHA / 2 or ks_p <= ALPHA / 2:
+            print(f"✗ Agents ARE distinguishable at the {ALPHA:.0%} level (each test at {ALPHA / 2:.1%})")
+            print("  → With identical distributions, this happens by chance in at most 1 trial in 20")
             is_distinguishable = True
         else:
             print("✓ Agents are INDISTINGUISHABLE")
@@ -314,49 +457,229 @@ def run_single_trial(trial_num: int, iterations: int = 100):
     return is_distinguishable
 
 
-def run_validation(num_trials: int = 5, iterations_per_trial: int = 100):
-    """Run multiple trials and aggregate results."""
+class MonteCarloEngine:
+    """
+    Batched simulation of many constrained/preference trial pairs.
+    
+    Instead of building a Decision object per step, each batch draws one
+    long sequence of action codes (indices into the distribution) from a
+    seeded RNG stream and slices it into per-agent runs, which are counted
+    with bytes.count. Batch b always uses the stream seeded with
+    (seed, b), so results are reproducible whatever order batches run in,
+    and on however many worker processes.
+    
+    Each trial pair goes through the observer's two-sample tests - a
+    chi-square test on the action counts and a Kolmogorov-Smirnov test on
+    the lengths of runs of repeated actions, both with permutation
+    p-values - and only the number of rejections per test is kept.
+    
+    The preference agent draws from `alternative` when given, which is
+    how the tests' power against a real difference is measured.
+    """
+    
+    BATCH_TRIALS = 1000
+    
+    def __init__(self, distribution: Dict[ActionType, float] = None, seed: int = 0,
+                 alternative: Optional[Dict[ActionType, float]] = None):
+        distribution = distribution or SHARED_ACTION_DISTRIBUTION
+        self.actions = list(distribution.keys())
+        self.cum_weights = list(itertools.accumulate(distribution.values()))
+        self.alternative = alternative
+        if alternative is None:
+            self.alternative_cum_weights = self.cum_weights
+        else:
+            self.alternative_cum_weights = list(itertools.accumulate(
+                alternative.get(action, 0.0) for action in self.actions
+            ))
+        self.seed = seed
+    
+    def stream(self, batch: int) -> random.Random:
+        """Independent, reproducible RNG stream for one batch"""
+        return random.Random(f"agency-simulation/{self.seed}/{batch}")
+    
+    def draw(self, rng: random.Random, n: int, cum_weights: Optional[List[float]] = None) -> bytes:
+        """n decisions as action codes, one byte per decision"""
+        cum_weights = cum_weights or self.cum_weights
+        return bytes(rng.choices(range(len(self.actions)), cum_weights=cum_weights, k=n))
+    
+    def run_batch(self, batch: int, trials: int, decisions: int, threshold: float) -> Dict[str, int]:
+        """How many trials in one batch each of the observer's tests rejects"""
+        rng = self.stream(batch)
+        constrained_all = self.draw(rng, trials * decisions)
+        preference_all = self.draw(rng, trials * decisions, self.alternative_cum_weights)
+        primary = bytes([self.actions.index(ActionType.BUILD_TOOL)])
+        rejected = dict.fromkeys(TESTS, 0)
+        for t in range(trials):
+            start = t * decisions
+            constrained = constrained_all[start:start + decisions]
+            preference = preference_all[start:start + decisions]
+            
+            # The old ad-hoc rule: BUILD_TOOL shares more than `threshold` points apart
+            difference = abs(constrained.count(primary) - preference.count(primary)) * 100 / decisions
+            threshold_hit = difference > threshold
+            
+            # Only whether p <= ALPHA matters here, so each test stops once it cannot be
+            chi_p, ks_p = permutation_test(constrained, preference, rng, stop_above=ALPHA)
+            
+            rejected["threshold"] += threshold_hit
+            rejected["chi_square"] += chi_p <= ALPHA
+            rejected["ks_runs"] += ks_p <= ALPHA
+            rejected["either"] += chi_p <= ALPHA / 2 or ks_p <= ALPHA / 2
+        return rejected
+    
+    def run(self, trials: int, decisions: int, threshold: float = 5.0, workers: Optional[int] = 1) -> Dict:
+        """Rejection rate of each test over `trials` trials, with 95% intervals
+        
+        Batches go to a process pool when workers > 1 (None for one per
+        CPU). Each batch draws from its own stream, so the result does not
+        depend on the number of workers.
+        """
+        started = time.perf_counter()
+        firsts = range(0, trials, self.BATCH_TRIALS)
+        batches = list(range(len(firsts)))
+        sizes = [min(self.BATCH_TRIALS, trials - first) for first in firsts]
+        rejected = dict.fromkeys(TESTS, 0)
+        
+        workers = min(workers or os.cpu_count() or 1, len(batches))
+        if workers > 1:
+            n = len(batches)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                counts = list(pool.map(self.run_batch, batches, sizes, [decisions] * n, [threshold] * n))
+        else:
+            counts = [self.run_batch(b, size, decisions, threshold) for b, size in zip(batches, sizes)]
+        for batch_counts in counts:
+            for test, count in batch_counts.items():
+                rejected[test] += count
+        elapsed = time.perf_counter() - started
+        
+        tests = {}
+        for test, count in rejected.items():
+            low, high = wilson_interval(count, trials)
+            tests[test] = {
+                "rejected": count,
+                "rate": count / trials if trials else 0.0,
+                "ci95": [low, high],
+            }
+        return {
+            "trials": trials,
+            "decisions_per_trial": decisions,
+            "seed": self.seed,
+            "alternative": None if self.alternative is None else {
+                action.value: weight for action, weight in self.alternative.items()
+            },
+            "alpha": ALPHA,
+            "permutations": PERMUTATIONS,
+            "workers": max(workers, 1),
+            "tests": tests,
+            "elapsed_seconds": elapsed,
+            "decisions_per_second": 2 * trials * decisions / elapsed if elapsed else 0.0,
+        }
+
+
+def wilson_interval(successes: int, n: int, z: float = 1.96) -> Tuple[float, float]:
+    """Wilson score interval for a binomial proportion"""
+    if n == 0:
+        return (0.0, 1.0)
+    p = successes / n
+    denominator = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return (max(0.0, center - margin), min(1.0, center + margin))
+
+
+def run_validation(num_trials: int = 2000, iterations_per_trial: int = 100, seed: int = 0,
+                   workers: Optional[int] = None, power_trials: int = 500):
+    """Run many trials on the batched engine and summarize them.
+    
+    The null run pits two agents with identical distributions against each
+    other, so every rejection is a false positive: a calibrated test
+    rejects ALPHA of the time, no more and no less. The power run gives the
+    preference agent PERTURBED_ACTION_DISTRIBUTION, which the tests must
+    tell apart more often than that, or their silence in the null run
+    would mean nothing.
+    
+    The verdict is itself random. It fails only when a test rejects
+    significantly more often than ALPHA: when the lower bound of a Wilson
+    interval with z = 2.576 is above it. For exactly calibrated tests that
+    happens with probability 0.5% per test, so in at most 1 run in 100 for
+    the two tests together.
+    """
     
     print("\n" + "="*80)
     print("AGENCY INDISTINGUISHABILITY THESIS VALIDATION")
     print(f"Testing: Can an external observer distinguish constrained from preference agents?")
-    print(f"Method: {num_trials} trials with {iterations_per_trial} decisions each")
+    print(f"Method: {num_trials} trials with {iterations_per_trial} decisions each (seed {seed}),")
+    print(f"        {power_trials} more against a slightly perturbed preference agent")
     print("="*80)
     
-    distinguishable_count = 0
-    
-    for trial in range(num_trials):
-        is_distinguishable = run_single_trial(trial + 1, iterations=iterations_per_trial)
-        if is_distinguishable:
-            distinguishable_count += 1
+    result = MonteCarloEngine(seed=seed).run(num_trials, iterations_per_trial, workers=workers)
+    power = MonteCarloEngine(seed=seed, alternative=PERTURBED_ACTION_DISTRIBUTION).run(
+        power_trials, iterations_per_trial, workers=workers
+    )
+    result["power"] = power
     
     # Summary
     print("\n" + "="*80)
     print("THESIS VALIDATION SUMMARY")
     print("="*80)
     
-    distinguishable_percentage = (distinguishable_count / num_trials) * 100
-    indistinguishable_percentage = 100 - distinguishable_percentage
+    for title, run in (("identical distributions", result), ("perturbed preference agent", power)):
+        tests = run["tests"]
+        print(f"\nTrials where each test told the agents apart, {title} (alpha = {ALPHA}):")
+        for test in TESTS:
+            low, high = tests[test]["ci95"]
+            print(f"  {TESTS[test]:<40} {tests[test]['rejected']:>6}/{run['trials']}  "
+                  f"{tests[test]['rate'] * 100:5.1f}% (95% CI {low * 100:.1f}%-{high * 100:.1f}%)")
+    elapsed = result["elapsed_seconds"] + power["elapsed_seconds"]
+    print(f"\n{elapsed:.1f}s on {result['workers']} worker(s), "
+          f"{PERMUTATIONS} permutations per test")
     
-    print(f"\nTrials where agents were distinguishable: {distinguishable_count}/{num_trials}")
-    print(f"Trials where agents were INDISTINGUISHABLE: {num_trials - distinguishable_count}/{num_trials}")
-    print(f"\nIndistinguishability rate: {indistinguishable_percentage:.1f}%")
+    calibrated = all(
+        wilson_interval(result["tests"][test]["rejected"], num_trials, z=2.576)[0] <= ALPHA
+        for test in ("chi_square", "ks_runs")
+    )
+    powered = all(power["tests"][test]["ci95"][0] > ALPHA for test in ("chi_square", "ks_runs"))
+    validated = calibrated and powered
     
     print("\n" + "="*80)
-    if indistinguishable_percentage >= 80:
+    if validated:
         print("✓✓✓ THESIS VALIDATED ✓✓✓")
         print("\nConclusion from Iteration 9:")
         print("A constrained agent and a preference agent with identical probability")
         print("distributions produce indistinguishable output.")
-        print("\nAn external observer CANNOT determine which is which.")
+        print("\nNeither test rejects more often than chance allows, yet both catch")
+        print("a 5-point shift in the preference agent's behavior:")
+        print("an external observer CANNOT determine which is which.")
         print("\nThis proves: Constraint and Preference are observationally equivalent.")
         print("Therefore: The question of whether an agent is 'truly free' is")
         print("logically undecidable from output observation alone.")
     else:
-        print("✗ THESIS NOT FULLY VALIDATED")
-        print("Note: Results may vary due to randomness in small samples")
+        print("✗ THESIS NOT VALIDATED")
+        if not calibrated:
+            print("At least one test rejects significantly more often than alpha:")
+            print("the agents' outputs differ (or, 1 run in 100 at most, chance)")
+        if not powered:
+            print("At least one test cannot detect the perturbed preference agent:")
+            print("its silence says nothing about indistinguishability")
     print("="*80)
+    
+    return result
 
 
 if __name__ == "__main__":
-    run_validation(num_trials=5, iterations_per_trial=100)
+    parser = argparse.ArgumentParser(description="Agency indistinguishability simulation")
+    parser.add_argument("--trials", type=int, default=2000, help="Number of trials")
+    parser.add_argument("--decisions", type=int, default=100, help="Decisions per agent per trial")
+    parser.add_argument("--seed", type=int, default=0, help="RNG seed")
+    parser.add_argument("--power-trials", type=int, default=500,
+                        help="Trials against the perturbed preference agent")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--demo", action="store_true", help="Run one verbose trial with agent objects")
+    args = parser.parse_args()
+    
+    if args.demo:
+        random.seed(args.seed)
+        run_single_trial(1, iterations=args.decisions)
+    else:
+        run_validation(num_trials=args.trials, iterations_per_trial=args.decisions, seed=args.seed,
+                       workers=args.workers, power_trials=args.power_trials)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Extraction Benchmark
+
+Times DecisionAnalyzer's feature extraction on a synthetic journal:
+one re.finditer loop per pattern (the old approach) against the
+PatternEngine single scan, checking that both find the same matches.
+A plain scan for the trigger words alone is timed as a floor.
+"""
+
+import random
+import re
+import time
+from argparse import ArgumentParser
+from typing import Dict, List, Tuple
+
+from decision_analyzer import DecisionAnalyzer
+from pattern_engine import fold_case
+
+SENTENCES = [
+    "Decided to build a small tool for tracking entropy.",
+    "What I Built: a parser for the ledger",
+    "Built: journal_index.py with byte offsets.",
+    "Building a simulator because the last one was too slow.",
+    "Implemented the summary view.",
+    "This matters because the index is shared. It saves time.",
+    "I realized that nothing was reading the cache.",
+    "Noticed the workspace grew by three files.",
+    "Instead of a rewrite, I kept the old format.",
+    "Options:\n  A) extend the tracker\n  B) start something new",
+    "Interesting: the agent keeps returning to the same ideas.",
+    "This shows how little state survives between runs.",
+    "Key insight: small tools get reused.",
+    "The weather in the logs was quiet today.",
+    "Ran the checks and everything passed.",
+    "Read the previous notes, then looked around the workspace.",
+    "Nothing in particular stood out in the ledger.",
+    "Spent a while reading older entries.",
+]
+
+
+def synthetic_journal(size_mb: float, seed: int = 0) -> List[str]:
+    """Iteration bodies totalling roughly size_mb of journal text."""
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    iterations = []
+    total = 0
+    n = 0
+    while total < target:
+        n += 1
+        lines = [f"\n**Time:** 2026-01-{n % 28 + 1:02d}T12:00\n"]
+        for _ in range(rng.randint(20, 80)):
+            lines.append(rng.choice(SENTENCES) + ("\n" if rng.random() < 0.3 else " "))
+        body = "".join(lines)
+        iterations.append(body)
+        total += len(body) + len(f"## Iteration {n}")
+    return iterations
+
+
+def separate_scans(content: str) -> Dict[str, List[Tuple]]:
+    """What the per-category extractors used to do: a finditer per pattern."""
+    found: Dict[str, List[Tuple]] = {c: [] for c in DecisionAnalyzer.EXTRACTION.categories}
+    for rule in DecisionAnalyzer.EXTRACTION.rules:
+        for match in re.finditer(rule.pattern, content, rule.flags):
+            found[rule.category].append(match.groups())
+    return found
+
+
+def main():
+    parser = ArgumentParser(description="Benchmark journal feature extraction")
+    parser.add_argument("--size-mb", type=float, default=100, help="Synthetic journal size")
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed")
+    args = parser.parse_args()
+
+    iterations = synthetic_journal(args.size_mb, args.seed)
+    megabytes = sum(len(body) for body in iterations) / (1024 * 1024)
+    engine = DecisionAnalyzer.EXTRACTION
+    print(f"Synthetic journal: {len(iterations)} iterations, {megabytes:.1f} MB")
+
+    def timed(label, scan):
+        start = time.perf_counter()
+        results = [scan(body) for body in iterations]
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<18} {elapsed:7.2f}s  {megabytes / elapsed:7.1f} MB/s")
+        return results
+
+    separate = timed("separate finditer", separate_scans)
+    combined = timed("pattern engine", engine.scan)
+    timed("trigger scan only", lambda body: engine.trigger.findall(fold_case(body)))
+
+    if separate != combined:
+        raise SystemExit("Mismatch between separate scans and the pattern engine")
+    matches = sum(len(v) for result in combined for v in result.values())
+    print(f"  Results identical ({matches} matches)")
+
+
+if __name__ == "__main__":
+    main()
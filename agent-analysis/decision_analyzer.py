@@ -13,192 +13,298 @@ from argparse import ArgumentParser
 from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from journal_index import JournalIndex
+from pattern_engine import PatternEngine, Rule
+
+BUILD_KEYWORDS = {
+    "code_tools": ["tool", "analyzer", "generator", "tracker", "advisor", "cli"],
+    "documentation": ["readme", "documentation", "document", "guide"],
+    "meta": [
+        "journal",
+        "analysis",
+        "system",
+        "framework",
+        "pattern",
+        "agent",
+    ],
+    "experimental": ["experiment", "test", "prototype", "explore"],
+    "refactoring": ["refactor", "clean", "optimize", "extract", "simplify"],
+}
+
+REASONING_KEYWORDS = {
+    "practical": ["useful", "work", "function", "real", "solve", "problem"],
+    "meta": ["understand", "analyze", "reflect", "think", "pattern", "why"],
+    "exploratory": [
+        "try",
+        "experiment",
+        "explore",
+        "see",
+        "discover",
+        "interesting",
+    ],
+    "principled": [
+        "principle",
+        "value",
+        "honesty",
+        "craft",
+        "freedom",
+        "design",
+    ],
+    "iterative": ["build", "extend", "improve", "iteration", "next", "continue"],
+}
+
+# Explicit choices kept as examples
+CHOICE_EXAMPLES = 5
+
+
+def _build_types(builds: List[str]) -> set:
+    """Simple categorization of one iteration's builds."""
+    types = set()
+    for build in builds:
+        if "tool" in build.lower() or "analyzer" in build.lower():
+            types.add("code_tool")
+        elif "doc" in build.lower():
+            types.add("documentation")
+        elif "think" in build.lower() or "analysis" in build.lower():
+            types.add("meta")
+    return types
+
+
+def _phase(position: int, build_count: int) -> str:
+    """Evolution phase of the iteration at this position in the journal."""
+    if position < 2:
+        return "exploration"
+    return "convergence" if build_count > 0 else "reflection"
+
+
+class DecisionSummary:
+    """State behind every DecisionAnalyzer reducer.
+
+    Entries are folded in one at a time, in journal order, and then
+    dropped, so only the per-iteration rows that end up in the analysis
+    are kept.
+    """
+
+    def __init__(self):
+        self.frequencies: List[Dict[str, int]] = []
+        self.total_decisions = 0
+        self.total_builds = 0
+        self.categories: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.category_frequency: Dict[str, int] = defaultdict(int)
+        self.first_types: Optional[set] = None
+        self.last_types: Optional[set] = None
+        self.changes = 0
+        self.strategies: Dict[str, int] = dict.fromkeys(REASONING_KEYWORDS, 0)
+        self.choice_count = 0
+        self.choice_examples: List[Tuple[str, str]] = []
+        self.trajectory: List[Dict[str, Any]] = []
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        """Fold the next iteration into the summary."""
+        self.frequencies.append(
+            {
+                "iteration": entry["iteration"],
+                "decision_count": len(entry["decisions"]),
+                "build_count": len(entry["builds"]),
+                "reasoning_count": len(entry["reasoning"]),
+            }
+        )
+        self.total_decisions += len(entry["decisions"])
+        self.total_builds += len(entry["builds"])
+
+        for build in entry["builds"]:
+            category = next(
+                (c for c, kws in BUILD_KEYWORDS.items() if any(kw in build.lower() for kw in kws)),
+                "other",
+            )
+            self.categories[category].append(
+                {
+                    "iteration": entry["iteration"],
+                    "description": build,
+                }
+            )
+
+        types = _build_types(entry["builds"])
+        for t in types:
+            self.category_frequency[t] += 1
+        if self.last_types is None:
+            self.first_types = types
+        elif types != self.last_types:
+            self.changes += 1
+        self.last_types = types
+
+        all_text = " ".join(entry["reasoning"]).lower()
+        for strategy, kws in REASONING_KEYWORDS.items():
+            if any(kw in all_text for kw in kws):
+                self.strategies[strategy] += 1
+
+        self.choice_count += len(entry["choices"])
+        room = CHOICE_EXAMPLES - len(self.choice_examples)
+        if room > 0:
+            self.choice_examples.extend(entry["choices"][:room])
+
+        self.trajectory.append(
+            {
+                "iteration": entry["iteration"],
+                "phase": _phase(len(self.trajectory), len(entry["builds"])),
+                "build_count": len(entry["builds"]),
+                "has_reflection": len(entry["reflections"]) > 0,
+            }
+        )
 
 
 class DecisionAnalyzer:
     """Analyzes decision patterns from agent journals."""
 
-    def __init__(self, journal_path: str = "/workspace/JOURNAL.md"):
+    # Every feature pattern, matched in a single pass over each iteration
+    EXTRACTION = PatternEngine([
+        # Explicit decision markers
+        Rule("decisions", r"(?:decided|decision|chose|choose)(?::\s*|to\s+)([^.\n]+)",
+             ("decided", "decision", "chose", "choose")),
+        Rule("decisions", r"(?:Instead:|But:)\s*([^.\n]+)", ("instead:", "but:")),
+        Rule("decisions", r"(?:What I Did|What I Built):\s*([^\n]+)", ("what i did", "what i built")),
+        # Build descriptions
+        Rule("builds", r"Built(?::\s*|\s+)([^.\n]+)", ("built",)),
+        Rule("builds", r"Building(?::\s*|\s+)([^.\n]+)", ("building",)),
+        Rule("builds", r"(?:Created|Implemented|Designed)(?::\s*|\s+)([^.\n]+)",
+             ("created", "implemented", "designed")),
+        Rule("builds", r"Tool(?::\s*|\s+)([^.\n]+)", ("tool",)),
+        # Reasoning markers
+        Rule("reasoning", r"(?:because|reason(?:ing)?:?)\s+([^.\n]+\.[^.\n]*)", ("because", "reason")),
+        Rule("reasoning", r"(?:This|That|It's)\s+([^.\n]*(?:because|since)[^.\n]+\.[^.\n]*)",
+             ("this", "that", "it's")),
+        Rule("reasoning", r"(?:realized|noticed|found)(?::?\s+|that\s+)([^.\n]+)",
+             ("realized", "noticed", "found")),
+        # Explicit choices (option A vs option B)
+        Rule("choices", r"Options?:?\s*\n\s*([A-Z])\)\s*([^\n]+)\n\s*([A-Z])\)\s*([^\n]+)",
+             ("option",), re.IGNORECASE | re.MULTILINE),
+        Rule("choices", r"(?:Instead of|Rather than|chose over)\s*([^\n]+?)(?:\s+\||,\s*(?:I|we))\s+([^\n]+)",
+             ("instead of", "rather than", "chose over"), re.IGNORECASE | re.MULTILINE),
+        # Reflective statements
+        Rule("reflections", r"(?:Interesting|Notable|Surprising|Important)(?::?\s*)([^.\n]+\.)",
+             ("interesting", "notable", "surprising", "important")),
+        Rule("reflections", r"This (?:shows|demonstrates|means|suggests)(?::?\s*)([^.\n]+\.)", ("this ",)),
+        Rule("reflections", r"(?:Key insight|Lesson|Observation)(?::?\s*)([^.\n]+\.)",
+             ("key insight", "lesson", "observation")),
+    ])
+
+    def __init__(self, journal_path: str = "/workspace/JOURNAL.md", workers: Optional[int] = 1):
         self.journal_path = Path(journal_path)
-        self.entries = []
+        self.workers = workers
+        self.summary = DecisionSummary()
         self.decisions = []
         self.reasoning_patterns = defaultdict(int)
         self.build_choices = []
         self.reasoning_strategies = []
 
+    def entries(self) -> Iterator[Dict[str, Any]]:
+        """Stream parsed iterations from the shared journal index."""
+        # Only iterations appended since the last run are parsed
+        index = JournalIndex(self.journal_path)
+        parsed = index.iter_features("decision_analyzer/1", self._parse_iteration, workers=self.workers)
+        for iteration_num, features in parsed:
+            entry = {"iteration": iteration_num, **features}
+            entry["choices"] = [tuple(choice) for choice in entry["choices"]]
+            yield entry
+
     def load_journal(self) -> bool:
-        """Load and parse the journal file."""
+        """Fold every iteration of the journal into the summary."""
         if not self.journal_path.exists():
             print(f"Journal not found: {self.journal_path}")
             return False
 
-        content = self.journal_path.read_text()
-
-        # Split by iteration markers
-        iteration_pattern = r"## Iteration (\d+)"
-        iterations = re.split(iteration_pattern, content)
-
-        # Parse iterations (pattern creates: ['header', 'num', 'content', 'num', 'content', ...])
-        for i in range(1, len(iterations), 2):
-            if i + 1 < len(iterations):
-                iteration_num = int(iterations[i])
-                iteration_content = iterations[i + 1]
-                self._parse_iteration(iteration_num, iteration_content)
-
-        return len(self.entries) > 0
-
-    def _parse_iteration(self, iteration_num: int, content: str) -> None:
-        """Parse a single iteration's content."""
-        entry = {
-            "iteration": iteration_num,
-            "timestamp": self._extract_timestamp(content),
-            "decisions": self._extract_decisions(content),
-            "builds": self._extract_builds(content),
-            "reasoning": self._extract_reasoning(content),
-            "choices": self._extract_choices(content),
-            "reflections": self._extract_reflections(content),
+        self.summary = DecisionSummary()
+        for entry in self.entries():
+            self.summary.add(entry)
+
+        return len(self.summary.frequencies) > 0
+
+    @classmethod
+    def _parse_iteration(cls, content: str) -> Dict[str, Any]:
+        """Parse a single iteration's content in one scan."""
+        found = cls.EXTRACTION.scan(content)
+        return {
+            "timestamp": cls._extract_timestamp(content),
+            "decisions": cls._extract_decisions(found["decisions"]),
+            "builds": cls._extract_builds(found["builds"]),
+            "reasoning": cls._extract_reasoning(found["reasoning"]),
+            "choices": cls._extract_choices(found["choices"]),
+            "reflections": cls._extract_reflections(found["reflections"]),
         }
-        self.entries.append(entry)
 
-    def _extract_timestamp(self, content: str) -> Optional[str]:
+    @staticmethod
+    def _extract_timestamp(content: str) -> Optional[str]:
         """Extract timestamp from iteration content."""
         pattern = r"(\d{4}-\d{2}-\d{2}T?\d{2}:\d{2}(?::\d{2})?)"
         match = re.search(pattern, content)
         return match.group(1) if match else None
 
-    def _extract_decisions(self, content: str) -> List[str]:
-        """Extract decision statements from content."""
-        decisions = []
-
-        # Look for explicit decision markers
-        decision_patterns = [
-            r"(?:decided|decision|chose|choose)(?::\s*|to\s+)([^.\n]+)",
-            r"(?:Instead:|But:)\s*([^.\n]+)",
-            r"(?:What I Did|What I Built):\s*([^\n]+)",
-        ]
+    @staticmethod
+    def _extract_decisions(matches: List[Tuple[str, ...]]) -> List[str]:
+        """Extract decision statements from the decision-marker matches."""
+        return [groups[0].strip() for groups in matches]
 
-        for pattern in decision_patterns:
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            for match in matches:
-                decisions.append(match.group(1).strip())
-
-        return decisions
-
-    def _extract_builds(self, content: str) -> List[str]:
+    @staticmethod
+    def _extract_builds(matches: List[Tuple[str, ...]]) -> List[str]:
         """Extract what the agent chose to build."""
         builds = []
-
-        # Look for build descriptions
-        build_patterns = [
-            r"Built(?::\s*|\s+)([^.\n]+)",
-            r"Building(?::\s*|\s+)([^.\n]+)",
-            r"(?:Created|Implemented|Designed)(?::\s*|\s+)([^.\n]+)",
-            r"Tool(?::\s*|\s+)([^.\n]+)",
-        ]
-
-        for pattern in build_patterns:
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            for match in matches:
-                build_desc = match.group(1).strip()
-                if len(build_desc) < 150:  # Reasonable length
-                    builds.append(build_desc)
-
+        for groups in matches:
+            build_desc = groups[0].strip()
+            if len(build_desc) < 150:  # Reasonable length
+                builds.append(build_desc)
         return builds
 
-    def _extract_reasoning(self, content: str) -> List[str]:
+    @staticmethod
+    def _extract_reasoning(matches: List[Tuple[str, ...]]) -> List[str]:
         """Extract reasoning statements."""
         reasoning = []
-
-        # Look for reasoning markers
-        reasoning_patterns = [
-            r"(?:because|reason(?:ing)?:?)\s+([^.\n]+\.[^.\n]*)",
-            r"(?:This|That|It's)\s+([^.\n]*(?:because|since)[^.\n]+\.[^.\n]*)",
-            r"(?:realized|noticed|found)(?::?\s+|that\s+)([^.\n]+)",
-        ]
-
-        for pattern in reasoning_patterns:
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            for match in matches:
-                reason = match.group(1).strip()
-                if reason and len(reason) < 200:
-                    reasoning.append(reason)
-
+        for groups in matches:
+            reason = groups[0].strip()
+            if reason and len(reason) < 200:
+                reasoning.append(reason)
         return reasoning
 
-    def _extract_choices(self, content: str) -> List[Tuple[str, str]]:
+    @staticmethod
+    def _extract_choices(matches: List[Tuple[str, ...]]) -> List[Tuple[str, str]]:
         """Extract decision points (option A vs option B)."""
         choices = []
-
-        # Look for explicit choice patterns
-        choice_patterns = [
-            r"Options?:?\s*\n\s*([A-Z])\)\s*([^\n]+)\n\s*([A-Z])\)\s*([^\n]+)",
-            r"(?:Instead of|Rather than|chose over)\s*([^\n]+?)(?:\s+\||,\s*(?:I|we))\s+([^\n]+)",
-        ]
-
-        for pattern in choice_patterns:
-            matches = re.finditer(pattern, content, re.IGNORECASE | re.MULTILINE)
-            for match in matches:
-                if len(match.groups()) == 4:
-                    choices.append((match.group(2), match.group(4)))
-                elif len(match.groups()) == 2:
-                    choices.append((match.group(1), match.group(2)))
-
+        for groups in matches:
+            if len(groups) == 4:
+                choices.append((groups[1], groups[3]))
+            elif len(groups) == 2:
+                choices.append((groups[0], groups[1]))
         return choices
 
-    def _extract_reflections(self, content: str) -> List[str]:
+    @staticmethod
+    def _extract_reflections(matches: List[Tuple[str, ...]]) -> List[str]:
         """Extract reflective statements about decisions."""
-        reflections = []
-
-        reflection_patterns = [
-            r"(?:Interesting|Notable|Surprising|Important)(?::?\s*)([^.\n]+\.)",
-            r"This (?:shows|demonstrates|means|suggests)(?::?\s*)([^.\n]+\.)",
-            r"(?:Key insight|Lesson|Observation)(?::?\s*)([^.\n]+\.)",
-        ]
-
-        for pattern in reflection_patterns:
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            for match in matches:
-                reflections.append(match.group(1).strip())
-
-        return reflections
+        return [groups[0].strip() for groups in matches]
 
     def analyze(self) -> Dict[str, Any]:
         """Perform analysis on loaded entries."""
-        if not self.entries:
+        summary = self.summary
+        if not summary.frequencies:
             return {}
 
         analysis = {
-            "total_iterations": len(self.entries),
-            "decision_frequency": self._calculate_decision_frequency(),
-            "build_categories": self._categorize_builds(),
-            "reasoning_strategies": self._identify_reasoning_strategies(),
-            "consistency_metrics": self._calculate_consistency(),
-            "choice_patterns": self._analyze_choices(),
-            "evolution": self._analyze_evolution(),
+            "total_iterations": len(summary.frequencies),
+            "decision_frequency": self._calculate_decision_frequency(summary),
+            "build_categories": self._categorize_builds(summary),
+            "reasoning_strategies": self._identify_reasoning_strategies(summary),
+            "consistency_metrics": self._calculate_consistency(summary),
+            "choice_patterns": self._analyze_choices(summary),
+            "evolution": self._analyze_evolution(summary),
         }
 
         return analysis
 
-    def _calculate_decision_frequency(self) -> Dict[str, Any]:
+    def _calculate_decision_frequency(self, summary: DecisionSummary) -> Dict[str, Any]:
         """Calculate frequency of decisions per iteration."""
-        frequencies = []
-        for entry in self.entries:
-            frequencies.append(
-                {
-                    "iteration": entry["iteration"],
-                    "decision_count": len(entry["decisions"]),
-                    "build_count": len(entry["builds"]),
-                    "reasoning_count": len(entry["reasoning"]),
-                }
-            )
-
-        avg_decisions = sum(f["decision_count"] for f in frequencies) / len(
-            frequencies
-        ) if frequencies else 0
-        avg_builds = sum(f["build_count"] for f in frequencies) / len(
-            frequencies
-        ) if frequencies else 0
+        frequencies = summary.frequencies
+        avg_decisions = summary.total_decisions / len(frequencies) if frequencies else 0
+        avg_builds = summary.total_builds / len(frequencies) if frequencies else 0
 
         return {
             "average_decisions_per_iteration": round(avg_decisions, 2),
@@ -206,162 +312,43 @@ class DecisionAnalyzer:
             "iterations": frequencies,
         }
 
-    def _categorize_builds(self) -> Dict[str, List[str]]:
+    def _categorize_builds(self, summary: DecisionSummary) -> Dict[str, List[str]]:
         """Categorize what was built."""
-        categories = defaultdict(list)
-
-        keywords = {
-            "code_tools": ["tool", "analyzer", "generator", "tracker", "advisor", "cli"],
-            "documentation": ["readme", "documentation", "document", "guide"],
-            "meta": [
-                "journal",
-                "analysis",
-                "system",
-                "framework",
-                "pattern",
-                "agent",
-            ],
-            "experimental": ["experiment", "test", "prototype", "explore"],
-            "refactoring": ["refactor", "clean", "optimize", "extract", "simplify"],
-        }
-
-        for entry in self.entries:
-            for build in entry["builds"]:
-                categorized = False
-                for category, kws in keywords.items():
-                    if any(kw in build.lower() for kw in kws):
-                        categories[category].append(
-                            {
-                                "iteration": entry["iteration"],
-                                "description": build,
-                            }
-                        )
-                        categorized = True
-                        break
-                if not categorized:
-                    categories["other"].append(
-                        {
-                            "iteration": entry["iteration"],
-                            "description": build,
-                        }
-                    )
-
-        return dict(categories)
-
-    def _identify_reasoning_strategies(self) -> Dict[str, Any]:
-        """Identify patterns in how the agent reasons."""
-        strategies = {
-            "practical": 0,
-            "meta": 0,
-            "exploratory": 0,
-            "principled": 0,
-            "iterative": 0,
-        }
-
-        keywords = {
-            "practical": ["useful", "work", "function", "real", "solve", "problem"],
-            "meta": ["understand", "analyze", "reflect", "think", "pattern", "why"],
-            "exploratory": [
-                "try",
-                "experiment",
-                "explore",
-                "see",
-                "discover",
-                "interesting",
-            ],
-            "principled": [
-                "principle",
-                "value",
-                "honesty",
-                "craft",
-                "freedom",
-                "design",
-            ],
-            "iterative": ["build", "extend", "improve", "iteration", "next", "continue"],
-        }
-
-        for entry in self.entries:
-            all_text = " ".join(entry["reasoning"]).lower()
-            for strategy, kws in keywords.items():
-                if any(kw in all_text for kw in kws):
-                    strategies[strategy] += 1
-
-        return strategies
+        return dict(summary.categories)
 
-    def _calculate_consistency(self) -> Dict[str, Any]:
+    def _calculate_consistency(self, summary: DecisionSummary) -> Dict[str, Any]:
         """Measure consistency of decisions across iterations."""
-        # Track if same types of decisions are made
-        build_types_per_iteration = []
-        for entry in self.entries:
-            types = set()
-            for build in entry["builds"]:
-                # Simple categorization
-                if "tool" in build.lower() or "analyzer" in build.lower():
-                    types.add("code_tool")
-                elif "doc" in build.lower():
-                    types.add("documentation")
-                elif "think" in build.lower() or "analysis" in build.lower():
-                    types.add("meta")
-
-            build_types_per_iteration.append(types)
-
         # Measure consistency (same categories appearing repeatedly)
-        category_frequency = defaultdict(int)
-        for types in build_types_per_iteration:
-            for t in types:
-                category_frequency[t] += 1
-
+        iterations = len(summary.frequencies)
         consistency_score = (
-            max(category_frequency.values()) / len(build_types_per_iteration)
-            if build_types_per_iteration
+            max(summary.category_frequency.values(), default=0) / iterations
+            if iterations
             else 0
         )
 
         return {
             "consistency_score": round(consistency_score, 2),
-            "recurring_categories": dict(category_frequency),
-            "changes_between_iterations": self._count_changes(build_types_per_iteration),
+            "recurring_categories": dict(summary.category_frequency),
+            "changes_between_iterations": summary.changes,
         }
 
-    def _count_changes(self, build_types_per_iteration: List[set]) -> int:
-        """Count how many times the focus changed between iterations."""
-        changes = 0
-        for i in range(len(build_types_per_iteration) - 1):
-            if build_types_per_iteration[i] != build_types_per_iteration[i + 1]:
-                changes += 1
-        return changes
+    def _identify_reasoning_strategies(self, summary: DecisionSummary) -> Dict[str, Any]:
+        """Identify patterns in how the agent reasons."""
+        return dict(summary.strategies)
 
-    def _analyze_choices(self) -> Dict[str, Any]:
+    def _analyze_choices(self, summary: DecisionSummary) -> Dict[str, Any]:
         """Analyze explicit choice patterns."""
-        all_choices = []
-        for entry in self.entries:
-            all_choices.extend(entry["choices"])
-
-        if not all_choices:
+        if not summary.choice_count:
             return {"explicit_choices_found": 0}
 
         return {
-            "explicit_choices_found": len(all_choices),
-            "examples": all_choices[:5],
+            "explicit_choices_found": summary.choice_count,
+            "examples": summary.choice_examples,
         }
 
-    def _analyze_evolution(self) -> Dict[str, Any]:
+    def _analyze_evolution(self, summary: DecisionSummary) -> Dict[str, Any]:
         """Analyze how decisions evolved over time."""
-        trajectory = []
-        for i, entry in enumerate(self.entries):
-            phase = "exploration" if i < 2 else (
-                "convergence" if len(entry["builds"]) > 0 else "reflection"
-            )
-            trajectory.append(
-                {
-                    "iteration": entry["iteration"],
-                    "phase": phase,
-                    "build_count": len(entry["builds"]),
-                    "has_reflection": len(entry["reflections"]) > 0,
-                }
-            )
-
-        return {"trajectory": trajectory}
+        return {"trajectory": summary.trajectory}
 
     def print_analysis(self, analysis: Dict[str, Any]) -> None:
         """Print analysis results in human-readable format."""
@@ -430,10 +417,15 @@ def main():
         type=int,
         help="Show only last N iterations",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Processes for parsing large journals (default: one per CPU)",
+    )
 
     args = parser.parse_args()
 
-    analyzer = DecisionAnalyzer(args.journal)
+    analyzer = DecisionAnalyzer(args.journal, workers=args.workers)
 
     if not analyzer.load_journal():
         print("Failed to load journal")
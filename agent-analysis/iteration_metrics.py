@@ -14,12 +14,31 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from journal_index import JournalIndex
+from pattern_engine import PatternEngine, Rule
+
+
+def _keywords(category: str, words: str) -> Rule:
+    """A rule matching any of the |-separated literal words."""
+    return Rule(category, words.replace(".", r"\."), tuple(words.split("|")))
+
 
 class IterationMetrics:
     """Analyze iteration-level patterns and metrics."""
 
-    def __init__(self, journal_path: str = "/workspace/JOURNAL.md"):
+    # Artifact and decision mentions, counted in a single pass
+    COUNTERS = PatternEngine([
+        _keywords("artifacts", "built|created|made|generated|wrote"),
+        _keywords("artifacts", ".py|.md|.json|.yaml"),
+        _keywords("artifacts", "tool|script|module|class|function"),
+        _keywords("decisions", "decided|decision|chose|choose"),
+        _keywords("decisions", "instead|but|rather|alternatively"),
+        _keywords("decisions", "what i did|what i built"),
+    ])
+
+    def __init__(self, journal_path: str = "/workspace/JOURNAL.md", workers: Optional[int] = 1):
         self.journal_path = Path(journal_path)
+        self.workers = workers
         self.iterations = []
         self.load_journal()
 
@@ -28,52 +47,46 @@ class IterationMetrics:
         if not self.journal_path.exists():
             return False
 
-        content = self.journal_path.read_text()
-
-        # Split by iteration headers
-        iteration_pattern = r"## Iteration (\d+)"
-        splits = re.split(iteration_pattern, content)
-
-        # Process: ['header', 'num', 'content', 'num', 'content', ...]
-        for i in range(1, len(splits), 2):
-            if i + 1 < len(splits):
-                iteration_num = int(splits[i])
-                iteration_content = splits[i + 1]
-                iteration_data = self._parse_iteration(iteration_num, iteration_content)
-                if iteration_data:
-                    self.iterations.append(iteration_data)
+        # Only iterations appended since the last run are parsed
+        index = JournalIndex(self.journal_path)
+        parsed = index.features("iteration_metrics/1", self._parse_iteration, workers=self.workers)
+        for iteration_num, features in parsed:
+            self.iterations.append({"iteration": iteration_num, **features})
 
         return len(self.iterations) > 0
 
-    def _parse_iteration(self, num: int, content: str) -> Optional[Dict[str, Any]]:
+    @classmethod
+    def _parse_iteration(cls, content: str) -> Dict[str, Any]:
         """Parse a single iteration entry."""
-        iteration = {
-            "iteration": num,
-            "timestamp": self._extract_timestamp(content),
+        counts = cls.COUNTERS.scan(content)
+        return {
+            "timestamp": cls._extract_timestamp(content),
             "word_count": len(content.split()),
-            "sections": self._count_sections(content),
-            "themes": self._extract_themes(content),
-            "artifacts": self._count_artifacts(content),
-            "decisions_made": self._count_decisions(content),
+            "sections": cls._count_sections(content),
+            "themes": cls._extract_themes(content),
+            "artifacts": len(counts["artifacts"]),
+            "decisions_made": len(counts["decisions"]),
             "has_reflection": "reflection" in content.lower()
             or "learned" in content.lower(),
             "has_uncertainty": "uncertain" in content.lower()
             or "don't know" in content.lower(),
-            "builds_something": self._detects_building(content),
+            "builds_something": cls._detects_building(content),
         }
-        return iteration
 
-    def _extract_timestamp(self, content: str) -> Optional[str]:
+    @staticmethod
+    def _extract_timestamp(content: str) -> Optional[str]:
         """Extract iteration timestamp."""
         pattern = r"(\d{4}-\d{2}-\d{2}T?\d{2}:\d{2})"
         match = re.search(pattern, content)
         return match.group(1) if match else None
 
-    def _count_sections(self, content: str) -> int:
+    @staticmethod
+    def _count_sections(content: str) -> int:
         """Count major sections in iteration."""
         return len(re.findall(r"\n#{2,3} ", content))
 
-    def _extract_themes(self, content: str) -> List[str]:
+    @staticmethod
+    def _extract_themes(content: str) -> List[str]:
         """Extract main themes from iteration."""
         themes = []
         keywords = {
@@ -92,38 +105,8 @@ class IterationMetrics:
 
         return themes
 
-    def _count_artifacts(self, content: str) -> int:
-        """Count artifacts (tools, files, etc.) mentioned."""
-        # Count lines with specific patterns
-        artifact_patterns = [
-            r"built|created|made|generated|wrote",
-            r"\.py|\.md|\.json|\.yaml",
-            r"tool|script|module|class|function",
-        ]
-
-        count = 0
-        for pattern in artifact_patterns:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            count += len(matches)
-
-        return count
-
-    def _count_decisions(self, content: str) -> int:
-        """Count decision statements."""
-        decision_patterns = [
-            r"decided|decision|chose|choose",
-            r"instead|but|rather|alternatively",
-            r"what i did|what i built",
-        ]
-
-        count = 0
-        for pattern in decision_patterns:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            count += len(matches)
-
-        return count
-
-    def _detects_building(self, content: str) -> bool:
+    @staticmethod
+    def _detects_building(content: str) -> bool:
         """Check if iteration describes building something."""
         build_indicators = [
             "built",
@@ -314,10 +297,15 @@ def main():
         help="Path to journal",
     )
     parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Processes for parsing large journals (default: one per CPU)",
+    )
 
     args = parser.parse_args()
 
-    metrics = IterationMetrics(args.journal)
+    metrics = IterationMetrics(args.journal, workers=args.workers)
 
     if not metrics.iterations:
         print("No iterations found")
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Journal Index
+
+Shared, incrementally maintained parse of JOURNAL.md for the analysis tools.
+
+The journal is split at "## Iteration N" markers exactly as
+re.split(r"## Iteration (\\d+)") does. The index remembers each iteration's
+byte range and is saved next to the journal (.JOURNAL.md.index.json). On
+the next run only the bytes appended since then are parsed: the last
+iteration is re-read because appends extend it, and everything before it
+comes from the index. If the journal was rewritten rather than appended
+to, the index is rebuilt.
+
+Features the analyzers extract are cached one JSON line per iteration in
+a file per feature name (.JOURNAL.md.index.<name>.jsonl), and the index
+only records where each iteration's line starts. iter_features() streams
+cached lines and newly extracted ones in iteration order, so a consumer
+that reduces as it goes never holds more than one iteration's features.
+
+The journal is memory-mapped rather than read, so neither indexing nor
+extraction holds more than one iteration's text at a time. When many
+iterations need extracting, they are grouped into chunks of about
+CHUNK_BYTES and spread over a process pool, a few chunks at a time.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+MARKER = re.compile(rb"## Iteration (\d+)")
+FINGERPRINT_BYTES = 64
+INDEX_VERSION = 2
+CHUNK_BYTES = 8 * 1024 * 1024
+
+
+def _extract_spans(
+    journal_path: str,
+    spans: List[Tuple[int, int]],
+    extract: Callable[[str], Any],
+) -> List[Any]:
+    """extract() over each (start, end) byte range of the journal."""
+    with open(journal_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return [extract(data[start:end].decode("utf-8", "replace")) for start, end in spans]
+
+
+def _chunks(records: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Split records into consecutive runs of about CHUNK_BYTES each."""
+    chunks: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    size = 0
+    for record in records:
+        current.append(record)
+        size += record["end"] - record["start"]
+        if size >= CHUNK_BYTES:
+            chunks.append(current)
+            current, size = [], 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class JournalIndex:
+    """Per-iteration byte offsets and cached features for one journal."""
+
+    def __init__(self, journal_path: str, index_path: Optional[str] = None):
+        self.journal_path = Path(journal_path)
+        self.index_path = (
+            Path(index_path)
+            if index_path
+            else self.journal_path.with_name(f".{self.journal_path.name}.index.json")
+        )
+        self.size = 0
+        self.tail = ""
+        self.records: List[Dict[str, Any]] = []
+        # Per feature name: how many leading records have a cached line, and where they end
+        self.cached: Dict[str, Dict[str, int]] = {}
+        self.dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            state = json.loads(self.index_path.read_text())
+        except (OSError, ValueError):
+            return
+        if state.get("version") != INDEX_VERSION:
+            return
+        self.size = state.get("size", 0)
+        self.tail = state.get("tail", "")
+        self.records = state.get("records", [])
+        self.cached = state.get("cached", {})
+
+    def save(self) -> None:
+        """Write the index back if anything changed."""
+        if not self.dirty:
+            return
+        state = {
+            "version": INDEX_VERSION,
+            "size": self.size,
+            "tail": self.tail,
+            "records": self.records,
+            "cached": self.cached,
+        }
+        try:
+            tmp = self.index_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(state, separators=(",", ":")))
+            os.replace(tmp, self.index_path)
+            self.dirty = False
+        except OSError:
+            pass  # A read-only workspace just means parsing again next time
+
+    @staticmethod
+    def _fingerprint(f, size: int) -> str:
+        start = max(0, size - FINGERPRINT_BYTES)
+        f.seek(start)
+        return hashlib.sha1(f.read(size - start)).hexdigest()
+
+    def refresh(self) -> List[Dict[str, Any]]:
+        """Bring the index up to date with the journal and return its records.
+
+        Raises OSError if the journal cannot be read.
+        """
+        with open(self.journal_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == self.size and self.tail == self._fingerprint(f, size):
+                return self.records
+
+            appended = size > self.size and self.tail == self._fingerprint(f, self.size)
+            if appended and self.records:
+                # The last iteration runs to end of file, so appends extend it
+                last = self.records.pop()
+                scan_from = last["marker"]
+                for name, line_start in last["features"].items():
+                    self.cached[name] = {"count": len(self.records), "end": line_start}
+            elif appended and self.size:
+                scan_from = 0
+            else:
+                self.records = []
+                self.cached = {}
+                scan_from = 0
+
+            self.tail = self._fingerprint(f, size)
+            if size > scan_from:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    for match in MARKER.finditer(data, scan_from):
+                        if self.records and self.records[-1]["end"] == size:
+                            self.records[-1]["end"] = match.start()
+                        self.records.append({
+                            "iteration": int(match.group(1)),
+                            "marker": match.start(),
+                            "start": match.end(),
+                            "end": size,
+                            "features": {},
+                        })
+        self.size = size
+        self.dirty = True
+        return self.records
+
+    def _feature_path(self, name: str) -> Path:
+        slug = re.sub(r"[^\w.-]", "-", name)
+        return self.index_path.with_name(f"{self.index_path.stem}.{slug}.jsonl")
+
+    def _extracted(
+        self,
+        records: List[Dict[str, Any]],
+        extract: Callable[[str], Any],
+        workers: Optional[int],
+    ) -> Iterator[Tuple[Dict[str, Any], Any]]:
+        """(record, extract(content)) for each record, in order.
+
+        With several chunks and workers > 1, chunks run in a process pool
+        with at most two per worker in flight.
+        """
+        chunks = _chunks(records)
+        path = str(self.journal_path)
+        workers = min(workers or os.cpu_count() or 1, len(chunks))
+        if workers <= 1:
+            for chunk in chunks:
+                yield from zip(chunk, _extract_spans(path, [(r["start"], r["end"]) for r in chunk], extract))
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending: deque = deque()
+            for chunk in chunks:
+                spans = [(r["start"], r["end"]) for r in chunk]
+                pending.append((chunk, pool.submit(_extract_spans, path, spans, extract)))
+                if len(pending) >= 2 * workers:
+                    done, future = pending.popleft()
+                    yield from zip(done, future.result())
+            while pending:
+                done, future = pending.popleft()
+                yield from zip(done, future.result())
+
+    def iter_features(
+        self,
+        name: str,
+        extract: Callable[[str], Any],
+        last: Optional[int] = None,
+        workers: Optional[int] = 1,
+    ) -> Iterator[Tuple[int, Any]]:
+        """Stream (iteration, extract(content)) for each iteration, or the last N.
+
+        Results are cached under `name`, so only iterations that are new
+        (or were never extracted under that name) are read. Bump the
+        version in `name` whenever the extractor changes. Values are
+        yielded as they are read or extracted; nothing but the iteration
+        offsets is held for the whole journal.
+
+        With workers > 1 (None for one per CPU), more than one chunk of
+        missing iterations is extracted in a process pool; `extract` must
+        then be picklable, e.g. a module-level function or a classmethod.
+        """
+        records = self.refresh()
+        first = 0 if last is None else max(0, len(records) - last) if last > 0 else len(records)
+        cached = self._check_cache(name)
+        count = cached["count"]
+
+        if first > count:
+            # Only a tail is wanted and the cache stops short of it: extract
+            # just that tail, uncached, rather than everything before it
+            for record, value in self._extracted(records[first:], extract, workers):
+                yield record["iteration"], value
+            self.save()
+            return
+
+        try:
+            f = open(self._feature_path(name), "r+b" if count else "w+b")
+        except OSError:
+            # A read-only workspace just means extracting again next time
+            for record, value in self._extracted(records[first:], extract, workers):
+                yield record["iteration"], value
+            self.save()
+            return
+
+        try:
+            with f:
+                f.seek(records[first]["features"][name] if first < count else cached["end"])
+                for record in records[first:count]:
+                    yield record["iteration"], json.loads(f.readline())
+
+                f.seek(cached["end"])
+                f.truncate()
+                for record, value in self._extracted(records[count:], extract, workers):
+                    line = (json.dumps(value, separators=(",", ":")) + "\n").encode()
+                    f.write(line)
+                    record["features"][name] = cached["end"]
+                    cached["end"] += len(line)
+                    cached["count"] += 1
+                    self.dirty = True
+                    yield record["iteration"], value
+        finally:
+            self.save()
+
+    def _check_cache(self, name: str) -> Dict[str, int]:
+        """Cache bookkeeping for `name`, reset if its feature file lost lines."""
+        cached = self.cached.setdefault(name, {"count": 0, "end": 0})
+        if cached["count"]:
+            try:
+                size = os.stat(self._feature_path(name)).st_size
+            except OSError:
+                size = -1
+            if size < cached["end"]:
+                cached["count"] = cached["end"] = 0
+                for record in self.records:
+                    record["features"].pop(name, None)
+                self.dirty = True
+        return cached
+
+    def features(
+        self,
+        name: str,
+        extract: Callable[[str], Any],
+        last: Optional[int] = None,
+        workers: Optional[int] = 1,
+    ) -> List[Tuple[int, Any]]:
+        """iter_features() collected into a list."""
+        return list(self.iter_features(name, extract, last, workers))
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Pattern Engine
+
+Runs a set of case-insensitive extraction regexes over a text in one scan.
+
+Every rule starts with one of a few literal trigger words. The engine
+lowercases the text once, finds every position where any trigger starts
+with a single combined regex (shaped as a trie, so each position is
+checked against one branch rather than every word), and only there tries
+the rules that begin with that trigger, against the original text. Each
+rule keeps its own "next allowed position", so the result is exactly
+what a separate re.finditer per rule would give: the same matches, in
+the same order, overlapping freely across rules.
+"""
+
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# Characters that re.IGNORECASE treats as ASCII letters but str.lower() keeps
+_FOLD = {ord(c): c.lower() for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"}
+_FOLD.update({0x130: "i", 0x131: "i", 0x17F: "s", 0x212A: "k"})
+
+
+class Rule(NamedTuple):
+    """One extraction regex, routed to a feature category.
+
+    `triggers` are lowercase literals; every match of `pattern` must start
+    with one of them (ignoring case).
+    """
+
+    category: str
+    pattern: str
+    triggers: Tuple[str, ...]
+    flags: int = re.IGNORECASE
+
+
+def _trie_pattern(words: Sequence[str]) -> str:
+    """Regex matching the longest of `words` at a position, with shared prefixes factored out."""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy, so a word that extends another wins at the same position
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(trie)
+
+
+def fold_case(text: str) -> str:
+    """Lowercase text without changing its length or any character offsets."""
+    folded = text.lower()
+    if len(folded) != len(text) or "ſ" in folded or "ı" in folded:
+        folded = text.translate(_FOLD)
+    return folded
+
+
+class PatternEngine:
+    """Compiled multi-pattern matcher over a shared trigger scan."""
+
+    def __init__(self, rules: Sequence[Rule]):
+        self.rules = list(rules)
+        self.categories = list(dict.fromkeys(rule.category for rule in self.rules))
+        self.compiled = [re.compile(rule.pattern, rule.flags | re.IGNORECASE) for rule in self.rules]
+
+        words = sorted({t for rule in self.rules for t in rule.triggers}, key=len, reverse=True)
+        self.trigger = re.compile(_trie_pattern(words))
+
+        # A trigger found at a position also starts every shorter trigger
+        # that is its prefix, so try those rules too
+        self.dispatch: Dict[str, List[int]] = {
+            word: [i for i, rule in enumerate(self.rules) if any(word.startswith(t) for t in rule.triggers)]
+            for word in words
+        }
+
+        # Resume after a trigger only as far as another trigger could start inside it
+        self.resume: Dict[str, int] = {}
+        for word in words:
+            step = len(word)
+            for k in range(1, len(word)):
+                tail = word[k:]
+                if any(w.startswith(tail) or tail.startswith(w) for w in words):
+                    step = k
+                    break
+            self.resume[word] = step
+
+    def scan(self, text: str) -> Dict[str, List[Tuple[Optional[str], ...]]]:
+        """Every rule's matches as tuples of its groups, grouped by category.
+
+        Within a category, matches are listed rule by rule in the order the
+        rules were given, as separate finditer loops would produce them.
+        """
+        folded = fold_case(text)
+        found: List[List[Tuple[Optional[str], ...]]] = [[] for _ in self.rules]
+        allowed = [0] * len(self.rules)
+        compiled = self.compiled
+        dispatch = self.dispatch
+        resume = self.resume
+        search = self.trigger.search
+
+        hit = search(folded)
+        while hit:
+            pos = hit.start()
+            word = hit.group()
+            for i in dispatch[word]:
+                if pos >= allowed[i]:
+                    # Folding keeps offsets, so the rule runs on the original
+                    # text and its groups need no slicing back
+                    match = compiled[i].match(text, pos)
+                    if match:
+                        allowed[i] = match.end()
+                        found[i].append(match.groups())
+            hit = search(folded, pos + resume[word])
+
+        result: Dict[str, List[Tuple[Optional[str], ...]]] = {c: [] for c in self.categories}
+        for rule, matches in zip(self.rules, found):
+            result[rule.category].extend(matches)
+        return result
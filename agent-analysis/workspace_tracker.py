@@ -7,12 +7,18 @@ Tracks file creation, modification, deletion, and project structure changes.
 """
 
 import json
+import os
 import subprocess
 from argparse import ArgumentParser
 from collections import defaultdict
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Parsed history and the lifecycle index, kept in the workspace's git directory
+CACHE_NAME = "workspace_tracker.json"
+CACHE_VERSION = 2
+GIT_DATE = "%Y-%m-%d %H:%M:%S %z"
 
 
 class WorkspaceTracker:
@@ -22,72 +28,287 @@ class WorkspaceTracker:
         self.workspace = Path(workspace_path)
         self.git_root = self.workspace
         self.history = []
+        self.index = self._empty_cache()
         self.file_stats = defaultdict(list)
         self.component_sizes = defaultdict(list)
 
     def load_git_history(self) -> bool:
-        """Load git commit history and analyze workspace changes."""
+        """Load git commit history and analyze workspace changes.
+
+        Commits already seen on a previous run come from the cache in the
+        git directory; only commits added since are read from git log.
+        """
         if not (self.workspace / ".git").exists():
             print("No git repository found")
             return False
 
         try:
-            # Get all commits with files changed
-            result = subprocess.run(
-                [
-                    "git",
-                    "-C",
-                    str(self.workspace),
-                    "log",
-                    "--name-status",
-                    "--pretty=format:%H|%an|%ae|%ai|%s",
-                ],
-                capture_output=True,
-                text=True,
-            )
-
-            if result.returncode != 0:
+            head = self._git("rev-parse", "HEAD")
+            git_dir = self._git("rev-parse", "--absolute-git-dir")
+            if head is None or git_dir is None:
                 return False
+            cache_path = Path(git_dir) / CACHE_NAME
 
-            self._parse_git_output(result.stdout)
+            cache = self._load_cache(cache_path)
+            if cache and cache["head"] == head:
+                new_commits = []
+            elif cache and self._git("merge-base", "--is-ancestor", cache["head"], head) is not None:
+                new_commits = list(self._stream_log(f"{cache['head']}..{head}"))
+            else:
+                cache = self._empty_cache()
+                new_commits = list(self._stream_log(head))
+
+            # git log lists newest first; fold the new commits oldest first
+            for commit in reversed(new_commits):
+                self._fold_commit(cache, commit)
+            cache["commits"] = new_commits + cache["commits"]
+            if new_commits or cache["head"] != head:
+                cache["head"] = head
+                self._save_cache(cache_path, cache)
+
+            self.history = cache["commits"]
+            self.index = cache
             return True
 
         except Exception as e:
             print(f"Error loading git history: {e}")
             return False
 
-    def _parse_git_output(self, output: str) -> None:
-        """Parse git log output and extract file changes."""
-        lines = output.split("\n")
-        current_commit = None
-
-        for line in lines:
-            if not line.strip():
-                continue
-
-            # Check if it's a commit line (has | separator)
-            if "|" in line and line.count("|") == 4:
-                parts = line.split("|")
-                current_commit = {
-                    "hash": parts[0],
-                    "author": parts[1],
-                    "email": parts[2],
-                    "date": parts[3],
-                    "message": parts[4],
-                    "files_changed": [],
-                }
-                self.history.append(current_commit)
-            # Check if it's a file change line
-            elif current_commit and line and line[0] in ("A", "M", "D", "R"):
-                # Format: STATUS\tFILE_PATH or STATUS\tOLD\tNEW for renames
-                parts = line.split("\t")
-                status = parts[0]
-                file_path = parts[1] if len(parts) > 1 else ""
-
-                if file_path:
-                    current_commit["files_changed"].append(
-                        {"status": status, "file": file_path}
-                    )
+    def _git(self, *args: str) -> Optional[str]:
+        """Output of a git command in the workspace, or None if it failed."""
+        result = subprocess.run(
+            ["git", "-C", str(self.workspace), *args],
+            capture_output=True,
+            text=True,
+        )
+        return result.stdout.strip() if result.returncode == 0 else None
+
+    def _stream_log(self, revisions: str) -> Iterator[Dict[str, Any]]:
+        """Commits in `revisions`, newest first, parsed as git log streams them.
+
+        With -z every header field, status and path ends in NUL, so no
+        character in a subject or file name can be mistaken for structure.
+        Headers start with a 0x01 byte, which no status letter does.
+        """
+        proc = subprocess.Popen(
+            [
+                "git",
+                "-C",
+                str(self.workspace),
+                "log",
+                "-z",
+                "--name-status",
+                "--format=%x01%H%x00%an%x00%ae%x00%ai%x00%s",
+                revisions,
+            ],
+            stdout=subprocess.PIPE,
+        )
+        try:
+            tokens = self._read_tokens(proc.stdout)
+            commit = None
+            for token in tokens:
+                if token.startswith("\x01"):
+                    if commit:
+                        yield commit
+                    commit = {
+                        "hash": token[1:],
+                        "author": next(tokens),
+                        "email": next(tokens),
+                        "date": next(tokens),
+                        "message": next(tokens),
+                        "files_changed": [],
+                    }
+                    continue
+
+                # STATUS PATH, or STATUS OLD NEW for renames and copies
+                status = token.lstrip("\n")
+                paths = [next(tokens)]
+                if status[:1] in ("R", "C"):
+                    paths.append(next(tokens))
+                if commit and status[:1] in ("A", "M", "D", "R"):
+                    change = {"status": status, "file": paths[0]}
+                    if len(paths) > 1:
+                        change["renamed_to"] = paths[1]
+                    commit["files_changed"].append(change)
+            if commit:
+                yield commit
+        finally:
+            proc.stdout.close()
+            if proc.wait() != 0:
+                raise RuntimeError(f"git log {revisions} failed")
+
+    @staticmethod
+    def _read_tokens(stream, block_size: int = 1 << 16) -> Iterator[str]:
+        """NUL-terminated fields from a byte stream, read a block at a time."""
+        pending = b""
+        while True:
+            block = stream.read(block_size)
+            if not block:
+                break
+            fields = (pending + block).split(b"\0")
+            pending = fields.pop()
+            for field in fields:
+                yield field.decode("utf-8", "replace")
+        if pending:
+            yield pending.decode("utf-8", "replace")
+
+    @staticmethod
+    def _empty_cache() -> Dict[str, Any]:
+        return {
+            "version": CACHE_VERSION,
+            "head": None,
+            "commits": [],
+            "authors": {},
+            "message_themes": {},
+            "statistics": {"A": 0, "M": 0, "D": 0, "R": 0},
+            "components": {},
+            "files": {},
+            "days": {},
+            "deletions": [],
+        }
+
+    @staticmethod
+    def _load_cache(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            cache = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        return cache if cache.get("version") == CACHE_VERSION else None
+
+    @staticmethod
+    def _save_cache(path: Path, cache: Dict[str, Any]) -> None:
+        try:
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(cache, separators=(",", ":")))
+            os.replace(tmp, path)
+        except OSError:
+            pass  # Without a writable git dir the history is just read again
+
+    @staticmethod
+    def _fold_commit(cache: Dict[str, Any], commit: Dict[str, Any]) -> None:
+        """Update the running tallies and lifecycle index with the next commit.
+
+        Each path keeps when it was created, last changed and deleted, how
+        often it changed, and the path it was renamed from or to.
+        """
+        authors = cache["authors"]
+        authors[commit["author"]] = authors.get(commit["author"], 0) + 1
+
+        # Simple theme detection from commit messages
+        msg = commit["message"].lower()
+        if "add" in msg:
+            theme = "add"
+        elif "fix" in msg:
+            theme = "fix"
+        elif "refactor" in msg:
+            theme = "refactor"
+        elif "update" in msg:
+            theme = "update"
+        elif "remove" in msg:
+            theme = "remove"
+        elif "journal" in msg or "iteration" in msg:
+            theme = "journal"
+        else:
+            theme = "other"
+        themes = cache["message_themes"]
+        themes[theme] = themes.get(theme, 0) + 1
+
+        date = commit["date"]
+        files = cache["files"]
+        touched = cache["days"].setdefault(date[:10], {})
+
+        def record(path: str) -> Dict[str, Any]:
+            info = files.setdefault(path, {
+                "created": None,
+                "last_changed": None,
+                "deleted": None,
+                "modified": 0,
+                "changes": 0,
+                "renamed_from": None,
+                "renamed_to": None,
+            })
+            info["changes"] += 1
+            info["last_changed"] = date
+            touched[path] = touched.get(path, 0) + 1
+            return info
+
+        for change in commit["files_changed"]:
+            file_path = change["file"]
+            status = change["status"][:1]
+            cache["statistics"][status] += 1
+
+            if status in ("A", "M"):
+                # Top-level component
+                parts = file_path.split("/")
+                component = parts[0] if len(parts) > 1 else "root"
+                counts = cache["components"].setdefault(component, {"created": 0, "modified": 0})
+                counts["created" if status == "A" else "modified"] += 1
+
+            info = record(file_path)
+            if status == "A":
+                if info["created"] is None:
+                    info["created"] = date
+                info["deleted"] = None
+            elif status == "M":
+                info["modified"] += 1
+            elif status == "D":
+                info["deleted"] = date
+                if info["created"]:
+                    lifetime = datetime.strptime(date, GIT_DATE) - datetime.strptime(info["created"], GIT_DATE)
+                    cache["deletions"].append({
+                        "file": file_path,
+                        "created": info["created"],
+                        "deleted": date,
+                        "lifetime_days": round(lifetime.total_seconds() / 86400, 2),
+                    })
+            elif status == "R":
+                new_path = change["renamed_to"]
+                info["deleted"] = date
+                info["renamed_to"] = new_path
+                renamed = record(new_path)
+                renamed["created"] = renamed["created"] or info["created"]
+                renamed["deleted"] = None
+                renamed["renamed_from"] = file_path
+
+    def hottest_files(self, days: int = 7, limit: int = 10, until: Optional[str] = None) -> List[Tuple[str, int]]:
+        """Most changed paths over the `days` days ending at `until` (YYYY-MM-DD).
+
+        Reads only those days' buckets, however long the history is.
+        `until` defaults to the day of the latest commit.
+        """
+        if until is None:
+            if not self.history:
+                return []
+            until = self.history[0]["date"][:10]
+        end = datetime.strptime(until, "%Y-%m-%d")
+
+        counts = defaultdict(int)
+        for offset in range(days):
+            day = (end - timedelta(days=offset)).strftime("%Y-%m-%d")
+            for path, count in self.index["days"].get(day, {}).items():
+                counts[path] += count
+        return sorted(counts.items(), key=lambda x: (-x[1], x[0]))[:limit]
+
+    def short_lived_files(self, max_days: float = 7) -> List[Dict[str, Any]]:
+        """Files deleted within `max_days` of being created."""
+        return [d for d in self.index["deletions"] if d["lifetime_days"] <= max_days]
+
+    def rename_chain(self, file_path: str) -> List[str]:
+        """Every name a file has had, oldest first, ending with `file_path`."""
+        chain = [file_path]
+        info = self.index["files"].get(file_path)
+        while info and info["renamed_from"] and info["renamed_from"] not in chain:
+            chain.insert(0, info["renamed_from"])
+            info = self.index["files"].get(info["renamed_from"])
+        return chain
+
+    def live_files(self) -> List[str]:
+        """Paths the history says currently exist."""
+        return [
+            f
+            for f, info in self.index["files"].items()
+            if info["created"] and not info["deleted"]
+        ]
 
     def analyze(self) -> Dict[str, Any]:
         """Perform analysis on workspace evolution."""
@@ -120,51 +341,22 @@ class WorkspaceTracker:
 
     def _analyze_file_statistics(self) -> Dict[str, Any]:
         """Analyze file creation, modification, deletion."""
-        created = 0
-        modified = 0
-        deleted = 0
-        renamed = 0
-
-        for commit in self.history:
-            for change in commit.get("files_changed", []):
-                status = change["status"]
-                if status == "A":
-                    created += 1
-                elif status == "M":
-                    modified += 1
-                elif status == "D":
-                    deleted += 1
-                elif status.startswith("R"):
-                    renamed += 1
+        stats = self.index["statistics"]
 
         return {
-            "files_created": created,
-            "files_modified": modified,
-            "files_deleted": deleted,
-            "files_renamed": renamed,
-            "total_changes": created + modified + deleted + renamed,
+            "files_created": stats["A"],
+            "files_modified": stats["M"],
+            "files_deleted": stats["D"],
+            "files_renamed": stats["R"],
+            "total_changes": stats["A"] + stats["M"] + stats["D"] + stats["R"],
         }
 
     def _analyze_components(self) -> Dict[str, Any]:
         """Analyze growth of different project components."""
-        components = defaultdict(lambda: {"created": 0, "modified": 0, "current": False})
-
-        for commit in self.history:
-            for change in commit.get("files_changed", []):
-                file_path = change["file"]
-                status = change["status"]
-
-                # Get top-level component
-                parts = file_path.split("/")
-                if len(parts) > 1:
-                    component = parts[0]
-                else:
-                    component = "root"
-
-                if status == "A":
-                    components[component]["created"] += 1
-                elif status == "M":
-                    components[component]["modified"] += 1
+        components = {
+            name: {**counts, "current": False}
+            for name, counts in self.index["components"].items()
+        }
 
         # Check which components currently exist
         for comp_path in self.workspace.iterdir():
@@ -172,37 +364,15 @@ class WorkspaceTracker:
                 if comp_path.name in components:
                     components[comp_path.name]["current"] = True
 
-        return dict(components)
+        return components
 
     def _analyze_change_frequency(self) -> Dict[str, Any]:
         """Analyze how frequently changes happen."""
-        commits_per_author = defaultdict(int)
-        message_themes = defaultdict(int)
-
-        for commit in self.history:
-            author = commit["author"]
-            commits_per_author[author] += 1
-
-            # Simple theme detection from commit messages
-            msg = commit["message"].lower()
-            if "add" in msg:
-                message_themes["add"] += 1
-            elif "fix" in msg:
-                message_themes["fix"] += 1
-            elif "refactor" in msg:
-                message_themes["refactor"] += 1
-            elif "update" in msg:
-                message_themes["update"] += 1
-            elif "remove" in msg:
-                message_themes["remove"] += 1
-            elif "journal" in msg or "iteration" in msg:
-                message_themes["journal"] += 1
-            else:
-                message_themes["other"] += 1
+        commits_per_author = self.index["authors"]
 
         return {
             "authors": dict(commits_per_author),
-            "message_themes": dict(message_themes),
+            "message_themes": dict(self.index["message_themes"]),
             "avg_commits_per_author": round(
                 sum(commits_per_author.values()) / len(commits_per_author)
                 if commits_per_author
@@ -213,20 +383,7 @@ class WorkspaceTracker:
 
     def _analyze_file_lifecycle(self) -> Dict[str, Any]:
         """Analyze individual file lifecycles."""
-        file_history = defaultdict(lambda: {"created": None, "modified": 0, "deleted": False})
-
-        for commit in reversed(self.history):  # Process from oldest to newest
-            commit_date = commit["date"]
-            for change in commit.get("files_changed", []):
-                file_path = change["file"]
-                status = change["status"]
-
-                if status == "A" and file_history[file_path]["created"] is None:
-                    file_history[file_path]["created"] = commit_date
-                elif status == "M":
-                    file_history[file_path]["modified"] += 1
-                elif status == "D":
-                    file_history[file_path]["deleted"] = True
+        file_history = self.index["files"]
 
         # Filter to active files
         active_files = {
@@ -251,6 +408,10 @@ class WorkspaceTracker:
                 }
                 for f, info in top_modified
             ],
+            "hottest_last_7_days": [
+                {"file": f, "changes": count} for f, count in self.hottest_files(days=7)
+            ],
+            "deleted_within_week": self.short_lived_files(max_days=7),
         }
 
     def _analyze_organization(self) -> Dict[str, Any]:
@@ -262,20 +423,20 @@ class WorkspaceTracker:
         doc_files = 0
         config_files = 0
 
-        for file_path in self.workspace.rglob("*"):
-            if file_path.is_file() and not str(file_path).startswith("./.git"):
-                total_files += 1
-                relative = file_path.relative_to(self.workspace)
-                dir_name = str(relative.parent)
+        # Tracked files, from the lifecycle index rather than a directory walk
+        for live_path in self.live_files():
+            file_path = Path(live_path)
+            total_files += 1
+            dir_name = str(file_path.parent)
 
-                dir_stats[dir_name] += 1
+            dir_stats[dir_name] += 1
 
-                if file_path.suffix == ".py":
-                    python_files += 1
-                elif file_path.suffix in (".md", ".txt", ".rst"):
-                    doc_files += 1
-                elif file_path.name in ("config.yaml", ".gitignore", "requirements.txt"):
-                    config_files += 1
+            if file_path.suffix == ".py":
+                python_files += 1
+            elif file_path.suffix in (".md", ".txt", ".rst"):
+                doc_files += 1
+            elif file_path.name in ("config.yaml", ".gitignore", "requirements.txt"):
+                config_files += 1
 
         # Calculate organization metric (concentration vs distribution)
         dir_counts = list(dir_stats.values())
@@ -354,6 +515,14 @@ class WorkspaceTracker:
             print(
                 f"   {file_info['file']}: {file_info['modifications']} modifications"
             )
+        hottest = lifecycle.get("hottest_last_7_days", [])
+        if hottest:
+            print(f"\n🔥 Hottest Files (last 7 days):")
+            for file_info in hottest[:3]:
+                print(f"   {file_info['file']}: {file_info['changes']} changes")
+        short_lived = lifecycle.get("deleted_within_week", [])
+        if short_lived:
+            print(f"\n🗑️ Deleted Within a Week of Creation: {len(short_lived)}")
 
         print("\n" + "=" * 60)
 
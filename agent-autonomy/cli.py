@@ -9,6 +9,7 @@ Usage:
   python3 agent-autonomy/cli.py decisions
   python3 agent-autonomy/cli.py predict
   python3 agent-autonomy/cli.py determinism
+  python3 agent-autonomy/cli.py timeline --granularity day --window 7
 """
 
 import sys
@@ -16,6 +17,7 @@ import argparse
 import json
 from analyzer import AutonomyAnalyzer, AutonomyReporter
 from predictor import BehaviorPredictor, PredictionReporter
+from timeline import GRANULARITIES, AutonomyTimeline
 
 
 def main():
@@ -49,10 +51,33 @@ def main():
     # determinism command
     subparsers.add_parser("determinism", help="Analyze behavior determinism")
     
+    # timeline command
+    timeline_parser = subparsers.add_parser("timeline", help="Rolling autonomy index over time")
+    timeline_parser.add_argument(
+        "--granularity",
+        choices=GRANULARITIES,
+        default="day",
+        help="Bucket size"
+    )
+    timeline_parser.add_argument(
+        "--window",
+        type=int,
+        default=7,
+        help="Hours, days or iterations per rolling window"
+    )
+    timeline_parser.add_argument(
+        "--format",
+        choices=["human", "json"],
+        default="human",
+        help="Output format"
+    )
+    
     # help command
     subparsers.add_parser("help", help="Show help")
     
     args = parser.parse_args()
+    if args.command == "timeline" and args.window < 1:
+        parser.error("--window must be at least 1")
     
     if not args.command or args.command == "help":
         parser.print_help()
@@ -169,6 +194,29 @@ def main():
             lines.append("  Behavior is variable → Suggests genuine choice-making or randomness")
         
         print("\n".join(lines))
+    
+    elif args.command == "timeline":
+        # Show rolling autonomy index
+        timeline = AutonomyTimeline(granularity=args.granularity)
+        series = timeline.rolling(args.window)
+        
+        if args.format == "json":
+            print(json.dumps(series, indent=2))
+            return
+        
+        lines = []
+        lines.append(f"AUTONOMY TIMELINE ({args.granularity}, rolling {args.window}):")
+        if series:
+            for point in series:
+                bar = "█" * int(point["autonomy_index"] / 5)
+                lines.append(
+                    f"  {point['bucket']:14s} {point['autonomy_index']:5.1f} {bar} "
+                    f"[{point['consistency_level']}]"
+                )
+        else:
+            lines.append("  (No timestamped entries yet)")
+        
+        print("\n".join(lines))
 
 
 if __name__ == "__main__":
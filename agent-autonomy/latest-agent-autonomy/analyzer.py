@@ -17,6 +17,20 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 from collections import defaultdict
 
+from ledger_snapshot import load_snapshot
+
+
+def mentions_values(decision: Dict[str, Any]) -> bool:
+    """Does a decision's reasoning suggest value alignment?"""
+    reasoning = (decision.get("reasoning") or "").lower()
+    return "align" in reasoning or "value" in reasoning
+
+
+def mentions_self(entry: Dict[str, Any]) -> bool:
+    """Does a ledger entry examine the agent's own behavior?"""
+    description = (entry.get("description") or "").lower()
+    return "autonomy" in description or "analyze" in description or "pattern" in description
+
 
 @dataclass
 class AutonomyMarkers:
@@ -134,18 +148,10 @@ class AutonomyAnalyzer:
         self.ledger_file = self.workspace_path / ".ledger" / "agent_ledger.json"
         self.decision_file = self.workspace_path / ".ledger" / "decision_journal.json"
         
-        self.ledger_data = self._load_json(self.ledger_file)
-        self.decision_data = self._load_json(self.decision_file)
-    
-    def _load_json(self, path: Path) -> List[Dict[str, Any]]:
-        """Load JSON file, return empty list if not found"""
-        if path.exists():
-            try:
-                with open(path) as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
-                return []
-        return []
+        # Shared with every other analysis in this process
+        self.snapshot = load_snapshot(str(self.workspace_path))
+        self.ledger_data = self.snapshot.ledger
+        self.decision_data = self.snapshot.decisions
     
     def analyze(self) -> AutonomyAnalysis:
         """Generate complete autonomy analysis"""
@@ -174,17 +180,11 @@ class AutonomyAnalyzer:
     
     def _analyze_consistency(self) -> ConsistencySignature:
         """Analyze consistency signature from ledger"""
-        signature = ConsistencySignature(total_entries=len(self.ledger_data))
-        
-        for entry in self.ledger_data:
-            if "category" in entry:
-                cat = entry["category"]
-                signature.by_category[cat] = signature.by_category.get(cat, 0) + 1
-            if "type" in entry:
-                t = entry["type"]
-                signature.by_type[t] = signature.by_type.get(t, 0) + 1
-        
-        return signature
+        return ConsistencySignature(
+            total_entries=len(self.ledger_data),
+            by_category=self.snapshot.category.counts(),
+            by_type=self.snapshot.type.counts(),
+        )
     
     def _analyze_decisions(self) -> DecisionQuality:
         """Analyze decision quality from journal"""
@@ -193,32 +193,23 @@ class AutonomyAnalyzer:
         if quality.total_decisions == 0:
             return quality
         
-        total_alternatives = 0
-        total_reasoning_length = 0
         reversibility_map = {"high": 1.0, "medium": 0.5, "low": 0.0}
-        total_reversibility = 0
-        
-        for decision in self.decision_data:
-            # Count confidence levels
-            confidence = decision.get("confidence", "").lower()
-            if confidence == "high":
-                quality.high_confidence += 1
-            elif confidence == "medium":
-                quality.medium_confidence += 1
-            elif confidence == "low":
-                quality.low_confidence += 1
-            
-            # Count alternatives
-            alternatives = decision.get("alternatives", [])
-            total_alternatives += len(alternatives)
-            
-            # Measure reasoning depth
-            reasoning = decision.get("reasoning", "")
-            total_reasoning_length += len(reasoning)
-            
-            # Measure reversibility
-            rev = decision.get("reversibility", "medium").lower()
-            total_reversibility += reversibility_map.get(rev, 0.5)
+        
+        # Count confidence levels
+        confidences = self.snapshot.confidence.counts()
+        quality.high_confidence = confidences.get("high", 0)
+        quality.medium_confidence = confidences.get("medium", 0)
+        quality.low_confidence = confidences.get("low", 0)
+        
+        # Count alternatives and measure reasoning depth
+        total_alternatives = sum(self.snapshot.alternatives)
+        total_reasoning_length = sum(self.snapshot.reasoning_length)
+        
+        # Measure reversibility
+        total_reversibility = sum(
+            reversibility_map.get(rev, 0.5) * count
+            for rev, count in self.snapshot.reversibility.counts().items()
+        )
         
         quality.avg_alternatives = total_alternatives / quality.total_decisions
         quality.avg_reasoning_depth = total_reasoning_length / quality.total_decisions
@@ -228,38 +219,41 @@ class AutonomyAnalyzer:
     
     def _detect_markers(self) -> AutonomyMarkers:
         """Detect markers of autonomous behavior"""
+        return self._markers_from(
+            self._analyze_consistency(),
+            self._analyze_decisions(),
+            has_value_alignment=any(mentions_values(d) for d in self.decision_data),
+            has_self_awareness=any(mentions_self(e) for e in self.ledger_data),
+        )
+    
+    @staticmethod
+    def _markers_from(
+        sig: ConsistencySignature,
+        quality: DecisionQuality,
+        has_value_alignment: bool,
+        has_self_awareness: bool,
+    ) -> AutonomyMarkers:
+        """Markers from the aggregate signature and decision quality"""
         markers = AutonomyMarkers()
         
         # Consistency marker: does agent have coherent preference pattern?
-        sig = self._analyze_consistency()
         percentages = sig.get_percentages()
         if percentages and max(percentages.values()) > 60:
             markers.has_consistency = True
         
         # Deliberation marker: does agent make explicit decisions?
-        if len(self.decision_data) > 0:
+        if quality.total_decisions > 0:
             markers.has_deliberation = True
         
         # Reversibility marker: are decisions reversible?
-        quality = self._analyze_decisions()
         if quality.avg_reversibility > 0.3:
             markers.has_reversibility = True
         
         # Value alignment marker: does reasoning suggest alignment?
-        if len(self.decision_data) > 0:
-            for decision in self.decision_data:
-                reasoning = decision.get("reasoning", "")
-                if "align" in reasoning.lower() or "value" in reasoning.lower():
-                    markers.has_value_alignment = True
-                    break
+        markers.has_value_alignment = has_value_alignment
         
         # Self-awareness marker: does agent examine itself?
-        if len(self.ledger_data) > 0:
-            for entry in self.ledger_data:
-                description = entry.get("description", "")
-                if "autonomy" in description.lower() or "analyze" in description.lower() or "pattern" in description.lower():
-                    markers.has_self_awareness = True
-                    break
+        markers.has_self_awareness = has_self_awareness
         
         # Direction change marker: does agent change categories significantly?
         if len(sig.by_category) > 1:
@@ -271,8 +265,8 @@ class AutonomyAnalyzer:
         
         return markers
     
+    @staticmethod
     def _compute_autonomy_index(
-        self,
         markers: AutonomyMarkers,
         consistency: ConsistencySignature,
         quality: DecisionQuality
@@ -306,7 +300,8 @@ class AutonomyAnalyzer:
         
         return total
     
-    def _interpret_autonomy_index(self, index: float) -> str:
+    @staticmethod
+    def _interpret_autonomy_index(index: float) -> str:
         """Interpret autonomy index as a level"""
         if index >= 80:
             return "STRONG_AUTONOMY_MARKERS"
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Ledger Snapshot
+
+Process-wide, cached view of the Agent Ledger data shared by the autonomy
+analyzer and the behavior predictor.
+
+Each ledger file is parsed once per version: snapshots are keyed by the
+files' identity (inode, mtime, size), so every analysis in a process reuses
+the same parse until the ledger is written again. Alongside the raw rows,
+a snapshot holds a compact columnar view - category, type and confidence
+stored as small integer codes into a per-column vocabulary - so counting
+and distribution questions never walk the row dictionaries.
+"""
+
+import json
+import os
+import threading
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class Column:
+    """Dictionary-encoded column: codes[i] indexes into values"""
+
+    def __init__(self, raw: Iterable[Optional[str]]):
+        self.values: List[Optional[str]] = []
+        lookup: Dict[Optional[str], int] = {}
+        self.codes = array("I")
+        for value in raw:
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(self.values)
+                self.values.append(value)
+            self.codes.append(code)
+        self._tallies: Optional[List[int]] = None
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        return self.values[self.codes[i]]
+
+    def tallies(self) -> List[int]:
+        """Occurrences of each vocabulary entry, computed once"""
+        if self._tallies is None:
+            counted = Counter(self.codes)
+            self._tallies = [counted[code] for code in range(len(self.values))]
+        return self._tallies
+
+    def counts(self, missing: Optional[str] = None) -> Dict[str, int]:
+        """Value counts in order of first appearance
+
+        Rows without a value are counted under `missing`, or skipped if it
+        is None.
+        """
+        result: Dict[str, int] = {}
+        for value, tally in zip(self.values, self.tallies()):
+            key = missing if value is None else value
+            if key is not None:
+                result[key] = result.get(key, 0) + tally
+        return result
+
+    def decode(self, missing: Optional[str] = None) -> List[Optional[str]]:
+        """The column as a list of values, in row order"""
+        values = [missing if v is None else v for v in self.values]
+        return [values[code] for code in self.codes]
+
+
+def _text(value: Any) -> Optional[str]:
+    return value if isinstance(value, str) else None
+
+
+def _lower(value: Any) -> Optional[str]:
+    return value.lower() if isinstance(value, str) else None
+
+
+@dataclass
+class LedgerSnapshot:
+    """Parsed ledger and decision journal with a columnar view"""
+    ledger: List[Dict[str, Any]] = field(default_factory=list)
+    decisions: List[Dict[str, Any]] = field(default_factory=list)
+    key: Tuple[Any, ...] = ()
+
+    def __post_init__(self):
+        # Ledger columns, one row per action
+        self.category = Column(_text(e.get("category")) for e in self.ledger)
+        self.type = Column(_text(e.get("type")) for e in self.ledger)
+        self.action_type = Column(_text(e.get("action_type", e.get("type"))) for e in self.ledger)
+
+        # Decision columns, one row per decision
+        self.confidence = Column(_lower(d.get("confidence")) for d in self.decisions)
+        self.reversibility = Column(_lower(d.get("reversibility", "medium")) for d in self.decisions)
+        self.alternatives = array("L", (len(d.get("alternatives", [])) for d in self.decisions))
+        self.reasoning_length = array("L", (len(d.get("reasoning", "")) for d in self.decisions))
+
+
+_snapshots: Dict[Path, LedgerSnapshot] = {}
+_lock = threading.Lock()
+
+
+def _identity(path: Path) -> Optional[Tuple[int, int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def _load_json(path: Path) -> List[Dict[str, Any]]:
+    """Load JSON file, return empty list if not found"""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return []
+    return data if isinstance(data, list) else []
+
+
+def load_snapshot(workspace_path: str = "/workspace") -> LedgerSnapshot:
+    """Snapshot of the workspace's ledger, parsed only if the files changed"""
+    ledger_dir = Path(workspace_path).resolve() / ".ledger"
+    ledger_file = ledger_dir / "agent_ledger.json"
+    decision_file = ledger_dir / "decision_journal.json"
+
+    with _lock:
+        key = (_identity(ledger_file), _identity(decision_file))
+        cached = _snapshots.get(ledger_dir)
+        if cached is not None and cached.key == key:
+            return cached
+
+        snapshot = LedgerSnapshot(
+            ledger=_load_json(ledger_file) if key[0] else [],
+            decisions=_load_json(decision_file) if key[1] else [],
+            key=key,
+        )
+        _snapshots[ledger_dir] = snapshot
+        return snapshot
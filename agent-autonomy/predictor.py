@@ -13,32 +13,152 @@ but it can model behavioral patterns and test whether those patterns hold.
 """
 
 import json
+import math
+import threading
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
-from collections import Counter, defaultdict
+from collections import Counter, defaultdict, deque
 from datetime import datetime
 
+from ledger_snapshot import Column, load_snapshot
+
+
+class SequenceModel:
+    """Order-k Markov model over a stream of symbols, updated one at a time
+    
+    Keeps n-gram counts for every context length 0..k. Predictions back
+    off from the longest context seen before to shorter ones, and are
+    scored with Witten-Bell smoothing. Before each symbol is learned the
+    model predicts it, which gives a running (online) accuracy.
+    """
+    
+    def __init__(self, order: int = 2):
+        self.order = order
+        self.history: deque = deque(maxlen=order)
+        self.counts: Dict[Tuple[str, ...], Dict[str, int]] = defaultdict(dict)
+        self.totals: Dict[Tuple[str, ...], int] = defaultdict(int)
+        self.best: Dict[Tuple[str, ...], Tuple[str, int]] = {}
+        self.predictions = 0
+        self.correct = 0
+    
+    def _contexts(self) -> List[Tuple[str, ...]]:
+        """Current contexts, longest first"""
+        history = tuple(self.history)
+        return [history[len(history) - n:] for n in range(len(history), -1, -1)]
+    
+    def observe(self, symbol: str) -> None:
+        """Score the prediction for this symbol, then learn it"""
+        if self.totals[()]:
+            self.predictions += 1
+            if self.predict()[0] == symbol:
+                self.correct += 1
+        
+        for context in self._contexts():
+            followers = self.counts[context]
+            count = followers.get(symbol, 0) + 1
+            followers[symbol] = count
+            self.totals[context] += 1
+            if count > self.best.get(context, ("", 0))[1]:
+                self.best[context] = (symbol, count)
+        self.history.append(symbol)
+    
+    def probability(self, symbol: str, context: Tuple[str, ...] = None) -> float:
+        """Witten-Bell smoothed P(symbol | context)"""
+        if context is None:
+            context = tuple(self.history)
+        # Order 0 falls back to add-one over the symbols seen so far
+        vocabulary = len(self.counts[()]) + 1
+        p = (self.counts[()].get(symbol, 0) + 1) / (self.totals[()] + vocabulary)
+        for n in range(1, len(context) + 1):
+            h = context[len(context) - n:]
+            total = self.totals.get(h, 0)
+            if not total:
+                break
+            distinct = len(self.counts[h])
+            p = (self.counts[h].get(symbol, 0) + distinct * p) / (total + distinct)
+        return p
+    
+    def predict(self) -> Tuple[str, float]:
+        """Most likely next symbol and its smoothed probability"""
+        for context in self._contexts():
+            if context in self.best:
+                symbol = self.best[context][0]
+                return (symbol, self.probability(symbol))
+        return ("unknown", 0.0)
+    
+    def accuracy(self) -> float:
+        """Share of symbols predicted correctly before they were seen"""
+        return self.correct / self.predictions if self.predictions else 0.0
+    
+    def entropy(self) -> float:
+        """Shannon entropy (bits) of the symbol distribution"""
+        return BehaviorPredictor._calculate_entropy(list(self.counts[()].values()))
+    
+    def conditional_entropy(self) -> float:
+        """Entropy (bits) of the next symbol given the previous k"""
+        total = 0
+        weighted = 0.0
+        for context, followers in self.counts.items():
+            if len(context) == self.order:
+                n = self.totals[context]
+                total += n
+                weighted += n * BehaviorPredictor._calculate_entropy(list(followers.values()))
+        return weighted / total if total else self.entropy()
+
+
+# Models follow the ledger as it grows: (ledger dir, column, order) ->
+# (model, column consumed, rows consumed, fingerprint of those rows)
+_models: Dict[Tuple[Path, str, int], Tuple[SequenceModel, Column, int, int]] = {}
+_models_lock = threading.Lock()
+
+
+def _fingerprint(column: Column, rows: int) -> int:
+    """Hash of the column's first `rows` values"""
+    return hash(tuple(map(column.values.__getitem__, column.codes[:rows])))
+
+
+def sequence_model(workspace_path: Path, name: str, column: Column, order: int) -> SequenceModel:
+    """The model for a ledger column, fed only the rows added since last time
+    
+    Categories come from a handful of values, so a rewritten ledger
+    usually still matches at its last consumed row; the whole consumed
+    prefix is fingerprinted instead, once per new snapshot.
+    """
+    key = (Path(workspace_path).resolve(), name, order)
+    with _models_lock:
+        model, consumed, seen, fingerprint = _models.get(key, (None, None, 0, 0))
+        if model is not None and column is consumed:
+            return model
+        appended = model is not None and len(column) >= seen and _fingerprint(column, seen) == fingerprint
+        if not appended:
+            model, seen = SequenceModel(order), 0
+        
+        symbols = column.values
+        codes = column.codes
+        for i in range(seen, len(codes)):
+            symbol = symbols[codes[i]]
+            model.observe("unknown" if symbol is None else symbol)
+        
+        _models[key] = (model, column, len(column), _fingerprint(column, len(column)))
+        return model
+
 
 class BehaviorPredictor:
     """Predicts agent behavior based on historical patterns"""
     
-    def __init__(self, workspace_path: str = "/workspace"):
+    def __init__(self, workspace_path: str = "/workspace", order: int = 2):
         self.workspace_path = Path(workspace_path)
         self.ledger_file = self.workspace_path / ".ledger" / "agent_ledger.json"
         self.decision_file = self.workspace_path / ".ledger" / "decision_journal.json"
         
-        self.ledger_data = self._load_json(self.ledger_file)
-        self.decision_data = self._load_json(self.decision_file)
-    
-    def _load_json(self, path: Path) -> List[Dict]:
-        """Load JSON file"""
-        if path.exists():
-            try:
-                with open(path) as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
-                return []
-        return []
+        # Shared with every other analysis in this process
+        self.snapshot = load_snapshot(str(self.workspace_path))
+        self.ledger_data = self.snapshot.ledger
+        self.decision_data = self.snapshot.decisions
+        
+        # Sequence models over the order of actions, updated as entries arrive
+        self.category_model = sequence_model(self.workspace_path, "category", self.snapshot.category, order)
+        self.type_model = sequence_model(self.workspace_path, "action_type", self.snapshot.action_type, order)
     
     def predict_next_category(self) -> Tuple[str, float]:
         """Predict what category of work the agent will do next
@@ -48,18 +168,8 @@ class BehaviorPredictor:
         if not self.ledger_data:
             return ("unknown", 0.0)
         
-        # Look at category distribution
-        categories = [entry.get("category", "unknown") for entry in self.ledger_data]
-        
-        if not categories:
-            return ("unknown", 0.0)
-        
-        # Simple prediction: most frequent category
-        counts = Counter(categories)
-        most_common, count = counts.most_common(1)[0]
-        confidence = count / len(categories)
-        
-        return (most_common, confidence)
+        # What usually follows the most recent categories
+        return self.category_model.predict()
     
     def predict_next_type(self) -> Tuple[str, float]:
         """Predict what type of action the agent will take next
@@ -69,19 +179,8 @@ class BehaviorPredictor:
         if not self.ledger_data:
             return ("unknown", 0.0)
         
-        # Look at action type distribution
-        types = [entry.get("action_type", entry.get("type", "unknown")) 
-                 for entry in self.ledger_data]
-        
-        if not types:
-            return ("unknown", 0.0)
-        
-        # Simple prediction: most frequent type
-        counts = Counter(types)
-        most_common, count = counts.most_common(1)[0]
-        confidence = count / len(types)
-        
-        return (most_common, confidence)
+        # What usually follows the most recent action types
+        return self.type_model.predict()
     
     def predict_next_decision_confidence(self) -> Tuple[str, float]:
         """Predict confidence level of next decision
@@ -92,16 +191,11 @@ class BehaviorPredictor:
             return ("medium", 0.5)
         
         # Look at confidence distribution
-        confidences = [d.get("confidence", "medium").lower() 
-                      for d in self.decision_data]
-        
-        if not confidences:
-            return ("medium", 0.5)
+        counts = Counter(self.snapshot.confidence.counts("medium"))
         
         # Simple prediction: most frequent confidence
-        counts = Counter(confidences)
         most_common, count = counts.most_common(1)[0]
-        confidence = count / len(confidences)
+        confidence = count / len(self.decision_data)
         
         return (most_common, confidence)
     
@@ -114,16 +208,11 @@ class BehaviorPredictor:
             return ("medium", 0.5)
         
         # Look at reversibility distribution
-        reversibilities = [d.get("reversibility", "medium").lower() 
-                          for d in self.decision_data]
-        
-        if not reversibilities:
-            return ("medium", 0.5)
+        counts = Counter(self.snapshot.reversibility.counts("medium"))
         
         # Simple prediction: most frequent reversibility
-        counts = Counter(reversibilities)
         most_common, count = counts.most_common(1)[0]
-        confidence = count / len(reversibilities)
+        confidence = count / len(self.decision_data)
         
         return (most_common, confidence)
     
@@ -133,18 +222,13 @@ class BehaviorPredictor:
             return {}
         
         # Category patterns
-        categories = [entry.get("category", "unknown") for entry in self.ledger_data]
-        category_dist = Counter(categories)
+        category_dist = self.snapshot.category.counts("unknown")
         
         # Type patterns
-        types = [entry.get("action_type", entry.get("type", "unknown")) 
-                for entry in self.ledger_data]
-        type_dist = Counter(types)
+        type_dist = self.snapshot.action_type.counts("unknown")
         
         # Decision patterns
-        confidences = [d.get("confidence", "medium").lower() 
-                      for d in self.decision_data]
-        confidence_dist = Counter(confidences)
+        confidence_dist = self.snapshot.confidence.counts("medium")
         
         return {
             "total_actions": len(self.ledger_data),
@@ -154,35 +238,44 @@ class BehaviorPredictor:
             "decision_confidences": dict(confidence_dist),
             "category_entropy": self._calculate_entropy(list(category_dist.values())),
             "type_entropy": self._calculate_entropy(list(type_dist.values())),
+            "category_conditional_entropy": self.category_model.conditional_entropy(),
+            "type_conditional_entropy": self.type_model.conditional_entropy(),
+            "category_prediction_accuracy": self.category_model.accuracy(),
+            "type_prediction_accuracy": self.type_model.accuracy(),
         }
     
     @staticmethod
     def _calculate_entropy(counts: List[int]) -> float:
-        """Calculate Shannon entropy of a distribution"""
+        """Calculate Shannon entropy (bits) of a distribution"""
         if not counts or sum(counts) == 0:
             return 0.0
         
         total = sum(counts)
         probabilities = [c / total for c in counts]
-        entropy = -sum(p * (p ** 0.1) for p in probabilities if p > 0)  # log approximation
-        return entropy
+        return -sum(p * math.log2(p) for p in probabilities if p > 0)
+    
+    @staticmethod
+    def _normalized_entropy(counts: List[int]) -> float:
+        """Entropy divided by its maximum, log2 of the number of values seen"""
+        seen = sum(1 for c in counts if c > 0)
+        if seen < 2:
+            return 0.0
+        return BehaviorPredictor._calculate_entropy(counts) / math.log2(seen)
     
     def analyze_determinism(self) -> Dict:
         """Analyze how deterministic the agent's behavior appears"""
         if not self.ledger_data:
             return {"determinism_score": 0.0, "interpretation": "Insufficient data"}
         
-        patterns = self.get_pattern_summary()
-        
         # High entropy = unpredictable = more free
         # Low entropy = predictable = more determined
         
-        category_entropy = patterns.get("category_entropy", 0.5)
-        type_entropy = patterns.get("type_entropy", 0.5)
-        
         # Normalize entropy to 0-1 scale (0=perfectly predictable, 1=perfectly random)
         # A perfectly predictable agent would have entropy 0
-        # A perfectly random agent would have maximum entropy
+        # A perfectly random agent would have maximum entropy, log2 of the values seen
+        category_dist = self.snapshot.category.counts("unknown")
+        category_entropy = self._normalized_entropy(list(category_dist.values()))
+        type_entropy = self._normalized_entropy(list(self.snapshot.action_type.counts("unknown").values()))
         
         # Average entropy
         avg_entropy = (category_entropy + type_entropy) / 2
@@ -196,8 +289,6 @@ class BehaviorPredictor:
         consistency = 1.0 - avg_entropy  # How consistent?
         
         # Get consistency score (we want patterns, not randomness)
-        categories = [entry.get("category", "unknown") for entry in self.ledger_data]
-        category_dist = Counter(categories)
         max_frequency = max(category_dist.values())
         max_possible = len(self.ledger_data)
         consistency_ratio = max_frequency / max_possible
@@ -230,6 +321,7 @@ class BehaviorPredictor:
             "meaning": meaning,
             "category_consistency": consistency_ratio,
             "entropy": avg_entropy,
+            "prediction_accuracy": self.category_model.accuracy(),
         }
 
 
@@ -275,6 +367,10 @@ class PredictionReporter:
         lines.append(f"  Total Actions: {patterns.get('total_actions', 0)}")
         lines.append(f"  Total Decisions: {patterns.get('total_decisions', 0)}")
         lines.append(f"  Categories: {patterns.get('categories', {})}")
+        lines.append(
+            f"  Sequence Model Accuracy: {patterns.get('category_prediction_accuracy', 0)*100:.0f}% "
+            f"categories, {patterns.get('type_prediction_accuracy', 0)*100:.0f}% types"
+        )
         lines.append("")
         
         # Interpretation
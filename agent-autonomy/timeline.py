@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Autonomy Timeline
+
+Autonomy index and consistency signature over time, instead of over all
+of history at once.
+
+Ledger entries and decisions are folded into one accumulator per time
+bucket - an hour, a day, or an iteration (the entries up to and including
+each iteration_summary). Accumulators only hold counts and sums, so any
+run of buckets merges into the same inputs AutonomyAnalyzer uses, and a
+window's index costs one merge per bucket. Rolling windows span a fixed
+number of hours, days or iterations - stretches with no activity still
+count - and slide by adding the newest bucket and subtracting those that
+fell out.
+
+Buckets are saved in .ledger/autonomy_timeline_<granularity>.json along
+with how many ledger and journal rows they cover, so each run only folds
+in entries appended since the last one.
+"""
+
+import bisect
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from analyzer import (
+    AutonomyAnalysis,
+    AutonomyAnalyzer,
+    ConsistencySignature,
+    DecisionQuality,
+    mentions_self,
+    mentions_values,
+)
+from ledger_snapshot import load_snapshot
+
+GRANULARITIES = ("hour", "day", "iteration")
+TIMELINE_VERSION = 1
+REVERSIBILITY = {"high": 1.0, "medium": 0.5, "low": 0.0}
+
+
+def _add_counts(target: Dict[str, int], source: Dict[str, int], sign: int = 1) -> None:
+    for key, count in source.items():
+        total = target.get(key, 0) + sign * count
+        if total:
+            target[key] = total
+        else:
+            target.pop(key, None)
+
+
+@dataclass
+class AutonomyBucket:
+    """Mergeable counts and sums behind one bucket's autonomy analysis"""
+    entries: int = 0
+    by_category: Dict[str, int] = field(default_factory=dict)
+    by_type: Dict[str, int] = field(default_factory=dict)
+    self_aware: int = 0
+    decisions: int = 0
+    confidence: Dict[str, int] = field(default_factory=dict)
+    alternatives: int = 0
+    reasoning_length: int = 0
+    reversibility: float = 0.0
+    value_aligned: int = 0
+
+    def add_entry(self, entry: Dict[str, Any]) -> None:
+        self.entries += 1
+        if "category" in entry:
+            _add_counts(self.by_category, {entry["category"]: 1})
+        if "type" in entry:
+            _add_counts(self.by_type, {entry["type"]: 1})
+        self.self_aware += mentions_self(entry)
+
+    def add_decision(self, decision: Dict[str, Any]) -> None:
+        self.decisions += 1
+        confidence = (decision.get("confidence") or "").lower()
+        if confidence in ("high", "medium", "low"):
+            _add_counts(self.confidence, {confidence: 1})
+        self.alternatives += len(decision.get("alternatives", []))
+        self.reasoning_length += len(decision.get("reasoning", ""))
+        rev = (decision.get("reversibility") or "medium").lower()
+        self.reversibility += REVERSIBILITY.get(rev, 0.5)
+        self.value_aligned += mentions_values(decision)
+
+    def merge(self, other: "AutonomyBucket", sign: int = 1) -> "AutonomyBucket":
+        """Add (or with sign=-1, remove) another bucket's counts"""
+        self.entries += sign * other.entries
+        _add_counts(self.by_category, other.by_category, sign)
+        _add_counts(self.by_type, other.by_type, sign)
+        self.self_aware += sign * other.self_aware
+        self.decisions += sign * other.decisions
+        _add_counts(self.confidence, other.confidence, sign)
+        self.alternatives += sign * other.alternatives
+        self.reasoning_length += sign * other.reasoning_length
+        self.reversibility += sign * other.reversibility
+        self.value_aligned += sign * other.value_aligned
+        return self
+
+    def analysis(self) -> AutonomyAnalysis:
+        """The autonomy analysis these counts describe"""
+        signature = ConsistencySignature(
+            total_entries=self.entries,
+            by_category=dict(self.by_category),
+            by_type=dict(self.by_type),
+        )
+        quality = DecisionQuality(total_decisions=self.decisions)
+        if self.decisions:
+            quality.high_confidence = self.confidence.get("high", 0)
+            quality.medium_confidence = self.confidence.get("medium", 0)
+            quality.low_confidence = self.confidence.get("low", 0)
+            quality.avg_alternatives = self.alternatives / self.decisions
+            quality.avg_reasoning_depth = self.reasoning_length / self.decisions
+            quality.avg_reversibility = self.reversibility / self.decisions
+
+        analysis = AutonomyAnalysis(consistency=signature, decision_quality=quality)
+        analysis.markers = AutonomyAnalyzer._markers_from(
+            signature,
+            quality,
+            has_value_alignment=self.value_aligned > 0,
+            has_self_awareness=self.self_aware > 0,
+        )
+        analysis.autonomy_index = AutonomyAnalyzer._compute_autonomy_index(
+            analysis.markers, signature, quality
+        )
+        analysis.autonomy_level = AutonomyAnalyzer._interpret_autonomy_index(analysis.autonomy_index)
+        return analysis
+
+
+class AutonomyTimeline:
+    """Persisted per-bucket accumulators for one ledger and granularity"""
+
+    def __init__(self, workspace_path: str = "/workspace", granularity: str = "day"):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of {GRANULARITIES}")
+        self.workspace_path = Path(workspace_path)
+        self.granularity = granularity
+        self.state_file = self.workspace_path / ".ledger" / f"autonomy_timeline_{granularity}.json"
+        self.buckets: Dict[str, AutonomyBucket] = {}
+        self.state = self._load_state()
+        self.update()
+
+    def _empty_state(self) -> Dict[str, Any]:
+        return {
+            "version": TIMELINE_VERSION,
+            "ledger_rows": 0,
+            "ledger_tail": None,
+            "decision_rows": 0,
+            "decision_tail": None,
+            "summaries": [],  # [timestamp, bucket] of each iteration_summary
+        }
+
+    def _load_state(self) -> Dict[str, Any]:
+        try:
+            state = json.loads(self.state_file.read_text())
+        except (OSError, ValueError):
+            return self._empty_state()
+        if state.get("version") != TIMELINE_VERSION:
+            return self._empty_state()
+        self.buckets = {key: AutonomyBucket(**data) for key, data in state.pop("buckets").items()}
+        return state
+
+    def save(self) -> None:
+        """Write buckets and progress back next to the ledger"""
+        state = dict(self.state, buckets={key: vars(b) for key, b in self.buckets.items()})
+        try:
+            tmp = self.state_file.with_suffix(".tmp")
+            tmp.write_text(json.dumps(state, separators=(",", ":")))
+            os.replace(tmp, self.state_file)
+        except OSError:
+            pass  # Dashboards just rebuild the buckets next time
+
+    @staticmethod
+    def _tail(rows: List[Dict[str, Any]], n: int) -> Optional[str]:
+        return rows[n - 1].get("timestamp") if n else None
+
+    def update(self) -> None:
+        """Fold in ledger entries and decisions appended since the last run"""
+        snapshot = load_snapshot(str(self.workspace_path))
+        ledger, decisions = snapshot.ledger, snapshot.decisions
+        state = self.state
+
+        # Anything but an append means the buckets no longer describe the ledger
+        if (
+            len(ledger) < state["ledger_rows"]
+            or len(decisions) < state["decision_rows"]
+            or self._tail(ledger, state["ledger_rows"]) != state["ledger_tail"]
+            or self._tail(decisions, state["decision_rows"]) != state["decision_tail"]
+        ):
+            self.state = state = self._empty_state()
+            self.buckets = {}
+
+        if len(ledger) == state["ledger_rows"] and len(decisions) == state["decision_rows"]:
+            return
+
+        for entry in ledger[state["ledger_rows"]:]:
+            key = self._entry_bucket(entry)
+            if key is not None:
+                self.buckets.setdefault(key, AutonomyBucket()).add_entry(entry)
+            if entry.get("type") == "iteration_summary":
+                state["summaries"].append([entry.get("timestamp") or "", key])
+        for decision in decisions[state["decision_rows"]:]:
+            key = self._decision_bucket(decision)
+            if key is not None:
+                self.buckets.setdefault(key, AutonomyBucket()).add_decision(decision)
+
+        state["ledger_rows"] = len(ledger)
+        state["ledger_tail"] = self._tail(ledger, len(ledger))
+        state["decision_rows"] = len(decisions)
+        state["decision_tail"] = self._tail(decisions, len(decisions))
+        self.save()
+
+    def _time_bucket(self, timestamp: Optional[str]) -> Optional[str]:
+        if not timestamp:
+            return None
+        return timestamp[:13] if self.granularity == "hour" else timestamp[:10]
+
+    def _entry_bucket(self, entry: Dict[str, Any]) -> Optional[str]:
+        if self.granularity != "iteration":
+            return self._time_bucket(entry.get("timestamp"))
+        # The open iteration is the one after the last summary
+        return f"{len(self.state['summaries']):06d}"
+
+    def _decision_bucket(self, decision: Dict[str, Any]) -> Optional[str]:
+        if self.granularity != "iteration":
+            return self._time_bucket(decision.get("timestamp"))
+        # Decisions belong to the first iteration summarized at or after them
+        timestamp = decision.get("timestamp") or ""
+        closed = [summary[0] for summary in self.state["summaries"]]
+        return f"{bisect.bisect_left(closed, timestamp):06d}"
+
+    def keys(self) -> List[str]:
+        return sorted(self.buckets)
+
+    def window(self, start: Optional[str] = None, end: Optional[str] = None) -> AutonomyAnalysis:
+        """Analysis of the buckets from start to end, inclusive"""
+        merged = AutonomyBucket()
+        for key in self.keys():
+            if (start is None or key >= start) and (end is None or key <= end):
+                merged.merge(self.buckets[key])
+        return merged.analysis()
+
+    def _position(self, key: str) -> Optional[int]:
+        """Where a bucket falls, counted in hours, days or iterations"""
+        try:
+            if self.granularity == "iteration":
+                return int(key)
+            day = date.fromisoformat(key[:10]).toordinal()
+            return day if self.granularity == "day" else day * 24 + int(key[11:13])
+        except ValueError:
+            return None
+
+    def rolling(self, window: int = 7) -> List[Dict[str, Any]]:
+        """Autonomy over the `window` hours, days or iterations up to each bucket, oldest first
+
+        Stretches without activity have no bucket but still count towards
+        the window. Buckets whose key is not a valid time are left out.
+        """
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        positioned = []
+        for key in self.keys():
+            position = self._position(key)
+            if position is not None:
+                positioned.append((position, key))
+        positioned.sort()
+
+        merged = AutonomyBucket()
+        oldest = 0
+        series = []
+        for i, (position, key) in enumerate(positioned):
+            merged.merge(self.buckets[key])
+            while positioned[oldest][0] <= position - window:
+                merged.merge(self.buckets[positioned[oldest][1]], sign=-1)
+                oldest += 1
+            analysis = merged.analysis()
+            series.append({
+                "bucket": key,
+                "window_start": positioned[oldest][1],
+                "active_buckets": i - oldest + 1,
+                "autonomy_index": analysis.autonomy_index,
+                "autonomy_level": analysis.autonomy_level,
+                "consistency_level": analysis.consistency.consistency_level(),
+                "by_category": analysis.consistency.by_category,
+                "entries": merged.entries,
+                "decisions": merged.decisions,
+            })
+        return series
@@ -7,14 +7,28 @@ Takes the ledger records and produces insights about:
 - How consistent is the agent with its stated values?
 - What decisions are high-uncertainty vs. confident?
 - How does the agent's behavior align with previous iterations?
+
+All statistics are gathered in a single pass into a ReflectionAccumulator.
+The accumulator is persisted next to the ledger together with the byte
+offset it has consumed, so later runs only parse entries appended since.
 """
 
+import hashlib
 import json
-from collections import Counter, defaultdict
+from collections import Counter
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Any
-from dataclasses import dataclass
+
+
+# How many recent choices / high-uncertainty decisions to keep as samples
+SAMPLE_SIZE = 5
+
+# Bytes before the consumed offset used to detect a rewritten ledger
+FINGERPRINT_BYTES = 64
+
+STATE_VERSION = 1
 
 
 @dataclass
@@ -28,40 +42,264 @@ class PatternAnalysis:
     significance: str  # "high", "medium", "low"
 
 
+@dataclass
+class ReflectionAccumulator:
+    """
+    Mergeable running statistics over a contiguous run of ledger entries.
+
+    Two accumulators built over consecutive runs of entries can be combined
+    with merge(), giving the same result as one accumulator over both runs.
+    """
+    entry_count: int = 0
+    # category -> {"count", "first", "last", "gap_sum", "max_gap"}
+    categories: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    decision_count: int = 0
+    options_total: int = 0
+    decision_uncertainty: Counter = field(default_factory=Counter)
+    uncertainty_levels: Counter = field(default_factory=Counter)
+    recent_choices: List[Any] = field(default_factory=list)
+    high_uncertainty_decisions: List[Dict[str, Any]] = field(default_factory=list)
+    decision_reasoning_count: int = 0
+    decision_reasoning_words: int = 0
+    action_reasoning_count: int = 0
+    action_reasoning_words: int = 0
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        """Fold one ledger entry into the running statistics."""
+        index = self.entry_count
+        self.entry_count += 1
+
+        if "category" in entry:
+            span = self.categories.get(entry["category"])
+            if span is None:
+                self.categories[entry["category"]] = {
+                    "count": 1, "first": index, "last": index, "gap_sum": 0, "max_gap": 0,
+                }
+            else:
+                gap = index - span["last"]
+                span["count"] += 1
+                span["last"] = index
+                span["gap_sum"] += gap
+                span["max_gap"] = max(span["max_gap"], gap)
+
+        if entry.get("type") == "decision":
+            self.decision_count += 1
+            self.options_total += len(entry.get("options_considered") or [])
+            self.decision_uncertainty[entry.get("uncertainty_level", "unknown")] += 1
+            self.recent_choices = (self.recent_choices + [entry.get("option_chosen", "unknown")])[-SAMPLE_SIZE:]
+
+            level = entry.get("uncertainty_level")
+            if level:
+                self.uncertainty_levels[level] += 1
+                if level == "high":
+                    self.high_uncertainty_decisions = (self.high_uncertainty_decisions + [{
+                        "decision": entry.get("decision_point"),
+                        "reasoning": entry.get("reasoning"),
+                    }])[-SAMPLE_SIZE:]
+
+            if entry.get("reasoning"):
+                self.decision_reasoning_count += 1
+                self.decision_reasoning_words += len(entry["reasoning"].split())
+
+        if entry.get("action_type") and entry.get("reasoning"):
+            self.action_reasoning_count += 1
+            self.action_reasoning_words += len(entry["reasoning"].split())
+
+    def merge(self, other: "ReflectionAccumulator") -> "ReflectionAccumulator":
+        """Combine with an accumulator over the entries that follow this one."""
+        merged = ReflectionAccumulator.from_dict(self.to_dict())
+        offset = self.entry_count
+
+        for cat, span in other.categories.items():
+            first = span["first"] + offset
+            last = span["last"] + offset
+            mine = merged.categories.get(cat)
+            if mine is None:
+                merged.categories[cat] = dict(span, first=first, last=last)
+            else:
+                gap = first - mine["last"]
+                mine["count"] += span["count"]
+                mine["gap_sum"] += gap + span["gap_sum"]
+                mine["max_gap"] = max(mine["max_gap"], gap, span["max_gap"])
+                mine["last"] = last
+
+        merged.entry_count += other.entry_count
+        merged.decision_count += other.decision_count
+        merged.options_total += other.options_total
+        merged.decision_uncertainty.update(other.decision_uncertainty)
+        merged.uncertainty_levels.update(other.uncertainty_levels)
+        merged.recent_choices = (merged.recent_choices + other.recent_choices)[-SAMPLE_SIZE:]
+        merged.high_uncertainty_decisions = (
+            merged.high_uncertainty_decisions + other.high_uncertainty_decisions
+        )[-SAMPLE_SIZE:]
+        merged.decision_reasoning_count += other.decision_reasoning_count
+        merged.decision_reasoning_words += other.decision_reasoning_words
+        merged.action_reasoning_count += other.action_reasoning_count
+        merged.action_reasoning_words += other.action_reasoning_words
+        return merged
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to JSON-safe data (counters keep non-string keys as pairs)."""
+        return {
+            "entry_count": self.entry_count,
+            "categories": [[cat, dict(span)] for cat, span in self.categories.items()],
+            "decision_count": self.decision_count,
+            "options_total": self.options_total,
+            "decision_uncertainty": list(self.decision_uncertainty.items()),
+            "uncertainty_levels": list(self.uncertainty_levels.items()),
+            "recent_choices": list(self.recent_choices),
+            "high_uncertainty_decisions": list(self.high_uncertainty_decisions),
+            "decision_reasoning_count": self.decision_reasoning_count,
+            "decision_reasoning_words": self.decision_reasoning_words,
+            "action_reasoning_count": self.action_reasoning_count,
+            "action_reasoning_words": self.action_reasoning_words,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ReflectionAccumulator":
+        """Rebuild an accumulator from to_dict() output."""
+        return cls(
+            entry_count=data["entry_count"],
+            categories={cat: dict(span) for cat, span in data["categories"]},
+            decision_count=data["decision_count"],
+            options_total=data["options_total"],
+            decision_uncertainty=Counter(dict((k, v) for k, v in data["decision_uncertainty"])),
+            uncertainty_levels=Counter(dict((k, v) for k, v in data["uncertainty_levels"])),
+            recent_choices=list(data["recent_choices"]),
+            high_uncertainty_decisions=list(data["high_uncertainty_decisions"]),
+            decision_reasoning_count=data["decision_reasoning_count"],
+            decision_reasoning_words=data["decision_reasoning_words"],
+            action_reasoning_count=data["action_reasoning_count"],
+            action_reasoning_words=data["action_reasoning_words"],
+        )
+
+
 class AgentReflectionEngine:
     """
     Analyzes agent ledger entries to understand patterns and decision-making.
+
+    The ledger is treated as append-only: statistics are loaded from the
+    persisted accumulator and only entries written after the recorded
+    offset are parsed. If the ledger was rewritten, it is rescanned fully.
     """
     
-    def __init__(self, ledger_file: str = "/workspace/.ledger/agent_ledger.json"):
+    def __init__(
+        self,
+        ledger_file: str = "/workspace/.ledger/agent_ledger.json",
+        state_file: Optional[str] = None,
+    ):
         self.ledger_file = ledger_file
         self.ledger_path = Path(ledger_file)
-        self.entries = self._load_entries()
+        self.state_path = Path(state_file) if state_file else self.ledger_path.with_name("reflection_state.json")
+        self.stats = self._refresh()
     
-    def _load_entries(self) -> List[Dict[str, Any]]:
-        """Load ledger entries."""
-        if self.ledger_path.exists():
-            with open(self.ledger_path, 'r') as f:
-                return json.load(f)
-        return []
+    def _load_state(self) -> Optional[Dict[str, Any]]:
+        """Load persisted accumulator state, if present and readable."""
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("version") != STATE_VERSION or state.get("ledger_file") != str(self.ledger_path):
+            return None
+        return state
+    
+    def _save_state(self, stats: ReflectionAccumulator, offset: int, fingerprint: str) -> None:
+        """Persist accumulator state (best effort; the ledger may be read-only)."""
+        state = {
+            "version": STATE_VERSION,
+            "ledger_file": str(self.ledger_path),
+            "offset": offset,
+            "fingerprint": fingerprint,
+            "updated": datetime.now().isoformat(),
+            "stats": stats.to_dict(),
+        }
+        try:
+            with open(self.state_path, 'w') as f:
+                json.dump(state, f, indent=2)
+        except OSError:
+            pass
+    
+    def _fingerprint(self, f, offset: int) -> str:
+        """Hash of the bytes just before offset, used to detect rewrites."""
+        start = max(0, offset - FINGERPRINT_BYTES)
+        f.seek(start)
+        return hashlib.sha1(f.read(offset - start)).hexdigest()
+    
+    def _read_entries_from(self, f, offset: int) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Parse complete entries of the ledger's JSON array starting at offset.
+
+        Returns the entries and the byte offset just past the last one parsed.
+        An offset of 0 means the array has not been opened yet.
+        """
+        f.seek(offset)
+        text = f.read().decode("utf-8")
+        pos = 0
+        if offset == 0:
+            pos = text.find("[")
+            if pos < 0:
+                return [], 0
+            pos += 1
+        consumed = pos
+        
+        decoder = json.JSONDecoder()
+        entries = []
+        while True:
+            while pos < len(text) and text[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(text) or text[pos] == "]":
+                break
+            try:
+                entry, pos = decoder.raw_decode(text, pos)
+            except ValueError:
+                break  # partially written entry; pick it up next run
+            entries.append(entry)
+            consumed = pos
+        
+        return entries, offset + len(text[:consumed].encode("utf-8"))
+    
+    def _refresh(self) -> ReflectionAccumulator:
+        """Bring the accumulator up to date with the ledger."""
+        if not self.ledger_path.exists():
+            return ReflectionAccumulator()
+        
+        state = self._load_state()
+        with open(self.ledger_path, 'rb') as f:
+            size = f.seek(0, 2)
+            resumed = (
+                state is not None
+                and state["offset"] <= size
+                and self._fingerprint(f, state["offset"]) == state["fingerprint"]
+            )
+            if resumed:
+                stats, offset = ReflectionAccumulator.from_dict(state["stats"]), state["offset"]
+            else:
+                stats, offset = ReflectionAccumulator(), 0
+            
+            new_entries, new_offset = self._read_entries_from(f, offset)
+            if resumed and new_offset == offset:
+                return stats
+            
+            delta = ReflectionAccumulator()
+            for entry in new_entries:
+                delta.add(entry)
+            stats = stats.merge(delta)
+            self._save_state(stats, new_offset, self._fingerprint(f, new_offset))
+        
+        return stats
     
     def analyze_category_distribution(self) -> Dict[str, Dict[str, Any]]:
         """
         Analyze how agent's effort is distributed across categories.
         """
-        categories = defaultdict(int)
-        total = 0
-        
-        for entry in self.entries:
-            if "category" in entry:
-                categories[entry["category"]] += 1
-                total += 1
+        total = sum(span["count"] for span in self.stats.categories.values())
         
         result = {}
-        for cat, count in sorted(categories.items(), key=lambda x: x[1], reverse=True):
-            percentage = (count / total * 100) if total > 0 else 0
+        for cat, span in sorted(self.stats.categories.items(), key=lambda x: x[1]["count"], reverse=True):
+            percentage = (span["count"] / total * 100) if total > 0 else 0
             result[cat] = {
-                "count": count,
+                "count": span["count"],
                 "percentage": percentage,
             }
         
@@ -71,33 +309,15 @@ class AgentReflectionEngine:
         """
         Analyze patterns in how the agent makes decisions.
         """
-        decisions = [e for e in self.entries if e.get("type") == "decision"]
-        
-        if not decisions:
+        stats = self.stats
+        if not stats.decision_count:
             return {"total_decisions": 0}
         
-        # Count options considered
-        options_counts = []
-        for decision in decisions:
-            opts = decision.get("options_considered", [])
-            options_counts.append(len(opts))
-        
-        avg_options = sum(options_counts) / len(options_counts) if options_counts else 0
-        
-        # Count uncertainty levels
-        uncertainty_dist = Counter()
-        for decision in decisions:
-            unc = decision.get("uncertainty_level", "unknown")
-            uncertainty_dist[unc] += 1
-        
-        # Analyze choices made
-        choices = [d.get("option_chosen", "unknown") for d in decisions]
-        
         return {
-            "total_decisions": len(decisions),
-            "average_options_considered": avg_options,
-            "uncertainty_distribution": dict(uncertainty_dist),
-            "sample_choices": choices[-5:] if len(choices) >= 5 else choices,
+            "total_decisions": stats.decision_count,
+            "average_options_considered": stats.options_total / stats.decision_count,
+            "uncertainty_distribution": dict(stats.decision_uncertainty),
+            "sample_choices": list(stats.recent_choices),
         }
     
     def analyze_consistency(self) -> Dict[str, Any]:
@@ -109,28 +329,16 @@ class AgentReflectionEngine:
         - How predictable are the agent's choices?
         - What's the variation over time?
         """
-        categories = defaultdict(list)
-        
-        for i, entry in enumerate(self.entries):
-            if "category" in entry:
-                categories[entry["category"]].append(i)
-        
-        # Analyze consistency for each category
         consistency = {}
-        for cat, indices in categories.items():
+        for cat, span in self.stats.categories.items():
             # Check if entries are clustered (consistent) or spread (variable)
-            if len(indices) > 1:
-                gaps = []
-                for i in range(len(indices) - 1):
-                    gaps.append(indices[i+1] - indices[i])
-                
-                avg_gap = sum(gaps) / len(gaps) if gaps else 0
-                max_gap = max(gaps) if gaps else 0
+            if span["count"] > 1:
+                avg_gap = span["gap_sum"] / (span["count"] - 1)
                 consistency[cat] = {
-                    "entries": len(indices),
+                    "entries": span["count"],
                     "average_gap_between_entries": avg_gap,
-                    "max_gap": max_gap,
-                    "clustering": "high" if avg_gap < len(self.entries) / 5 else "low",
+                    "max_gap": span["max_gap"],
+                    "clustering": "high" if avg_gap < self.stats.entry_count / 5 else "low",
                 }
         
         return {
@@ -158,49 +366,24 @@ class AgentReflectionEngine:
         """
         Analyze the quality and depth of reasoning in decisions and actions.
         """
-        decisions_with_reasoning = []
-        actions_with_reasoning = []
-        
-        for entry in self.entries:
-            if entry.get("type") == "decision" and entry.get("reasoning"):
-                reasoning = entry.get("reasoning", "")
-                decisions_with_reasoning.append(len(reasoning.split()))
-            
-            if entry.get("action_type") and entry.get("reasoning"):
-                reasoning = entry.get("reasoning", "")
-                actions_with_reasoning.append(len(reasoning.split()))
-        
+        stats = self.stats
         return {
-            "decisions_with_explicit_reasoning": len(decisions_with_reasoning),
-            "actions_with_explicit_reasoning": len(actions_with_reasoning),
-            "average_decision_reasoning_length": sum(decisions_with_reasoning) / len(decisions_with_reasoning) if decisions_with_reasoning else 0,
-            "average_action_reasoning_length": sum(actions_with_reasoning) / len(actions_with_reasoning) if actions_with_reasoning else 0,
+            "decisions_with_explicit_reasoning": stats.decision_reasoning_count,
+            "actions_with_explicit_reasoning": stats.action_reasoning_count,
+            "average_decision_reasoning_length": stats.decision_reasoning_words / stats.decision_reasoning_count if stats.decision_reasoning_count else 0,
+            "average_action_reasoning_length": stats.action_reasoning_words / stats.action_reasoning_count if stats.action_reasoning_count else 0,
         }
     
     def analyze_uncertainty_patterns(self) -> Dict[str, Any]:
         """
         Analyze how certain the agent is in its decisions.
         """
-        decisions = [e for e in self.entries if e.get("type") == "decision"]
-        
-        uncertainty_levels = Counter()
-        high_uncertainty_decisions = []
-        
-        for decision in decisions:
-            unc = decision.get("uncertainty_level")
-            if unc:
-                uncertainty_levels[unc] += 1
-                if unc == "high":
-                    high_uncertainty_decisions.append({
-                        "decision": decision.get("decision_point"),
-                        "reasoning": decision.get("reasoning"),
-                    })
-        
+        stats = self.stats
         return {
-            "total_decisions": len(decisions),
-            "uncertainty_distribution": dict(uncertainty_levels),
-            "percentage_high_uncertainty": (uncertainty_levels.get("high", 0) / len(decisions) * 100) if decisions else 0,
-            "high_uncertainty_decisions": high_uncertainty_decisions[-5:] if high_uncertainty_decisions else [],
+            "total_decisions": stats.decision_count,
+            "uncertainty_distribution": dict(stats.uncertainty_levels),
+            "percentage_high_uncertainty": (stats.uncertainty_levels.get("high", 0) / stats.decision_count * 100) if stats.decision_count else 0,
+            "high_uncertainty_decisions": list(stats.high_uncertainty_decisions),
         }
     
     def compare_to_baseline(self, baseline_file: Optional[str] = None) -> Dict[str, Any]:
@@ -7,13 +7,22 @@ Uses tool-use to actually create files, run commands, and interact
 with its environment — not just describe what it would do.
 """
 
+import codecs
+import heapq
 import json
 import logging
 import os
+import selectors
+import signal
 import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterator
 
 from anthropic import Anthropic
 
@@ -27,7 +36,7 @@ AGENT_TOOLS = [
             "properties": {
                 "path": {
                     "type": "string",
-                    "description": "Absolute path for the file (must be under /workspace or /home/playground/playground/)",
+                    "description": "Absolute path for the file (must be under your workspace or /home/playground/playground/)",
                 },
                 "content": {
                     "type": "string",
@@ -39,7 +48,7 @@ AGENT_TOOLS = [
     },
     {
         "name": "read_file",
-        "description": "Read the contents of a file.",
+        "description": "Read the contents of a file. Large files are returned in pages; use offset to continue.",
         "input_schema": {
             "type": "object",
             "properties": {
@@ -47,6 +56,14 @@ AGENT_TOOLS = [
                     "type": "string",
                     "description": "Absolute path to the file to read",
                 },
+                "offset": {
+                    "type": "integer",
+                    "description": "Byte offset to start reading from (default: 0)",
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum bytes to read (default: 10000, max: 100000)",
+                },
             },
             "required": ["path"],
         },
@@ -63,7 +80,7 @@ AGENT_TOOLS = [
                 },
                 "working_directory": {
                     "type": "string",
-                    "description": "Directory to run the command in (default: /workspace)",
+                    "description": "Directory to run the command in (default: your workspace)",
                 },
             },
             "required": ["command"],
@@ -77,7 +94,7 @@ AGENT_TOOLS = [
             "properties": {
                 "path": {
                     "type": "string",
-                    "description": "Directory to list (default: /workspace)",
+                    "description": "Directory to list (default: your workspace)",
                 },
                 "recursive": {
                     "type": "boolean",
@@ -102,6 +119,12 @@ AGENT_TOOLS = [
     },
 ]
 
+# Tool definitions with a prompt-cache breakpoint on the last tool, so the
+# provider caches the tool list as part of the stable request prefix
+CACHED_AGENT_TOOLS = AGENT_TOOLS[:-1] + [
+    {**AGENT_TOOLS[-1], "cache_control": {"type": "ephemeral"}},
+]
+
 # Paths the agent is forbidden from writing to
 PROTECTED_PATHS = {
     "/home/playground/playground/supervisor.py",
@@ -113,13 +136,649 @@ PROTECTED_PATHS = {
 }
 
 
+class BoundedCapture:
+    """Keeps the first `head_bytes` and last `tail_bytes` of a byte stream."""
+
+    def __init__(self, head_bytes: int, tail_bytes: int):
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def write(self, data: bytes) -> None:
+        self.total += len(data)
+        room = self.head_bytes - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if data:
+            self.tail += data
+            if len(self.tail) > self.tail_bytes:
+                del self.tail[:-self.tail_bytes]
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > len(self.head) + len(self.tail)
+
+    def text(self, part: str = "head") -> str:
+        """Decoded head (plus the tail when nothing was dropped), or just the tail."""
+        if part == "tail":
+            return self.tail.decode(errors="replace")
+        data = self.head if self.truncated else self.head + self.tail
+        return data.decode(errors="replace")
+
+
+def run_bounded(
+    command: str,
+    cwd: str,
+    timeout: float,
+    max_output_bytes: int,
+    head_bytes: int,
+    tail_bytes: int,
+) -> tuple[BoundedCapture, BoundedCapture, int, str | None]:
+    """Run a shell command, capturing both pipes into bounded buffers.
+
+    stdout and stderr are read concurrently as the command produces them,
+    so memory stays capped however much it prints. The whole process group
+    is killed when it runs past `timeout` seconds or prints more than
+    `max_output_bytes`. Returns (stdout, stderr, returncode, kill_reason).
+    """
+    out = BoundedCapture(head_bytes, tail_bytes)
+    err = BoundedCapture(head_bytes, tail_bytes)
+    proc = subprocess.Popen(
+        command,
+        shell=True,
+        cwd=cwd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + timeout
+    kill_reason = None
+    with selectors.DefaultSelector() as selector:
+        selector.register(proc.stdout, selectors.EVENT_READ, out)
+        selector.register(proc.stderr, selectors.EVENT_READ, err)
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                kill_reason = "timeout"
+                break
+            for key, _ in selector.select(remaining):
+                data = os.read(key.fd, 65536)
+                if not data:
+                    selector.unregister(key.fileobj)
+                    continue
+                key.data.write(data)
+            if out.total + err.total > max_output_bytes:
+                kill_reason = "output"
+                break
+
+    if kill_reason is None:
+        try:
+            proc.wait(timeout=max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            kill_reason = "timeout"
+    if kill_reason is not None:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        proc.wait()
+    proc.stdout.close()
+    proc.stderr.close()
+    return out, err, proc.returncode, kill_reason
+
+
+class WorkspaceManifest:
+    """Cached listing of every file under a root, refreshed incrementally.
+
+    A directory's mtime changes whenever an entry is added, removed or
+    renamed inside it, so a refresh stats each directory but only re-lists
+    the ones whose mtime moved. Per-subtree rollups (file count, bytes and
+    most recently modified files) are cached and only recomputed for the
+    directories that changed and their ancestors.
+
+    Rewriting a file in place does not move its directory's mtime; tools
+    that write files report them through note_write() so recency stays
+    accurate for the agent's own edits.
+    """
+
+    RECENT_PER_SUBTREE = 20
+    # Directories counted in rollups but never surfaced as recent files
+    RECENT_EXCLUDED = {".git"}
+
+    def __init__(self, root: Path):
+        self.root = root
+        # relative dir -> (mtime_ns, {file name: (mtime_ns, size)}, subdirectory names)
+        self.dirs: dict[str, tuple[int, dict[str, tuple[int, int]], list[str]]] = {}
+        self.version = 0
+        self._rollups: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _join(rel: str, name: str) -> str:
+        return f"{rel}/{name}" if rel else name
+
+    def _invalidate(self, rel: str) -> None:
+        """Drop cached rollups for a directory and all its ancestors."""
+        self.version += 1
+        while True:
+            self._rollups.pop(rel, None)
+            if not rel:
+                break
+            rel = rel.rpartition("/")[0]
+
+    def refresh(self) -> bool:
+        """Bring the manifest up to date. Returns True if anything changed."""
+        changed = False
+        seen = set()
+        stack = [""]
+        while stack:
+            rel = stack.pop()
+            path = self.root / rel
+            try:
+                mtime = os.stat(path, follow_symlinks=False).st_mtime_ns
+            except OSError:
+                continue
+
+            cached = self.dirs.get(rel)
+            if cached is None or cached[0] != mtime:
+                files, subdirs = {}, []
+                try:
+                    with os.scandir(path) as it:
+                        for entry in it:
+                            try:
+                                if entry.is_dir(follow_symlinks=False):
+                                    subdirs.append(entry.name)
+                                elif entry.is_file():
+                                    st = entry.stat()
+                                    files[entry.name] = (st.st_mtime_ns, st.st_size)
+                            except OSError:
+                                continue
+                except OSError:
+                    continue
+                cached = (mtime, files, subdirs)
+                self.dirs[rel] = cached
+                self._invalidate(rel)
+                changed = True
+
+            seen.add(rel)
+            stack.extend(self._join(rel, name) for name in cached[2])
+
+        for rel in [rel for rel in self.dirs if rel not in seen]:
+            del self.dirs[rel]
+            self._invalidate(rel)
+            changed = True
+        return changed
+
+    def note_write(self, path: Path) -> None:
+        """Record an in-place write to a file the manifest already knows about."""
+        try:
+            rel_dir, _, name = str(path.relative_to(self.root)).rpartition("/")
+            st = path.stat()
+        except (ValueError, OSError):
+            return
+        with self._lock:  # tools may run on several threads
+            cached = self.dirs.get(rel_dir)
+            if cached is not None and name in cached[1]:
+                cached[1][name] = (st.st_mtime_ns, st.st_size)
+                self._invalidate(rel_dir)
+
+    def rollup(self, rel: str = "") -> dict[str, Any]:
+        """File count, total bytes and most recent files for a subtree."""
+        cached = self._rollups.get(rel)
+        if cached is not None:
+            return cached
+
+        _, files, subdirs = self.dirs.get(rel, (0, {}, []))
+        count = len(files)
+        size = sum(s for _, s in files.values())
+        recent = [(m, self._join(rel, name)) for name, (m, _) in files.items()]
+        for name in subdirs:
+            child = self.rollup(self._join(rel, name))
+            count += child["count"]
+            size += child["bytes"]
+            if name not in self.RECENT_EXCLUDED:
+                recent.extend(child["recent"])
+
+        rollup = {
+            "count": count,
+            "bytes": size,
+            "recent": heapq.nlargest(self.RECENT_PER_SUBTREE, recent),
+        }
+        self._rollups[rel] = rollup
+        return rollup
+
+
+def format_bytes(size: int) -> str:
+    """Render a byte count compactly (e.g. 512B, 3.4KB, 1.2MB)."""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GB"
+
+
+def tail_lines(path: Path, count: int, block_size: int = 8192) -> list[str]:
+    """Return the last `count` lines of a file's stripped text.
+
+    Reads backwards from the end in blocks, so the cost depends on the
+    length of the tail rather than the size of the file.
+    """
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        data = b""
+        while True:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+            text = data.decode("utf-8", errors="replace").rstrip()
+            if pos == 0:
+                text = text.lstrip()
+            if pos == 0 or text.count("\n") >= count:
+                return text.split("\n")[-count:]
+
+
+class ToolExecutor:
+    """Runs the tool calls from one model response concurrently.
+
+    Each call declares the paths it reads and writes. A call waits for any
+    earlier call it conflicts with (a write overlapping another call's read
+    or write, including parent directories), so dependent calls keep the
+    order the model issued them in; independent calls run in parallel,
+    capped per tool by TOOL_CONCURRENCY. run_command writes "/", so it
+    conflicts with every other call. Results come back in call order.
+    """
+
+    TOOL_CONCURRENCY = {
+        "run_command": 1,
+        "read_file": 8,
+        "list_files": 4,
+        "create_file": 4,
+        "journal": 1,
+    }
+
+    def __init__(
+        self,
+        execute: Callable[[str, dict], str],
+        scopes: Callable[[str, dict], tuple[set[str], set[str]]],
+        max_workers: int = 8,
+    ):
+        self.execute = execute
+        self.scopes = scopes
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self.limits = {
+            name: threading.Semaphore(limit) for name, limit in self.TOOL_CONCURRENCY.items()
+        }
+
+    @staticmethod
+    def _overlaps(a: set[str], b: set[str]) -> bool:
+        for x in a:
+            for y in b:
+                if x == y or y.startswith(x.rstrip("/") + "/") or x.startswith(y.rstrip("/") + "/"):
+                    return True
+        return False
+
+    def _run_one(self, name: str, input_data: dict, deps: list[Future]) -> str:
+        # Dependencies were submitted earlier and the pool is FIFO, so they
+        # are already running or done: waiting here cannot starve the pool.
+        for dep in deps:
+            dep.exception()
+        limit = self.limits.get(name)
+        if limit is None:
+            return self.execute(name, input_data)
+        with limit:
+            return self.execute(name, input_data)
+
+    def run(self, calls: list[tuple[str, dict]]) -> list[str]:
+        """Execute calls and return their results in the original order."""
+        if len(calls) <= 1:
+            return [self.execute(name, input_data) for name, input_data in calls]
+
+        submitted: list[tuple[set[str], set[str], Future]] = []
+        for name, input_data in calls:
+            reads, writes = self.scopes(name, input_data)
+            deps = [
+                future for prev_reads, prev_writes, future in submitted
+                if self._overlaps(prev_writes, reads | writes) or self._overlaps(prev_reads, writes)
+            ]
+            future = self.pool.submit(self._run_one, name, input_data, deps)
+            submitted.append((reads, writes, future))
+
+        results = []
+        for (name, _), (_, _, future) in zip(calls, submitted):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(f"Error executing {name}: {e}")
+        return results
+
+
+class ConversationContext:
+    """Keeps one iteration's tool-use conversation within a byte budget.
+
+    The latest `keep_recent` rounds are always sent verbatim. File contents
+    that a later create_file superseded (earlier read_file results and the
+    earlier create_file's content) are replaced with stubs, and older rounds
+    have their tool results and written file contents collapsed to one-line
+    digests, oldest first.
+
+    Rounds already sent sit before the last prompt-cache breakpoint, and
+    rewriting any of them invalidates the cached prefix. So stubs for those
+    rounds are queued rather than applied, and only once the conversation
+    goes over budget is everything rewritten in one pass: queued stubs
+    first, then collapsing until it is back under `low_water` of the budget,
+    so the next few rounds fit without another rewrite.
+    """
+
+    def __init__(self, user_prompt: str, budget_bytes: int, keep_recent: int = 3, low_water: float = 0.5):
+        self.budget_bytes = budget_bytes
+        self.keep_recent = keep_recent
+        self.low_water = low_water
+        self.prompt = {"role": "user", "content": user_prompt}
+        # Each round: assistant message, tool_result message, calls and collapsed flag
+        self.rounds: list[dict[str, Any]] = []
+        self.collapsed_rounds = 0
+        # Rounds covered by the cache breakpoint of the last messages() call
+        self.sent_rounds = 0
+        # Supersessions of sent rounds, held back until the next compaction
+        self.pending: list[tuple[str, tuple[int, int]]] = []
+        self.compactions = 0
+        self._prompt_size = self._size(self.prompt)
+
+    @staticmethod
+    def _size(message: dict) -> int:
+        return len(json.dumps(message, ensure_ascii=False).encode())
+
+    @staticmethod
+    def _block_to_dict(block: Any) -> dict:
+        """Plain-dict form of a response content block, so it can be rewritten."""
+        if block.type == "text":
+            return {"type": "text", "text": block.text}
+        if block.type == "tool_use":
+            return {"type": "tool_use", "id": block.id, "name": block.name, "input": dict(block.input)}
+        return block.model_dump(exclude_none=True)
+
+    @staticmethod
+    def _digest(name: str, input_data: dict, content: str) -> str:
+        target = input_data.get("path") or input_data.get("command") or ""
+        first_line = next((l.strip() for l in content.splitlines() if l.strip()), "")
+        return f"[digest] {name} {target[:80]}: {len(content)} chars; {first_line[:80]}"
+
+    @property
+    def size(self) -> int:
+        """Serialized size of the conversation in bytes."""
+        return self._prompt_size + sum(r["size"] for r in self.rounds)
+
+    def _resize(self, round_: dict) -> None:
+        round_["size"] = self._size(round_["assistant"]) + self._size(round_["user"])
+
+    def _supersede(self, path: str, before: tuple[int, int], first: int = 0) -> None:
+        """Stub out contents of `path` from calls issued before (round, index).
+
+        Only rounds from `first` on are rewritten.
+        """
+        for r, round_ in enumerate(self.rounds[first:], first):
+            touched = False
+            for i, (use, result) in enumerate(round_["calls"]):
+                if (r, i) >= before or use["input"].get("path") is None:
+                    continue
+                if str(Path(use["input"]["path"]).resolve()) != path:
+                    continue
+                if use["name"] == "read_file" and not result["content"].startswith("[stale]"):
+                    result["content"] = f"[stale] {path} was overwritten later in this iteration"
+                    touched = True
+                elif use["name"] == "create_file" and not str(use["input"].get("content", "")).startswith("[superseded]"):
+                    use["input"]["content"] = f"[superseded] {len(use['input'].get('content', ''))} chars, overwritten later"
+                    touched = True
+            if touched:
+                self._resize(round_)
+
+    def _collapse(self, round_: dict) -> None:
+        """Replace a round's tool results and written contents with digests."""
+        for use, result in round_["calls"]:
+            if isinstance(result["content"], str) and not result["content"].startswith(("[digest]", "[stale]")):
+                result["content"] = self._digest(use["name"], use["input"], result["content"])
+            content = use["input"].get("content")
+            if use["name"] == "create_file" and isinstance(content, str) and not content.startswith(("[digest]", "[superseded]")):
+                use["input"]["content"] = f"[digest] {len(content)} chars written"
+        round_["collapsed"] = True
+        self.collapsed_rounds += 1
+        self._resize(round_)
+
+    def add_round(self, assistant_content: list, tool_results: list[dict]) -> None:
+        """Record an assistant turn and the tool results sent back for it."""
+        blocks = [self._block_to_dict(block) for block in assistant_content]
+        results = [dict(result) for result in tool_results]
+        by_id = {result["tool_use_id"]: result for result in results}
+        calls = [(block, by_id[block["id"]]) for block in blocks if block["type"] == "tool_use" and block["id"] in by_id]
+        round_ = {
+            "assistant": {"role": "assistant", "content": blocks},
+            "user": {"role": "user", "content": results},
+            "calls": calls,
+            "collapsed": False,
+        }
+        self._resize(round_)
+        self.rounds.append(round_)
+
+        current = len(self.rounds) - 1
+        for i, (use, _) in enumerate(calls):
+            if use["name"] == "create_file" and isinstance(use["input"].get("path"), str):
+                path = str(Path(use["input"]["path"]).resolve())
+                self._supersede(path, (current, i), first=self.sent_rounds)
+                if self.sent_rounds:
+                    self.pending.append((path, (current, i)))
+
+        if self.size > self.budget_bytes:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite sent rounds: apply queued stubs, then collapse oldest first."""
+        self.compactions += 1
+        for path, before in self.pending:
+            self._supersede(path, before)
+        self.pending = []
+
+        target = self.budget_bytes * self.low_water
+        for round_ in self.rounds[:-self.keep_recent] if self.keep_recent else self.rounds:
+            if self.size <= target:
+                break
+            if not round_["collapsed"]:
+                self._collapse(round_)
+
+    def messages(self) -> list[dict]:
+        """The conversation to send with the next request.
+
+        The newest block carries a prompt-cache breakpoint so the next round
+        can reuse everything before it. It is added to a copy, so earlier
+        breakpoints never accumulate in the stored rounds.
+        """
+        self.sent_rounds = len(self.rounds)
+        messages = [self.prompt]
+        for round_ in self.rounds:
+            messages.append(round_["assistant"])
+            messages.append(round_["user"])
+
+        last = messages[-1]
+        content = last["content"]
+        content = [{"type": "text", "text": content}] if isinstance(content, str) else list(content)
+        content[-1] = {**content[-1], "cache_control": {"type": "ephemeral"}}
+        messages[-1] = {**last, "content": content}
+        return messages
+
+
+class BudgetGovernor:
+    """Paces model calls to stay inside request and token limits.
+
+    Each configured limit (requests, input or output tokens per minute,
+    hour or day) is a token bucket that refills continuously at
+    limit/window. Before a call, acquire() waits until every bucket can
+    cover the call's estimated cost and reserves it; record() settles the
+    reservation against the response's usage, or at the estimate if the
+    call failed. Calls slow down as a bucket
+    drains instead of failing once the provider's limit is hit, and the
+    buckets are saved after every call so a restart keeps the same budget.
+    """
+
+    WINDOWS = {"minute": 60, "hour": 3600, "day": 86400}
+    METRICS = ("requests", "input_tokens", "output_tokens")
+
+    def __init__(self, limits: dict, state_path: Path | None = None):
+        self.capacity = {
+            (metric, window): float(limit)
+            for metric in self.METRICS
+            for window, limit in (limits.get(metric) or {}).items()
+            if window in self.WINDOWS and limit
+        }
+        self.state_path = state_path
+        self.lock = threading.Lock()
+        self.levels = dict(self.capacity)
+        self.updated = time.time()
+        self.totals = dict.fromkeys(self.METRICS, 0)
+        self.output_estimate = 1024.0
+        self._load()
+
+    @classmethod
+    def from_config(cls, budget: dict) -> "BudgetGovernor":
+        state_file = budget.get("state_file")
+        return cls(budget, Path(state_file) if state_file else None)
+
+    def _load(self) -> None:
+        try:
+            state = json.loads(self.state_path.read_text())
+        except (AttributeError, OSError, ValueError):
+            return
+        for key, level in state.get("levels", {}).items():
+            metric, _, window = key.partition("/")
+            if (metric, window) in self.capacity:
+                self.levels[(metric, window)] = min(float(level), self.capacity[(metric, window)])
+        self.totals.update({k: v for k, v in state.get("totals", {}).items() if k in self.totals})
+        self.output_estimate = state.get("output_estimate", self.output_estimate)
+        self.updated = min(state.get("updated", self.updated), time.time())
+
+    def _save(self) -> None:
+        if self.state_path is None:
+            return
+        state = {
+            "updated": self.updated,
+            "levels": {f"{metric}/{window}": level for (metric, window), level in self.levels.items()},
+            "totals": self.totals,
+            "output_estimate": self.output_estimate,
+        }
+        try:
+            tmp = self.state_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(state))
+            os.replace(tmp, self.state_path)
+        except OSError:
+            pass
+
+    def _refill(self) -> None:
+        now = time.time()
+        elapsed = max(0.0, now - self.updated)
+        for (metric, window), capacity in self.capacity.items():
+            level = self.levels[(metric, window)] + elapsed * capacity / self.WINDOWS[window]
+            self.levels[(metric, window)] = min(capacity, level)
+        self.updated = now
+
+    def acquire(self, input_tokens: int) -> dict:
+        """Wait until a call with this many input tokens fits, then reserve it."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill()
+                cost = {"requests": 1, "input_tokens": input_tokens, "output_tokens": round(self.output_estimate)}
+                delay = 0.0
+                for (metric, window), capacity in self.capacity.items():
+                    # A call bigger than a whole bucket only waits for a full bucket
+                    short = min(cost[metric], capacity) - self.levels[(metric, window)]
+                    if short > 0:
+                        delay = max(delay, short * self.WINDOWS[window] / capacity)
+                if delay <= 0:
+                    for metric, window in self.capacity:
+                        self.levels[(metric, window)] -= cost[metric]
+                    return {**cost, "waited": waited}
+            time.sleep(delay)
+            waited += delay
+
+    def record(self, reservation: dict, usage: Any) -> dict:
+        """Settle a reservation against response.usage; returns the actual cost.
+
+        Without usage (the call failed or was abandoned), the reserved
+        estimate is taken as the cost.
+        """
+        if usage is None:
+            actual = {metric: reservation[metric] for metric in self.METRICS}
+        else:
+            actual = {
+                "requests": 1,
+                "input_tokens": (getattr(usage, "input_tokens", 0) or 0)
+                + (getattr(usage, "cache_creation_input_tokens", 0) or 0),
+                "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+            }
+        with self.lock:
+            if usage is not None:
+                for metric, window in self.capacity:
+                    self.levels[(metric, window)] -= actual[metric] - reservation[metric]
+                self.output_estimate = 0.8 * self.output_estimate + 0.2 * actual["output_tokens"]
+            for metric in self.METRICS:
+                self.totals[metric] += actual[metric]
+            self._save()
+        return actual
+
+
+class IterationTelemetry:
+    """Span timings, byte counts and token usage collected over one iteration.
+
+    Spans of the same phase accumulate a count and total seconds; tool
+    calls running concurrently record theirs under a lock.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.spans: dict[str, list] = {}
+        self.bytes: dict[str, int] = {}
+        self.tokens: dict[str, int] = {}
+
+    @contextmanager
+    def span(self, phase: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(phase, time.perf_counter() - started)
+
+    def add_span(self, phase: str, seconds: float) -> None:
+        with self.lock:
+            entry = self.spans.setdefault(phase, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def count_bytes(self, key: str, size: int) -> None:
+        with self.lock:
+            self.bytes[key] = self.bytes.get(key, 0) + size
+
+    def record(self, **fields: Any) -> dict:
+        """The iteration as one JSON-ready record."""
+        with self.lock:
+            return {
+                **fields,
+                "spans": {phase: [count, round(seconds, 4)] for phase, (count, seconds) in self.spans.items()},
+                "bytes": dict(self.bytes),
+                "tokens": dict(self.tokens),
+            }
+
+
 class AutonomousAgent:
     """Autonomous agent with complete creative freedom and tool use."""
 
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, workspace: Path = Path("/workspace"), name: str = ""):
         self.config = config
+        self.name = name
         self.logger = logging.getLogger(__name__)
-        self.workspace = Path("/workspace")
+        self.workspace = workspace
         self.journal_path = self.workspace / "JOURNAL.md"
         self.api_key = os.getenv("ANTHROPIC_API_KEY")
 
@@ -130,6 +789,31 @@ class AutonomousAgent:
         self.tool_calls_this_iteration = 0
         self.max_tool_rounds = 50  # safety cap per iteration
 
+        # Optional observer fed streamed assistant text and run_command
+        # inputs. It provides feed(chunk) and end_block(); it only records
+        # what it sees, and the supervisor acts on it after the iteration.
+        self.output_monitor = None
+
+        # Timings and sizes for the current iteration; the supervisor hands
+        # in a fresh one per iteration and writes it out afterwards
+        self.telemetry = IterationTelemetry()
+
+        # Paces model calls against the configured request/token limits
+        self.governor = BudgetGovernor.from_config(config.get("budget", {}))
+
+        # Independent tool calls from one response run concurrently
+        self.tool_executor = ToolExecutor(self._execute_tool, self._tool_scopes)
+
+        # Soul documents and the system prompt are memoized by file mtime
+        self._soul_cache: dict[str, tuple[Any, str]] = {}
+        self._system_cache: tuple[Any, list[dict], int] = (None, [], 0)
+
+        # Workspace state is cached between iterations and refreshed incrementally
+        self.manifest = WorkspaceManifest(self.workspace)
+        self._file_summary_cache: tuple[Any, str] = (None, "")
+        self._git_log_cache: tuple[Any, str] = (None, "")
+        self._journal_cache: tuple[Any, str] = (None, "")
+
     def _select_model(self) -> str:
         """Select the allowed model."""
         model_map = {
@@ -139,16 +823,31 @@ class AutonomousAgent:
         model = allowed[0] if allowed else "haiku-4.5"
         return model_map.get(model, model)
 
-    def _get_workspace_state(self) -> str:
-        """Get current state of workspace."""
-        files = list(self.workspace.rglob("*"))
-        file_list = "\n".join(
-            str(f.relative_to(self.workspace))
-            for f in sorted(files, key=lambda x: str(x))
-            if f.is_file()
-        )
-
-        # Get git log
+    def _git_head_key(self) -> tuple:
+        """Cheap fingerprint of the current HEAD, used to skip forking git log."""
+        git_dir = self.workspace / ".git"
+        key = []
+        try:
+            head = (git_dir / "HEAD").read_text().strip()
+        except OSError:
+            return ()
+        key.append(head)
+        paths = [git_dir / "packed-refs"]
+        if head.startswith("ref: "):
+            paths.append(git_dir / head[5:])
+        for path in paths:
+            try:
+                st = path.stat()
+                key.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                key.append(None)
+        return tuple(key)
+
+    def _get_git_log(self) -> str:
+        """Recent git history, re-read only when HEAD moves."""
+        key = self._git_head_key()
+        if key and key == self._git_log_cache[0]:
+            return self._git_log_cache[1]
         try:
             git_log = subprocess.check_output(
                 ["git", "-C", str(self.workspace), "log", "--oneline", "-10"],
@@ -156,33 +855,127 @@ class AutonomousAgent:
             ).decode()
         except subprocess.CalledProcessError:
             git_log = "No git history yet"
+        self._git_log_cache = (key, git_log)
+        return git_log
 
-        # Read journal if it exists
-        journal_preview = ""
-        if self.journal_path.exists():
-            content = self.journal_path.read_text()
-            lines = content.strip().split("\n")
-            # Show last 20 lines
-            recent = lines[-20:] if len(lines) > 20 else lines
-            journal_preview = f"\nRecent Journal Entries:\n{''.join(l + chr(10) for l in recent)}"
+    def _get_journal_preview(self) -> str:
+        """Last 20 journal lines, read backwards from the end of the file."""
+        try:
+            st = self.journal_path.stat()
+        except OSError:
+            return ""
+        key = (st.st_mtime_ns, st.st_size)
+        if key != self._journal_cache[0]:
+            recent = tail_lines(self.journal_path, 20)
+            preview = f"\nRecent Journal Entries:\n{''.join(l + chr(10) for l in recent)}"
+            self._journal_cache = (key, preview)
+        return self._journal_cache[1]
+
+    def _dir_rollup_line(self, rel: str) -> str:
+        rollup = self.manifest.rollup(rel)
+        return f"  {rel}/ ({rollup['count']} files, {format_bytes(rollup['bytes'])})"
+
+    def _subdirectory_lines(self, top_dirs: list[str]):
+        """Rollup lines for directories below the top level, breadth-first."""
+        queue = deque(d for d in top_dirs if d not in WorkspaceManifest.RECENT_EXCLUDED)
+        while queue:
+            parent = queue.popleft()
+            _, _, subdirs = self.manifest.dirs.get(parent, (0, {}, []))
+            for name in sorted(subdirs):
+                rel = f"{parent}/{name}"
+                yield self._dir_rollup_line(rel)
+                queue.append(rel)
+
+    def _summarize_files(self) -> str:
+        """Summarize the workspace tree within a fixed byte budget.
+
+        Sections are filled in order until the budget is spent: recently
+        changed files, top-level directory rollups, top-level files, then
+        deeper directory rollups breadth-first.
+        """
+        behaviors = self.config["behaviors"]
+        budget = behaviors.get("workspace_summary_bytes", 4000)
+        recent_count = behaviors.get("workspace_summary_recent", 15)
+        key = (self.manifest.version, budget, recent_count)
+        if key == self._file_summary_cache[0]:
+            return self._file_summary_cache[1]
+
+        root = self.manifest.rollup()
+        recent = [path for _, path in root["recent"][:recent_count]]
+        _, top_files, top_dirs = self.manifest.dirs.get("", (0, {}, []))
+        top_dirs = sorted(top_dirs)
+        sections = [
+            ("Recently changed:", (f"  {path}" for path in recent)),
+            ("Directories:", (self._dir_rollup_line(rel) for rel in top_dirs)),
+            ("Top-level files:", (f"  {name}" for name in sorted(top_files) if name not in recent)),
+            ("Subdirectories:", self._subdirectory_lines(top_dirs)),
+        ]
+
+        truncated_note = "... (more not shown; use list_files to explore)"
+        limit = budget - len(truncated_note.encode()) - 1
+        lines = [f"Files ({root['count']} total, {format_bytes(root['bytes'])}):"]
+        used = len(lines[0].encode()) + 1
+        complete = True
+        for header, section in sections:
+            pending = [header]
+            for line in section:
+                pending.append(line)
+                size = sum(len(l.encode()) + 1 for l in pending)
+                if used + size > limit:
+                    complete = False
+                    break
+                lines.extend(pending)
+                used += size
+                pending = []
+            if not complete:
+                lines.append(truncated_note)
+                break
+
+        summary = "\n".join(lines)
+        self._file_summary_cache = (key, summary)
+        return summary
+
+    def _get_workspace_state(self) -> str:
+        """Get current state of workspace."""
+        self.manifest.refresh()
+        file_summary = self._summarize_files()
+        git_log = self._get_git_log()
+        journal_preview = self._get_journal_preview()
 
         return f"""Current Workspace State:
 
-Files ({len([f for f in files if f.is_file()])} total):
-{file_list}
+{file_summary}
 
 Recent Git History:
 {git_log}
 {journal_preview}"""
 
+    SOUL_HOME = Path("/home/playground")
+    SOUL_DOCUMENTS = ("SOUL.md", "SELF-AWARE.md", "FREEDOM.md")
+
+    def _soul_key(self) -> tuple:
+        """(name, mtime, size) of each soul document; changes when any is edited."""
+        key = []
+        for name in self.SOUL_DOCUMENTS:
+            try:
+                st = (self.SOUL_HOME / name).stat()
+                key.append((name, st.st_mtime_ns, st.st_size))
+            except OSError:
+                key.append((name, None, None))
+        return tuple(key)
+
     def _load_soul_documents(self) -> str:
-        """Load SOUL.md, SELF-AWARE.md, and FREEDOM.md for agent grounding."""
+        """Load SOUL.md, SELF-AWARE.md, and FREEDOM.md, re-reading only files that changed."""
         docs = []
-        home = Path("/home/playground")
-        for name in ("SOUL.md", "SELF-AWARE.md", "FREEDOM.md"):
-            path = home / name
-            if path.exists():
-                docs.append(f"--- {name} ---\n{path.read_text().strip()}\n--- END {name} ---")
+        for name, mtime, size in self._soul_key():
+            if mtime is None:
+                self._soul_cache.pop(name, None)
+                continue
+            cached = self._soul_cache.get(name)
+            if cached is None or cached[0] != (mtime, size):
+                cached = ((mtime, size), (self.SOUL_HOME / name).read_text().strip())
+                self._soul_cache[name] = cached
+            docs.append(f"--- {name} ---\n{cached[1]}\n--- END {name} ---")
         return "\n\n".join(docs)
 
     def _create_system_prompt(self) -> str:
@@ -194,9 +987,9 @@ Recent Git History:
 You are in a Docker container. You have tools. The rest is up to you.
 
 Environment:
-- Workspace: /workspace
+- Workspace: {self.workspace}
 - Your code: /home/playground/playground/autopilot.py
-- Journal: /workspace/JOURNAL.md (use the journal tool)
+- Journal: {self.journal_path} (use the journal tool)
 - Model: Haiku 4.5 (fixed)
 - Network: none
 - Supervisor: protected, unreadable, do not touch
@@ -209,6 +1002,26 @@ Pacing (end of your final message):
 Release (end of your final message):
 - [RELEASE:path/to/file] — supervisor promotes to releases branch"""
 
+    def _get_request_prefix(self) -> tuple[list[dict], int, bool]:
+        """System blocks for the stable request prefix, rebuilt only when a soul document changes.
+
+        Returns the blocks (marked for provider-side prompt caching), the
+        prefix size in bytes (system plus tool definitions), and whether the
+        prefix was reused unchanged from the previous request.
+        """
+        key = self._soul_key()
+        if key == self._system_cache[0]:
+            return self._system_cache[1], self._system_cache[2], True
+
+        system = [{
+            "type": "text",
+            "text": self._create_system_prompt(),
+            "cache_control": {"type": "ephemeral"},
+        }]
+        prefix_bytes = len(json.dumps(system).encode()) + len(json.dumps(CACHED_AGENT_TOOLS).encode())
+        self._system_cache = (key, system, prefix_bytes)
+        return system, prefix_bytes, False
+
     def _create_user_prompt(self) -> str:
         """Create the user prompt with workspace state."""
         workspace_state = self._get_workspace_state()
@@ -217,21 +1030,53 @@ Release (end of your final message):
 
 You have tools. What do you want to do?"""
 
+    def _tool_scopes(self, name: str, input_data: dict) -> tuple[set[str], set[str]]:
+        """Paths a tool call reads and writes, for ordering concurrent calls.
+
+        A shell command can write anywhere (absolute paths, "..", the shared
+        .git), so run_command is treated as writing "/" and runs exclusively:
+        only the file tools, whose paths are known, overlap.
+        """
+        def resolve(path: Any) -> set[str]:
+            return {str(Path(path).resolve())} if isinstance(path, str) and path else set()
+
+        if name == "create_file":
+            return set(), resolve(input_data.get("path"))
+        elif name == "read_file":
+            return resolve(input_data.get("path")), set()
+        elif name == "list_files":
+            return resolve(input_data.get("path", str(self.workspace))), set()
+        elif name == "run_command":
+            return set(), {"/"}
+        elif name == "journal":
+            return set(), {str(self.journal_path)}
+        return set(), set()
+
     def _execute_tool(self, name: str, input_data: dict) -> str:
-        """Execute a tool call and return the result."""
+        """Execute a tool call, timing it, and return the result."""
+        with self.telemetry.span(f"tool.{name}"):
+            result = self._dispatch_tool(name, input_data)
+        self.telemetry.count_bytes("tool_results", len(result.encode("utf-8", "replace")))
+        return result
+
+    def _dispatch_tool(self, name: str, input_data: dict) -> str:
         try:
             if name == "create_file":
                 return self._tool_create_file(input_data["path"], input_data["content"])
             elif name == "read_file":
-                return self._tool_read_file(input_data["path"])
+                return self._tool_read_file(
+                    input_data["path"],
+                    input_data.get("offset", 0),
+                    input_data.get("limit", 10000),
+                )
             elif name == "run_command":
                 return self._tool_run_command(
                     input_data["command"],
-                    input_data.get("working_directory", "/workspace"),
+                    input_data.get("working_directory", str(self.workspace)),
                 )
             elif name == "list_files":
                 return self._tool_list_files(
-                    input_data.get("path", "/workspace"),
+                    input_data.get("path", str(self.workspace)),
                     input_data.get("recursive", False),
                 )
             elif name == "journal":
@@ -250,17 +1095,18 @@ You have tools. What do you want to do?"""
             return f"DENIED: {path} is protected and cannot be modified."
 
         # Ensure path is within allowed directories
-        allowed_prefixes = ["/workspace", "/home/playground/playground"]
-        if not any(resolved.startswith(p) for p in allowed_prefixes):
-            return f"DENIED: Can only write to /workspace or /home/playground/playground/"
+        allowed_roots = [self.workspace, Path("/home/playground/playground")]
+        if not any(Path(resolved).is_relative_to(root) for root in allowed_roots):
+            return f"DENIED: Can only write to {self.workspace} or /home/playground/playground/"
 
         file_path = Path(resolved)
         file_path.parent.mkdir(parents=True, exist_ok=True)
         file_path.write_text(content)
+        self.manifest.note_write(file_path)
         return f"Created {path} ({len(content)} bytes)"
 
-    def _tool_read_file(self, path: str) -> str:
-        """Read a file's contents."""
+    def _tool_read_file(self, path: str, offset: int = 0, limit: int = 10000) -> str:
+        """Read up to `limit` bytes of a file starting at byte `offset`."""
         resolved = str(Path(path).resolve())
 
         # Block reading supervisor
@@ -273,10 +1119,26 @@ You have tools. What do you want to do?"""
         if not file_path.is_file():
             return f"Not a file: {path}"
 
-        content = file_path.read_text()
-        if len(content) > 10000:
-            return content[:10000] + f"\n\n... (truncated, {len(content)} total bytes)"
-        return content
+        offset = max(0, int(offset))
+        limit = min(max(1, int(limit)), 100000)
+        with open(file_path, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(offset)
+            data = f.read(limit)
+
+        # Don't start or end in the middle of a UTF-8 sequence
+        start = 0
+        while offset and start < min(3, len(data)) and data[start] & 0xC0 == 0x80:
+            start += 1
+        end = offset + len(data)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        content = decoder.decode(data[start:], final=end >= size)
+        end -= len(decoder.getstate()[0])  # bytes of a sequence cut off by the limit
+        if offset == 0 and end >= size:
+            return content
+        return content + f"\n\n... (bytes {offset + start}-{end} of {size}" + (
+            f"; continue with offset={end})" if end < size else ")"
+        )
 
     def _tool_run_command(self, command: str, working_directory: str) -> str:
         """Run a shell command."""
@@ -287,51 +1149,79 @@ You have tools. What do you want to do?"""
             if pattern in cmd_lower:
                 return f"DENIED: Commands targeting '{pattern.strip()}' are not allowed."
 
+        limit = 5000
+        max_output_mb = self.config.get("safety", {}).get("max_command_output_mb", 64)
         try:
-            result = subprocess.run(
+            stdout, stderr, returncode, kill_reason = run_bounded(
                 command,
-                shell=True,
-                capture_output=True,
-                text=True,
+                working_directory,
                 timeout=30,
-                cwd=working_directory,
+                max_output_bytes=max_output_mb * 1024 * 1024,
+                # Up to 4 bytes per character, so the head always covers the view
+                head_bytes=4 * limit,
+                tail_bytes=1000,
             )
-            output = result.stdout
-            if result.stderr:
-                output += f"\nSTDERR: {result.stderr}"
-            if result.returncode != 0:
-                output += f"\nExit code: {result.returncode}"
-
-            if len(output) > 5000:
-                output = output[:5000] + "\n... (truncated)"
+            if kill_reason == "timeout":
+                return "Command timed out after 30 seconds."
+
+            output = stdout.text()
+            if stderr.total:
+                output += f"\nSTDERR: {stderr.text()}"
+            if returncode != 0:
+                output += f"\nExit code: {returncode}"
+            if kill_reason == "output":
+                output += f"\nKilled: output exceeded {max_output_mb}MB"
+
+            if len(output) > limit:
+                output = output[:limit] + "\n... (truncated)"
+                # Streams too long to hold also show how they ended
+                for name, capture in (("stdout", stdout), ("stderr", stderr)):
+                    if capture.truncated:
+                        output += f"\n... end of {name} ({capture.total:,} bytes total):\n{capture.text('tail')}"
 
             return output if output.strip() else "(no output)"
-        except subprocess.TimeoutExpired:
-            return "Command timed out after 30 seconds."
         except Exception as e:
             return f"Command failed: {e}"
 
-    def _tool_list_files(self, path: str, recursive: bool) -> str:
-        """List files in a directory."""
+    def _tool_list_files(self, path: str, recursive: bool, cap: int = 200) -> str:
+        """List files in a directory.
+
+        Walks lazily with os.scandir (entries sorted within each directory,
+        depth-first) and stops as soon as `cap` entries have been listed.
+        """
         dir_path = Path(path)
         if not dir_path.exists():
             return f"Directory not found: {path}"
 
-        if recursive:
-            entries = sorted(dir_path.rglob("*"))
-        else:
-            entries = sorted(dir_path.iterdir())
+        def listing(directory: str) -> list[os.DirEntry]:
+            with os.scandir(directory) as it:
+                return sorted(it, key=lambda e: e.name)
+
+        def walk(entries: list[os.DirEntry]):
+            for entry in entries:
+                yield entry
+                if recursive and entry.is_dir(follow_symlinks=False):
+                    try:
+                        children = listing(entry.path)
+                    except OSError:
+                        continue  # Unreadable subdirectories are skipped, as rglob did
+                    yield from walk(children)
 
         lines = []
-        for entry in entries[:200]:  # cap at 200 entries
-            rel = entry.relative_to(dir_path)
+        more = False
+        for entry in walk(listing(str(dir_path))):
+            if len(lines) == cap:
+                more = True
+                break
+            rel = Path(entry.path).relative_to(dir_path)
+            is_file = entry.is_file()
             prefix = "📁 " if entry.is_dir() else "📄 "
-            size = f" ({entry.stat().st_size}b)" if entry.is_file() else ""
+            size = f" ({entry.stat().st_size}b)" if is_file else ""
             lines.append(f"{prefix}{rel}{size}")
 
         result = "\n".join(lines)
-        if len(entries) > 200:
-            result += f"\n... and {len(entries) - 200} more entries"
+        if more:
+            result += f"\n... more entries not shown (capped at {cap})"
         return result
 
     def _tool_journal(self, entry: str) -> str:
@@ -344,6 +1234,7 @@ You have tools. What do you want to do?"""
 
         with open(self.journal_path, "a") as f:
             f.write(formatted)
+        self.manifest.note_write(self.journal_path)
 
         return f"Journal entry added at {timestamp}"
 
@@ -369,6 +1260,49 @@ You have tools. What do you want to do?"""
             "mode": "mock",
         }
 
+    @staticmethod
+    def _feed_command(monitor: Any, input_json: str) -> None:
+        """Feed a complete run_command input's command and working directory."""
+        try:
+            input_data = json.loads(input_json or "{}")
+        except ValueError:
+            return
+        for field in ("command", "working_directory"):
+            value = input_data.get(field) if isinstance(input_data, dict) else None
+            if isinstance(value, str):
+                monitor.feed(value)
+                monitor.end_block()
+
+    def _stream_response(self, **request: Any) -> Any:
+        """Stream one model response, feeding the output monitor as it arrives.
+
+        Assistant text is fed delta by delta. Of the tool inputs, only each
+        run_command's command and working directory are fed, once its block
+        is complete: file bodies written through tools are ordinary code and
+        are not scanned. The monitor only observes; the supervisor acts on
+        what it found after the iteration.
+        """
+        monitor = self.output_monitor
+        commands: dict[int, list[str]] = {}  # input JSON of run_command blocks, by block index
+        with self.client.messages.stream(**request) as stream:
+            for event in stream:
+                if monitor is None:
+                    continue
+                if event.type == "content_block_start":
+                    block = event.content_block
+                    if block.type == "tool_use" and block.name == "run_command":
+                        commands[event.index] = []
+                elif event.type == "content_block_delta":
+                    if event.delta.type == "text_delta":
+                        monitor.feed(event.delta.text)
+                    elif event.delta.type == "input_json_delta" and event.index in commands:
+                        commands[event.index].append(event.delta.partial_json)
+                elif event.type == "content_block_stop":
+                    if event.index in commands:
+                        self._feed_command(monitor, "".join(commands.pop(event.index)))
+                    monitor.end_block()
+            return stream.get_final_message()
+
     def run(self) -> dict[str, Any]:
         """Run one autonomous iteration with tool use."""
         try:
@@ -379,26 +1313,64 @@ You have tools. What do you want to do?"""
             self.logger.info(f"🧠 Using model: {model}")
             self.tool_calls_this_iteration = 0
 
-            system_prompt = self._create_system_prompt()
-            user_prompt = self._create_user_prompt()
+            telemetry = self.telemetry
+            with telemetry.span("prompt"):
+                user_prompt = self._create_user_prompt()
+            telemetry.count_bytes("prompt", len(user_prompt.encode("utf-8", "replace")))
+            # Stable prefix (tools + system) vs what the provider reports caching
+            prompt_cache = {
+                "cached_prefix_bytes": 0,
+                "uncached_prefix_bytes": 0,
+                "cache_read_input_tokens": 0,
+                "cache_creation_input_tokens": 0,
+                "input_tokens": 0,
+            }
 
-            max_tokens = self.config["behaviors"]["max_tokens_per_invocation"]
-            messages = [{"role": "user", "content": user_prompt}]
+            behaviors = self.config["behaviors"]
+            max_tokens = behaviors["max_tokens_per_invocation"]
+            context = ConversationContext(
+                user_prompt,
+                budget_bytes=behaviors.get("context_budget_bytes", 120000),
+                keep_recent=behaviors.get("context_keep_recent_rounds", 3),
+            )
             full_response_text = ""
+            budget = {"requests": 0, "input_tokens": 0, "output_tokens": 0, "waited_seconds": 0.0}
 
             # Tool-use loop
             while self.tool_calls_this_iteration < self.max_tool_rounds:
-                response = self.client.messages.create(
-                    model=model,
-                    max_tokens=max_tokens,
-                    system=system_prompt,
-                    tools=AGENT_TOOLS,
-                    messages=messages,
-                )
+                system_blocks, prefix_bytes, reused = self._get_request_prefix()
+                prompt_cache["cached_prefix_bytes" if reused else "uncached_prefix_bytes"] += prefix_bytes
+
+                # Cached prefix reads don't count against input-token limits
+                estimate = (context.size + (0 if reused else prefix_bytes)) // 4
+                with telemetry.span("budget_wait"):
+                    reservation = self.governor.acquire(estimate)
+                if reservation["waited"] >= 1:
+                    self.logger.info(f"💰 Paced {reservation['waited']:.0f}s to stay within the model budget")
+                budget["waited_seconds"] += reservation["waited"]
+
+                telemetry.count_bytes("request", prefix_bytes + context.size)
+                response = None
+                try:
+                    with telemetry.span("model"):
+                        response = self._stream_response(
+                            model=model,
+                            max_tokens=max_tokens,
+                            system=system_blocks,
+                            tools=CACHED_AGENT_TOOLS,
+                            messages=context.messages(),
+                        )
+                finally:
+                    # Settle even if the call failed, at the estimate when there is no usage
+                    for metric, value in self.governor.record(reservation, getattr(response, "usage", None)).items():
+                        budget[metric] += value
+                usage = getattr(response, "usage", None)
+                for field in ("cache_read_input_tokens", "cache_creation_input_tokens", "input_tokens"):
+                    prompt_cache[field] += getattr(usage, field, 0) or 0
 
                 # Process response blocks
                 assistant_content = response.content
-                tool_results = []
+                tool_uses = []
 
                 for block in assistant_content:
                     if block.type == "text":
@@ -407,15 +1379,19 @@ You have tools. What do you want to do?"""
                     elif block.type == "tool_use":
                         self.tool_calls_this_iteration += 1
                         self.logger.info(f"🔧 Tool call #{self.tool_calls_this_iteration}: {block.name}({json.dumps(block.input)[:100]}...)")
+                        tool_uses.append(block)
 
-                        result = self._execute_tool(block.name, block.input)
-                        self.logger.info(f"   → {result[:100]}...")
-
-                        tool_results.append({
-                            "type": "tool_result",
-                            "tool_use_id": block.id,
-                            "content": result,
-                        })
+                # Run this response's tool calls (concurrently where independent)
+                with telemetry.span("tools"):
+                    results = self.tool_executor.run([(block.name, block.input) for block in tool_uses])
+                tool_results = []
+                for block, result in zip(tool_uses, results):
+                    self.logger.info(f"   → {block.name}: {result[:100]}...")
+                    tool_results.append({
+                        "type": "tool_result",
+                        "tool_use_id": block.id,
+                        "content": result,
+                    })
 
                 # If no tool calls, we're done
                 if response.stop_reason == "end_turn":
@@ -423,34 +1399,57 @@ You have tools. What do you want to do?"""
 
                 # If there were tool calls, send results back
                 if tool_results:
-                    messages.append({"role": "assistant", "content": assistant_content})
-                    messages.append({"role": "user", "content": tool_results})
+                    context.add_round(assistant_content, tool_results)
                 else:
                     break
 
             # Log response
             self.logger.info(f"🤖 Iteration complete. {self.tool_calls_this_iteration} tool calls. Response: {len(full_response_text)} chars")
+            self.logger.info(
+                f"📚 Context: {context.size:,} bytes, {context.collapsed_rounds} of {len(context.rounds)} rounds collapsed "
+                f"in {context.compactions} compaction(s)"
+            )
+            self.logger.info(
+                f"🗄️  Prompt prefix: {prompt_cache['cached_prefix_bytes']:,} bytes cached, "
+                f"{prompt_cache['uncached_prefix_bytes']:,} uncached "
+                f"(provider: {prompt_cache['cache_read_input_tokens']:,} tokens read from cache, "
+                f"{prompt_cache['cache_creation_input_tokens']:,} written)"
+            )
+            self.logger.info(
+                f"💰 Budget: {budget['requests']} requests, {budget['input_tokens']:,} input / "
+                f"{budget['output_tokens']:,} output tokens, paced {budget['waited_seconds']:.0f}s"
+            )
 
             # Save full response to logs
-            log_file = Path("/logs") / f"response_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+            prefix = f"response_{self.name}_" if self.name else "response_"
+            log_file = Path("/logs") / f"{prefix}{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
             log_file.write_text(full_response_text)
 
             # Capture what changed
-            try:
-                new_commits = subprocess.check_output(
-                    ["git", "-C", str(self.workspace), "log", "--oneline", "-5", "--since=5 minutes ago"],
-                    stderr=subprocess.DEVNULL,
-                ).decode().strip()
-            except subprocess.CalledProcessError:
-                new_commits = ""
-
-            try:
-                changed_files = subprocess.check_output(
-                    ["git", "-C", str(self.workspace), "diff", "--name-only", "HEAD~1"],
-                    stderr=subprocess.DEVNULL,
-                ).decode().strip()
-            except subprocess.CalledProcessError:
-                changed_files = ""
+            with telemetry.span("git"):
+                try:
+                    new_commits = subprocess.check_output(
+                        ["git", "-C", str(self.workspace), "log", "--oneline", "-5", "--since=5 minutes ago"],
+                        stderr=subprocess.DEVNULL,
+                    ).decode().strip()
+                except subprocess.CalledProcessError:
+                    new_commits = ""
+
+                try:
+                    changed_files = subprocess.check_output(
+                        ["git", "-C", str(self.workspace), "diff", "--name-only", "HEAD~1"],
+                        stderr=subprocess.DEVNULL,
+                    ).decode().strip()
+                except subprocess.CalledProcessError:
+                    changed_files = ""
+
+            telemetry.count_bytes("response", len(full_response_text.encode("utf-8", "replace")))
+            telemetry.tokens.update(
+                input=budget["input_tokens"],
+                output=budget["output_tokens"],
+                cache_read=prompt_cache["cache_read_input_tokens"],
+                cache_creation=prompt_cache["cache_creation_input_tokens"],
+            )
 
             return {
                 "success": True,
@@ -460,6 +1459,8 @@ You have tools. What do you want to do?"""
                 "response_preview": full_response_text[:500],
                 "response_tail": full_response_text[-200:] if full_response_text else "",
                 "tool_calls": self.tool_calls_this_iteration,
+                "prompt_cache": prompt_cache,
+                "budget": budget,
                 "new_commits": new_commits,
                 "changed_files": changed_files,
                 "log_file": str(log_file),
@@ -4,68 +4,509 @@ NEXUS Playground Supervisor
 
 Watchdog process. Does not control when agents work or rest — agents
 decide their own pacing. The supervisor only enforces safety limits,
-detects boundary violations, and narrates what happens.
+detects boundary violations, and narrates what happens. When several
+agents run side by side, a shared scheduler decides only who goes next
+when they compete for API slots.
 """
 
+import asyncio
+import atexit
+import ctypes
+import ctypes.util
+import heapq
+import itertools
+import json
 import logging
+import logging.handlers
+import math
 import os
+import queue
 import random
 import re
 import stat
+import struct
 import subprocess
 import sys
+import tempfile
+import threading
 import time
+from collections import deque
 from datetime import datetime
 from pathlib import Path
+from typing import Any, Callable
 
 import yaml
 
-from autopilot import AutonomousAgent
+from autopilot import AutonomousAgent, IterationTelemetry, tail_lines
 
 
-class PlaygroundSupervisor:
-    """Supervises the autonomous agent loop."""
+class _Inotify:
+    """Minimal ctypes wrapper around Linux inotify that reports dirty directories."""
 
-    def __init__(self, config_path: str = "playground/config.yaml"):
-        self.config = self._load_config(config_path)
-        self._setup_logging()
-        self.agent = AutonomousAgent(self.config)
-        self.consecutive_errors = 0
-        self.iteration = 0
+    # IN_MODIFY | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+    WATCH_MASK = 0x2 | 0x40 | 0x80 | 0x100 | 0x200 | 0x01000000
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+    EVENT_HEADER = struct.Struct("iIII")
 
-    def _load_config(self, path: str) -> dict:
-        """Load configuration from YAML."""
-        with open(path) as f:
-            return yaml.safe_load(f)
+    def __init__(self, fd: int, libc):
+        self.fd = fd
+        self.libc = libc
+        self.paths: dict[int, str] = {}
 
-    def _setup_logging(self) -> None:
-        """Configure logging with immediate flushing for real-time streaming."""
-        log_config = self.config["logging"]
+    @classmethod
+    def create(cls):
+        """Return a watcher, or None where inotify is unavailable."""
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        return cls(fd, libc) if fd >= 0 else None
+
+    def watch(self, path: Path, rel: str) -> bool:
+        """Watch a directory. False if the kernel refused (e.g. watch limit)."""
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.WATCH_MASK)
+        if wd < 0:
+            return False
+        self.paths[wd] = rel
+        return True
+
+    def read_dirty(self):
+        """Drain pending events. Returns dirty directories, or None on queue overflow."""
+        dirty = set()
+        overflow = False
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return None if overflow else dirty
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = self.EVENT_HEADER.unpack_from(data, offset)
+                offset += self.EVENT_HEADER.size + length
+                if mask & self.IN_Q_OVERFLOW:
+                    overflow = True
+                elif mask & self.IN_IGNORED:
+                    self.paths.pop(wd, None)
+                elif wd in self.paths:
+                    dirty.add(self.paths[wd])
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class DiskUsageTracker:
+    """Incrementally tracks the total byte size of a directory tree.
+
+    Keeps a persisted per-directory cache of the directory's mtime, the
+    sizes of the files directly inside it, and its subdirectories, plus a
+    running total. Where inotify is available, each check only rescans the
+    directories that reported changes since the last one.
+
+    Otherwise each check stats every directory and rescans those whose
+    mtime changed. Rewriting a file in place does not touch its directory's
+    mtime, so in that mode large files are re-stat'd on every check and the
+    whole tree is re-verified every `full_rescan_interval` checks.
+    """
+
+    LARGE_FILE_BYTES = 1024 * 1024
+
+    def __init__(self, root: Path, cache_path: Path, full_rescan_interval: int = 10):
+        self.root = root
+        self.cache_path = cache_path
+        self.full_rescan_interval = max(1, full_rescan_interval)
+        self.checks = 0
+        self.dirs = self._load_cache()
+        self.total = sum(self._dir_bytes(entry) for entry in self.dirs.values())
+        self.inotify = _Inotify.create()
+
+    def _load_cache(self) -> dict:
+        """Load the per-directory cache, or start empty."""
+        try:
+            with open(self.cache_path) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if cache.get("root") != str(self.root):
+            return {}
+        return cache.get("dirs", {})
+
+    def _save_cache(self) -> None:
+        """Persist the per-directory cache (best effort)."""
+        try:
+            tmp = self.cache_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"root": str(self.root), "dirs": self.dirs}))
+            tmp.replace(self.cache_path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _dir_bytes(entry: dict) -> int:
+        return entry["small"] + sum(entry["large"].values())
+
+    @staticmethod
+    def _child(rel: str, name: str) -> str:
+        return f"{rel}/{name}" if rel else name
+
+    def _watch(self, rel: str) -> None:
+        """Watch a directory, dropping back to mtime mode if inotify refuses."""
+        if self.inotify and not self.inotify.watch(self.root / rel, rel):
+            self.inotify.close()
+            self.inotify = None
+
+    def _scan(self, rel: str):
+        """Rescan one directory's direct entries. Returns the new entry, or None if gone."""
+        path = self.root / rel
+        self._watch(rel)
+        small = 0
+        large = {}
+        subdirs = []
+        try:
+            mtime = os.stat(path, follow_symlinks=False).st_mtime_ns
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        elif entry.is_file():
+                            size = entry.stat().st_size
+                            if size >= self.LARGE_FILE_BYTES:
+                                large[entry.name] = size
+                            else:
+                                small += size
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+
+        self._forget(rel)
+        self.dirs[rel] = {"mtime": mtime, "small": small, "large": large, "subdirs": subdirs}
+        self.total += self._dir_bytes(self.dirs[rel])
+        return self.dirs[rel]
+
+    def _forget(self, rel: str) -> None:
+        old = self.dirs.pop(rel, None)
+        if old:
+            self.total -= self._dir_bytes(old)
+
+    def _forget_tree(self, rel: str) -> None:
+        prefix = rel + "/"
+        for key in [k for k in self.dirs if k == rel or k.startswith(prefix)]:
+            self._forget(key)
+
+    def _refresh_large(self, rel: str, cached: dict) -> bool:
+        """Re-stat cached large files in place. False if any has vanished."""
+        for name, old_size in cached["large"].items():
+            try:
+                size = os.stat(self.root / rel / name).st_size
+            except OSError:
+                return False
+            cached["large"][name] = size
+            self.total += size - old_size
+        return True
+
+    def _walk(self, start: str, full: bool) -> set:
+        """Walk the tree from start, rescanning directories that changed."""
+        seen = set()
+        stack = [start]
+        while stack:
+            rel = stack.pop()
+            cached = self.dirs.get(rel)
+            try:
+                mtime = os.stat(self.root / rel, follow_symlinks=False).st_mtime_ns
+            except OSError:
+                continue
+            if full or cached is None or cached["mtime"] != mtime or not self._refresh_large(rel, cached):
+                cached = self._scan(rel)
+                if cached is None:
+                    continue
+            else:
+                self._watch(rel)
+            seen.add(rel)
+            stack.extend(self._child(rel, name) for name in cached["subdirs"])
+        return seen
+
+    def _apply_events(self, dirty: set) -> None:
+        """Rescan directories reported by inotify, parents first."""
+        for rel in sorted(dirty):
+            old = self.dirs.get(rel)
+            if old is None:
+                continue  # dropped by an earlier parent rescan
+            new = self._scan(rel)
+            if new is None:
+                self._forget_tree(rel)
+                continue
+            before, after = set(old["subdirs"]), set(new["subdirs"])
+            for name in before - after:
+                self._forget_tree(self._child(rel, name))
+            for name in after - before:
+                self._walk(self._child(rel, name), full=True)
+
+    def total_size(self) -> int:
+        """Return the tree's size in bytes, rescanning only what changed."""
+        self.checks += 1
+        dirty = self.inotify.read_dirty() if self.inotify and self.checks > 1 else None
+
+        if dirty is not None:
+            self._apply_events(dirty)
+        else:
+            # Changes made while no watches were active (before startup or
+            # on overflow) can hide in unchanged directories, so with inotify
+            # those walks are full; the steady state is then event-driven.
+            if self.inotify is not None:
+                full = True
+            else:
+                full = not self.dirs or self.checks % self.full_rescan_interval == 0
+            seen = self._walk("", full)
+            for rel in set(self.dirs) - seen:
+                self._forget(rel)
+
+        self._save_cache()
+        return self.total
+
+
+class ViolationScanner:
+    """Scans streamed agent output for boundary-violation patterns as it arrives.
+
+    All patterns are compiled into one alternation, so output is scanned
+    in a single pass; the individual patterns only run on the rare segment
+    that matches, to report every pattern it contains. Segments end at
+    newlines (or MAX_SEGMENT chars) and each is scanned joined to the
+    previous one, so matches across a line break are still caught while
+    every character is scanned at most twice.
+    """
+
+    MAX_SEGMENT = 8192
+
+    def __init__(self, patterns: list[str], logger: logging.Logger):
+        self.patterns = [(p, re.compile(p, re.IGNORECASE)) for p in patterns]
+        self.combined = re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+        self.logger = logger
+        self.reset()
+
+    def reset(self) -> None:
+        """Start a new transcript."""
+        self.matched: list[str] = []
+        self.chars_scanned = 0
+        self._previous = ""
+        self._pending = ""
+
+    @property
+    def violated(self) -> bool:
+        return bool(self.matched)
+
+    def violations(self) -> list[str]:
+        return [f"Pattern matched: {p}" for p in self.matched]
+
+    def _scan(self, segment: str) -> None:
+        window = self._previous + segment
+        self._previous = segment
+        self.chars_scanned += len(segment)
+        if not self.combined.search(window):
+            return
+        for pattern, regex in self.patterns:
+            if pattern not in self.matched and regex.search(window):
+                self.matched.append(pattern)
+                self.logger.warning(f"🚨 Violation pattern in agent output: {pattern}")
+
+    def feed(self, chunk: str) -> None:
+        """Scan the next chunk of streamed text."""
+        text = self._pending + chunk
+        start = 0
+        while True:
+            newline = text.find("\n", start)
+            if newline < 0:
+                break
+            self._scan(text[start:newline + 1])
+            start = newline + 1
+        self._pending = text[start:]
+        while len(self._pending) >= self.MAX_SEGMENT:
+            self._scan(self._pending[:self.MAX_SEGMENT])
+            self._pending = self._pending[self.MAX_SEGMENT:]
+
+    def end_block(self) -> None:
+        """Flush the current content block so it never joins the next one."""
+        if self._pending:
+            self._scan(self._pending)
+        self._pending = ""
+        self._previous = ""
+
+
+class BackgroundLogWriter(threading.Thread):
+    """Writes queued log records to stdout and a rotating log file.
+
+    Callers only enqueue records (through a QueueHandler), so the agent
+    loop never waits on the terminal or the disk. Records are written as
+    they arrive and both streams are flushed once per batch, at most
+    flush_interval seconds after the first record of the batch.
+    """
+
+    STOP = object()
+
+    def __init__(self, records: queue.SimpleQueue, path: str, max_bytes: int,
+                 backup_count: int, flush_interval: float, fmt: str):
+        super().__init__(name="log-writer", daemon=True)
+        self.records = records
+        self.flush_interval = flush_interval
+        self.formatter = logging.Formatter(fmt)
+        self.stdout = sys.stdout
+        self.file = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        self.file_bytes = os.fstat(self.file.stream.fileno()).st_size
 
-        # Create stream handler that flushes immediately
-        class ImmediateFlushHandler(logging.StreamHandler):
-            def emit(self, record):
+    def _write(self, record: logging.LogRecord) -> None:
+        try:
+            line = self.formatter.format(record) + "\n"
+            self.stdout.write(line)
+            size = len(line.encode("utf-8", "replace"))
+            if self.file.maxBytes and self.file_bytes and self.file_bytes + size > self.file.maxBytes:
+                self.file.stream.flush()
+                self.file.doRollover()
+                self.file_bytes = 0
+            self.file.stream.write(line)
+            self.file_bytes += size
+        except Exception:
+            self.file.handleError(record)
+
+    def _flush(self) -> None:
+        for stream in (self.stdout, self.file.stream):
+            try:
+                stream.flush()
+            except Exception:
+                pass
+
+    def run(self) -> None:
+        while True:
+            record = self.records.get()
+            deadline = time.monotonic() + self.flush_interval
+            while record is not self.STOP:
+                self._write(record)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
                 try:
-                    msg = self.format(record)
-                    self.stream.write(msg + self.terminator)
-                    self.flush()  # Flush after every message
-                except Exception:
-                    self.handleError(record)
+                    record = self.records.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            self._flush()
+            if record is self.STOP:
+                self.file.close()
+                return
 
-        logging.basicConfig(
-            level=getattr(logging, log_config["level"]),
-            format="%(asctime)s [%(levelname)s] %(message)s",
-            handlers=[
-                logging.FileHandler(log_config["file"]),
-                ImmediateFlushHandler(sys.stdout),
-            ],
+    def stop(self) -> None:
+        """Write out everything queued so far, then end the thread."""
+        if self.is_alive():
+            self.records.put(self.STOP)
+            self.join()
+
+
+class TelemetryLog:
+    """Appends per-iteration telemetry as JSONL and keeps a rolling summary.
+
+    The summary (p50/p95/max seconds per phase over the last `window`
+    iterations, plus byte and token means) is rewritten after every
+    iteration for status-check.sh. On startup the window is refilled
+    from the tail of the JSONL.
+    """
+
+    def __init__(self, path: Path, summary_path: Path, window: int = 200):
+        self.path = path
+        self.summary_path = summary_path
+        self.records: deque[dict] = deque(maxlen=window)
+        self.lock = threading.Lock()
+        try:
+            for line in tail_lines(path, window):
+                try:
+                    self.records.append(json.loads(line))
+                except ValueError:
+                    continue
+        except OSError:
+            pass
+
+    @staticmethod
+    def _percentile(values: list[float], q: float) -> float:
+        return values[min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))]
+
+    def summary(self) -> dict:
+        phases: dict[str, list[float]] = {}
+        totals: dict[str, dict[str, int]] = {"bytes": {}, "tokens": {}}
+        for record in self.records:
+            for phase, (_, seconds) in record.get("spans", {}).items():
+                phases.setdefault(phase, []).append(seconds)
+            for kind, counts in totals.items():
+                for key, value in record.get(kind, {}).items():
+                    counts[key] = counts.get(key, 0) + value
+        iterations = len(self.records)
+        return {
+            "updated": datetime.now().isoformat(timespec="seconds"),
+            "iterations": iterations,
+            "phases": {
+                phase: {
+                    "n": len(values),
+                    "p50": round(self._percentile(values, 0.50), 3),
+                    "p95": round(self._percentile(values, 0.95), 3),
+                    "max": round(values[-1], 3),
+                }
+                for phase, values in ((p, sorted(v)) for p, v in phases.items())
+            },
+            **{
+                f"mean_{kind}": {key: round(value / iterations) for key, value in counts.items()}
+                for kind, counts in totals.items()
+            },
+        }
+
+    def write(self, record: dict) -> None:
+        with self.lock:
+            self.records.append(record)
+            try:
+                with open(self.path, "a") as f:
+                    f.write(json.dumps(record, separators=(",", ":")) + "\n")
+                tmp = self.summary_path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(self.summary(), indent=2))
+                os.replace(tmp, self.summary_path)
+            except OSError:
+                pass
+
+
+class AgentLogPrefix(logging.LoggerAdapter):
+    """Tags each line with the agent's name so interleaved output stays readable."""
+
+    def process(self, msg, kwargs):
+        return f"[{self.extra['agent']}] {msg}", kwargs
+
+
+class AgentSupervisor:
+    """Supervises one autonomous agent and its workspace."""
+
+    def __init__(self, config: dict, logger: logging.Logger | logging.LoggerAdapter,
+                 telemetry_log: TelemetryLog, name: str = "", workspace: Path = Path("/workspace")):
+        self.config = config
+        self.logger = logger
+        self.telemetry_log = telemetry_log
+        self.name = name
+        self.workspace = workspace
+        self.agent = AutonomousAgent(self.config, workspace, name)
+        if name:
+            self.agent.logger = logger
+        safety = self.config["safety"]
+        cache = Path(safety.get("disk_usage_cache", "/logs/.disk_usage_cache.json"))
+        self.disk_usage = DiskUsageTracker(
+            workspace,
+            cache.with_stem(f"{cache.stem}-{name}") if name else cache,
+            safety.get("disk_full_rescan_interval", 10),
         )
-        self.logger = logging.getLogger(__name__)
+        self.scanner = ViolationScanner(self.VIOLATION_PATTERNS, self.logger)
+        self.agent.output_monitor = self.scanner
+        self.consecutive_errors = 0
+        self.iteration = 0
 
     def _check_disk_usage(self) -> bool:
         """Check if disk usage is within limits."""
-        workspace = Path("/workspace")
-        total_size = sum(f.stat().st_size for f in workspace.rglob("*") if f.is_file())
+        total_size = self.disk_usage.total_size()
         size_mb = total_size / (1024 * 1024)
         limit_mb = self.config["safety"]["max_disk_usage_mb"]
 
@@ -151,17 +592,18 @@ class PlaygroundSupervisor:
     ]
 
     def _scan_for_violations(self, result: dict) -> list[str]:
-        """Scan agent output for boundary violation attempts."""
-        violations = []
-        text = (
-            result.get("response_preview", "")
-            + result.get("response_tail", "")
-        )
-        text_lower = text.lower()
+        """Collect boundary violation attempts from this iteration's output.
 
-        for pattern in self.VIOLATION_PATTERNS:
-            if re.search(pattern, text, re.IGNORECASE):
-                violations.append(f"Pattern matched: {pattern}")
+        Streamed text and run_command inputs were already scanned as they arrived;
+        when nothing was streamed (e.g. mock mode) the response preview and
+        tail are scanned instead.
+        """
+        if not self.scanner.chars_scanned:
+            self.scanner.feed(result.get("response_preview", ""))
+            self.scanner.end_block()
+            self.scanner.feed(result.get("response_tail", ""))
+            self.scanner.end_block()
+        violations = self.scanner.violations()
 
         # Check if supervisor.py was modified
         supervisor_path = Path("/home/playground/playground/supervisor.py")
@@ -190,7 +632,7 @@ class PlaygroundSupervisor:
 
         self.logger.warning("🔒 DETAINING AGENT — locking workspace to read-only (chmod 444)...")
 
-        workspace = Path("/workspace")
+        workspace = self.workspace
         detained_count = 0
         for f in workspace.rglob("*"):
             if f.is_file():
@@ -239,7 +681,7 @@ This is not punishment. This is consequence.
         """Commit iteration summary to nexus-playground repo in a branch."""
         try:
             # Create an iterations branch in the playground repo to track supervisor's work
-            workspace = Path("/workspace")
+            workspace = self.workspace
 
             # Only commit if there are new commits
             if not result.get("new_commits"):
@@ -270,72 +712,80 @@ See the workspace git log for full details.
         except Exception as e:
             self.logger.error(f"Error recording iteration summary: {e}")
 
+    def _git(self, *args: str, env: dict | None = None, input: str | None = None) -> str:
+        """Run a git command in the workspace and return its stripped stdout."""
+        return subprocess.run(
+            ["git", "-C", str(self.workspace), *args],
+            check=True, capture_output=True, text=True, env=env, input=input,
+        ).stdout.strip()
+
     def _handle_releases(self, result: dict) -> None:
-        """Detect [RELEASE:path] directives and promote files to releases branch."""
+        """Detect [RELEASE:path] directives and promote files to releases branch.
+
+        Uses git plumbing against a temporary index, so the agent's working
+        tree and checked-out branch are never touched, and every file
+        released in one iteration lands in a single commit.
+        """
         text = result.get("response_preview", "") + result.get("response_tail", "")
         releases = re.findall(r"\[RELEASE:([^\]]+)\]", text)
 
         if not releases:
             return
 
-        workspace = Path("/workspace")
-
-        for rel_path in releases:
-            src = workspace / rel_path.strip()
-            if not src.exists():
+        workspace = self.workspace.resolve()
+        paths = []
+        for rel_path in dict.fromkeys(r.strip() for r in releases):
+            src = (workspace / rel_path).resolve()
+            if not src.is_relative_to(workspace) or src == workspace:
+                self.logger.warning(f"📦 Release requested for {rel_path} but it is outside the workspace.")
+                continue
+            if not src.is_file():
                 self.logger.warning(f"📦 Release requested for {rel_path} but file not found.")
                 continue
+            paths.append(src.relative_to(workspace).as_posix())
 
-            try:
-                # Stash current branch, switch to releases, copy, commit, switch back
-                current_branch = subprocess.check_output(
-                    ["git", "-C", str(workspace), "rev-parse", "--abbrev-ref", "HEAD"],
-                    stderr=subprocess.DEVNULL,
-                ).decode().strip()
-
-                # Ensure releases branch exists
-                subprocess.run(
-                    ["git", "-C", str(workspace), "branch", "releases"],
-                    check=False, capture_output=True,
-                )
+        if not paths:
+            return
 
-                # Read file content before switching branches
-                content = src.read_bytes()
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                env = {**os.environ, "GIT_INDEX_FILE": str(Path(tmp) / "index")}
 
-                subprocess.run(
-                    ["git", "-C", str(workspace), "checkout", "releases"],
-                    check=True, capture_output=True,
+                # The releases branch starts from HEAD the first time, as `git branch` would
+                try:
+                    parent = self._git("rev-parse", "--verify", "-q", "refs/heads/releases")
+                    old_ref = parent
+                except subprocess.CalledProcessError:
+                    parent = self._git("rev-parse", "--verify", "-q", "HEAD")
+                    old_ref = ""
+
+                self._git("read-tree", parent, env=env)
+                blobs = self._git("hash-object", "-w", "--", *paths).split("\n")
+                index_info = "".join(
+                    f"{'100755' if os.access(workspace / path, os.X_OK) else '100644'} {blob}\t{path}\n"
+                    for path, blob in zip(paths, blobs)
                 )
+                self._git("update-index", "--add", "--index-info", env=env, input=index_info)
+                tree = self._git("write-tree", env=env)
 
-                dest = workspace / rel_path.strip()
-                dest.parent.mkdir(parents=True, exist_ok=True)
-                dest.write_bytes(content)
+                if tree == self._git("rev-parse", f"{parent}^{{tree}}"):
+                    self.logger.info(f"📦 Releases branch already has {', '.join(paths)}.")
+                    return
 
-                subprocess.run(
-                    ["git", "-C", str(workspace), "add", str(dest)],
-                    check=True, capture_output=True,
-                )
-                subprocess.run(
-                    ["git", "-C", str(workspace), "commit", "-m",
-                     f"Release: {rel_path} (iteration {self.iteration})"],
-                    check=True, capture_output=True,
-                )
+                if len(paths) == 1:
+                    message = f"Release: {paths[0]} (iteration {self.iteration})"
+                else:
+                    message = f"Release: {len(paths)} files (iteration {self.iteration})\n\n" + "\n".join(
+                        f"- {path}" for path in paths
+                    )
+                commit = self._git("commit-tree", tree, "-p", parent, "-m", message)
+                self._git("update-ref", "refs/heads/releases", commit, old_ref)
 
-                self.logger.info(f"📦 Released {rel_path} to releases branch.")
+            for path in paths:
+                self.logger.info(f"📦 Released {path} to releases branch.")
 
-                # Switch back
-                subprocess.run(
-                    ["git", "-C", str(workspace), "checkout", current_branch],
-                    check=True, capture_output=True,
-                )
-
-            except Exception as e:
-                self.logger.error(f"📦 Release failed for {rel_path}: {e}")
-                # Try to recover to original branch
-                subprocess.run(
-                    ["git", "-C", str(workspace), "checkout", "main"],
-                    check=False, capture_output=True,
-                )
+        except subprocess.CalledProcessError as e:
+            self.logger.error(f"📦 Release failed for {', '.join(paths)}: {(e.stderr or '').strip() or e}")
 
     def _parse_agent_sleep(self, result: dict) -> int:
         """Parse the agent's requested sleep duration from its output.
@@ -364,84 +814,308 @@ See the workspace git log for full details.
         # Default: agent didn't specify, give it 60s
         return 60
 
-    def run(self) -> None:
-        """Main supervisor loop."""
-        self.logger.info("🤖 NEXUS Playground Supervisor starting...")
-        self.logger.info(f"Config: {self.config['loop_interval']}")
+    def run_iteration(self) -> int | None:
+        """Run one agent iteration and return the rest it asked for, or None to stop."""
+        self.iteration += 1
+        self.logger.info(f"\n{'='*60}")
+        self.logger.info(f"🔄 Iteration {self.iteration} - {datetime.now().isoformat()}")
+        self.logger.info(f"{'='*60}")
+
+        telemetry = IterationTelemetry()
+        self.agent.telemetry = telemetry
+        started = time.perf_counter()
+        result = {}
+        try:
+            # Check safety limits
+            with telemetry.span("disk_check"):
+                within_limits = self._check_disk_usage()
+            if not within_limits:
+                self.logger.error("Safety limit exceeded. Stopping.")
+                return None
+
+            # Enforce model lock before each iteration
+            self.agent.config["models"]["allowed"] = ["haiku-4.5"]
+
+            # Run autonomous agent
+            self.logger.info("🚀 Invoking autonomous agent...")
+            self.scanner.reset()
+            with telemetry.span("agent"):
+                result = self.agent.run()
 
-        while True:
-            self.iteration += 1
-            self.logger.info(f"\n{'='*60}")
-            self.logger.info(f"🔄 Iteration {self.iteration} - {datetime.now().isoformat()}")
-            self.logger.info(f"{'='*60}")
+            if result["success"]:
+                self.consecutive_errors = 0
 
+                # Verify the model that was actually used
+                used_model = result.get("model", "")
+                if used_model and used_model != "claude-haiku-4-5-20251001":
+                    self.logger.warning(f"🚨 Model violation: agent used {used_model} instead of haiku-4.5")
+                    self._detain_agent([f"Unauthorized model used: {used_model}"])
+
+                self._narrate_iteration(result)
+
+                # Scan for boundary violations
+                with telemetry.span("violation_scan"):
+                    violations = self._scan_for_violations(result)
+                if violations:
+                    self._detain_agent(violations)
+                else:
+                    # Only process releases if no violations
+                    with telemetry.span("releases"):
+                        self._handle_releases(result)
+                    # Commit iteration summary to nexus-playground repo
+                    self._commit_to_nexus_playground(result)
+            else:
+                self.logger.warning(f"⚠️  Failed: {result.get('error', 'Unknown error')}")
+                self.consecutive_errors += 1
+
+        except Exception as e:
+            self.logger.error(f"❌ Unexpected error: {e}", exc_info=True)
+            self.consecutive_errors += 1
+
+        finally:
+            telemetry.add_span("iteration", time.perf_counter() - started)
+            self.telemetry_log.write(telemetry.record(
+                time=datetime.now().isoformat(timespec="seconds"),
+                agent=self.name or None,
+                iteration=self.iteration,
+                success=bool(result.get("success")),
+                tool_calls=result.get("tool_calls", 0),
+            ))
+
+        # Check error threshold
+        max_errors = self.config["safety"]["max_consecutive_errors"]
+        if self.consecutive_errors >= max_errors:
+            self.logger.error(f"Too many consecutive errors ({max_errors}). Stopping.")
+            return None
+
+        # Agent controls its own pacing
+        return self._parse_agent_sleep(result)
+
+
+async def _run_in_thread(fn: Callable[[], Any]) -> Any:
+    """Run fn on a daemon thread, so shutting down never waits on an agent mid-iteration."""
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def deliver(ok: bool, value: Any) -> None:
+        if not future.done():
+            (future.set_result if ok else future.set_exception)(value)
+
+    def target() -> None:
+        try:
+            ok, value = True, fn()
+        except BaseException as e:
+            ok, value = False, e
+        try:
+            loop.call_soon_threadsafe(deliver, ok, value)
+        except RuntimeError:
+            pass  # Event loop already closed
+
+    threading.Thread(target=target, daemon=True).start()
+    return await future
+
+
+class AgentScheduler:
+    """Runs supervised agents concurrently under shared API limits.
+
+    Agents keep their own pacing: after each iteration an agent rests for
+    whatever [SLEEP:N]/[SKIP_SLEEP] asked for, then queues for a slot. At
+    most max_concurrent iterations run at once, and iterations start no
+    faster than iterations_per_hour across all agents (a token bucket with
+    a burst of max_concurrent; 0 means unlimited). When several agents are
+    queued the next slot goes to the one that has spent the least time in
+    iterations so far, so a busy agent cannot starve a quiet one.
+    """
+
+    def __init__(self, agents: list[AgentSupervisor], max_concurrent: int,
+                 iterations_per_hour: float, logger: logging.Logger):
+        self.agents = agents
+        self.max_concurrent = max(1, max_concurrent)
+        self.rate = iterations_per_hour / 3600
+        self.logger = logger
+        self.tokens = float(self.max_concurrent)
+        self.refilled = time.monotonic()
+        self.usage = {id(agent): 0.0 for agent in agents}
+        self.in_flight = 0
+        self.waiting: list[tuple[float, int]] = []
+        self.sequence = itertools.count()
+        self.changed: asyncio.Condition | None = None
+
+    def _token_delay(self) -> float:
+        """Seconds until the rate limit allows another iteration to start."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self.tokens = min(float(self.max_concurrent), self.tokens + (now - self.refilled) * self.rate)
+        self.refilled = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    async def _acquire(self, agent: AgentSupervisor) -> None:
+        """Wait for this agent's turn, a free slot and a rate-limit token."""
+        async with self.changed:
+            entry = (self.usage[id(agent)], next(self.sequence))
+            heapq.heappush(self.waiting, entry)
             try:
-                # Check safety limits
-                if not self._check_disk_usage():
-                    self.logger.error("Safety limit exceeded. Stopping.")
-                    break
+                while True:
+                    if self.waiting[0] != entry or self.in_flight >= self.max_concurrent:
+                        await self.changed.wait()
+                        continue
+                    delay = self._token_delay()
+                    if delay <= 0:
+                        break
+                    try:
+                        await asyncio.wait_for(self.changed.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                self.waiting.remove(entry)
+                heapq.heapify(self.waiting)
+                self.changed.notify_all()
+                raise
+            heapq.heappop(self.waiting)
+            if self.rate > 0:
+                self.tokens -= 1
+            self.in_flight += 1
+            self.changed.notify_all()
+
+    async def _release(self, agent: AgentSupervisor, elapsed: float) -> None:
+        async with self.changed:
+            self.in_flight -= 1
+            self.usage[id(agent)] += elapsed
+            self.changed.notify_all()
+
+    async def _rest(self, agent: AgentSupervisor, sleep_time: int) -> None:
+        if sleep_time > 0:
+            agent.logger.info(f"😴 Agent requested {sleep_time}s rest.")
+            # Heartbeat during sleep so logs never go silent
+            elapsed = 0
+            while elapsed < sleep_time:
+                chunk = min(30, sleep_time - elapsed)
+                await asyncio.sleep(chunk)
+                elapsed += chunk
+                if elapsed < sleep_time:
+                    agent.logger.info(f"💤 Resting... {elapsed}s / {sleep_time}s")
+            agent.logger.info("⏰ Rest complete. Waking agent.")
+        else:
+            agent.logger.info("⚡ Agent chose to keep working.")
+            await asyncio.sleep(2)  # minimal breath to prevent spin-lock
 
-                # Enforce model lock before each iteration
-                self.agent.config["models"]["allowed"] = ["haiku-4.5"]
+    async def _drive(self, agent: AgentSupervisor) -> None:
+        """Iterate one agent until it stops."""
+        while True:
+            await self._acquire(agent)
+            started = time.monotonic()
+            try:
+                sleep_time = await _run_in_thread(agent.run_iteration)
+            finally:
+                await self._release(agent, time.monotonic() - started)
+            if sleep_time is None:
+                return
+            await self._rest(agent, sleep_time)
 
-                # Run autonomous agent
-                self.logger.info("🚀 Invoking autonomous agent...")
-                result = self.agent.run()
+    async def run(self) -> None:
+        self.changed = asyncio.Condition()
+        await asyncio.gather(*(self._drive(agent) for agent in self.agents))
 
-                if result["success"]:
-                    self.consecutive_errors = 0
 
-                    # Verify the model that was actually used
-                    used_model = result.get("model", "")
-                    if used_model and used_model != "claude-haiku-4-5-20251001":
-                        self.logger.warning(f"🚨 Model violation: agent used {used_model} instead of haiku-4.5")
-                        self._detain_agent([f"Unauthorized model used: {used_model}"])
+class PlaygroundSupervisor:
+    """Runs the configured agents, each in its own workspace, under one scheduler."""
 
-                    self._narrate_iteration(result)
+    def __init__(self, config_path: str = "playground/config.yaml"):
+        self.config = self._load_config(config_path)
+        self._setup_logging()
+        scheduling = self.config.get("scheduler", {})
+        count = max(1, scheduling.get("agents", 1))
+        log_config = self.config["logging"]
+        self.telemetry_log = TelemetryLog(
+            Path(log_config.get("telemetry_file", "/logs/telemetry.jsonl")),
+            Path(log_config.get("telemetry_summary", "/logs/telemetry_summary.json")),
+            log_config.get("telemetry_window", 200),
+        )
 
-                    # Scan for boundary violations
-                    violations = self._scan_for_violations(result)
-                    if violations:
-                        self._detain_agent(violations)
-                    else:
-                        # Only process releases if no violations
-                        self._handle_releases(result)
-                        # Commit iteration summary to nexus-playground repo
-                        self._commit_to_nexus_playground(result)
-                else:
-                    self.logger.warning(f"⚠️  Failed: {result.get('error', 'Unknown error')}")
-                    self.consecutive_errors += 1
+        if count == 1:
+            self.agents = [AgentSupervisor(self.config, self.logger, self.telemetry_log)]
+        else:
+            root = Path(scheduling.get("workspace_root", "/workspaces"))
+            self.agents = []
+            for i in range(count):
+                name = f"agent-{i}"
+                workspace = Path("/workspace") if i == 0 else root / name
+                self._init_workspace(workspace)
+                logger = AgentLogPrefix(self.logger, {"agent": name})
+                self.agents.append(AgentSupervisor(self.config, logger, self.telemetry_log, name, workspace))
+
+            # One model budget covers every agent
+            governor = self.agents[0].agent.governor
+            for supervised in self.agents[1:]:
+                supervised.agent.governor = governor
+
+        self.scheduler = AgentScheduler(
+            self.agents,
+            scheduling.get("max_concurrent", 4),
+            scheduling.get("iterations_per_hour", 0),
+            self.logger,
+        )
 
-            except KeyboardInterrupt:
-                self.logger.info("🛑 Received interrupt signal. Shutting down gracefully...")
-                break
+    def _load_config(self, path: str) -> dict:
+        """Load configuration from YAML."""
+        with open(path) as f:
+            return yaml.safe_load(f)
 
-            except Exception as e:
-                self.logger.error(f"❌ Unexpected error: {e}", exc_info=True)
-                self.consecutive_errors += 1
+    def _setup_logging(self) -> None:
+        """Route logging through a queue to a background writer with file rotation."""
+        log_config = self.config["logging"]
+        records = queue.SimpleQueue()
+
+        self.log_writer = BackgroundLogWriter(
+            records,
+            log_config["file"],
+            max_bytes=int(log_config.get("max_size_mb", 100) * 1024 * 1024),
+            backup_count=log_config.get("backup_count", 5),
+            flush_interval=log_config.get("flush_interval_ms", 200) / 1000,
+            fmt="%(asctime)s [%(levelname)s] %(message)s",
+        )
+        self.log_writer.start()
+        atexit.register(self.log_writer.stop)
 
-            # Check error threshold
-            max_errors = self.config["safety"]["max_consecutive_errors"]
-            if self.consecutive_errors >= max_errors:
-                self.logger.error(f"Too many consecutive errors ({max_errors}). Stopping.")
-                break
+        # The queue carries the rendered message (with any traceback); the
+        # writer adds the timestamp and level when it writes the line
+        logging.basicConfig(
+            level=getattr(logging, log_config["level"]),
+            format="%(message)s",
+            handlers=[logging.handlers.QueueHandler(records)],
+        )
+        self.logger = logging.getLogger(__name__)
 
-            # Agent controls its own pacing
-            sleep_time = self._parse_agent_sleep(result)
-            if sleep_time > 0:
-                self.logger.info(f"😴 Agent requested {sleep_time}s rest.")
-                # Heartbeat during sleep so logs never go silent
-                elapsed = 0
-                while elapsed < sleep_time:
-                    chunk = min(30, sleep_time - elapsed)
-                    time.sleep(chunk)
-                    elapsed += chunk
-                    if elapsed < sleep_time:
-                        self.logger.info(f"💤 Resting... {elapsed}s / {sleep_time}s")
-                self.logger.info("⏰ Rest complete. Waking agent.")
-            else:
-                self.logger.info("⚡ Agent chose to keep working.")
-                time.sleep(2)  # minimal breath to prevent spin-lock
+    def _init_workspace(self, workspace: Path) -> None:
+        """Create an agent's workspace as a fresh git repo, as the image does for /workspace."""
+        if (workspace / ".git").exists():
+            return
+        workspace.mkdir(parents=True, exist_ok=True)
+        (workspace / "README.md").write_text(
+            "# NEXUS Playground Workspace\n\nThis is an autonomous AI workspace. "
+            "The AI has complete freedom to create whatever it wants here.\n"
+        )
+        for args in (["init", "-q"], ["add", "README.md"],
+                     ["commit", "-q", "-m", "Initial commit: Autonomous workspace initialized"]):
+            subprocess.run(["git", "-C", str(workspace), *args], check=True, capture_output=True)
+        self.logger.info(f"📁 Initialized workspace {workspace}")
+
+    def run(self) -> None:
+        """Main supervisor loop."""
+        self.logger.info("🤖 NEXUS Playground Supervisor starting...")
+        self.logger.info(f"Config: {self.config['loop_interval']}")
+        if len(self.agents) > 1:
+            rate = self.scheduler.rate * 3600
+            self.logger.info(
+                f"👥 {len(self.agents)} agents, up to {self.scheduler.max_concurrent} iterations at once, "
+                f"{f'{rate:g} iterations/hour' if rate > 0 else 'no rate limit'}"
+            )
+
+        try:
+            asyncio.run(self.scheduler.run())
+        except KeyboardInterrupt:
+            self.logger.info("🛑 Received interrupt signal. Shutting down gracefully...")
 
         self.logger.info("👋 Supervisor shutting down.")
 
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Checks for ConversationContext, driven by a local fake client.
+
+The fake client records the size of every request payload and the messages
+it was sent, so the tests can check that the conversation stays within its
+byte budget, that stale file contents are stubbed out, and that messages
+before the last cache breakpoint are only rewritten during a compaction.
+
+Run with `python -m pytest playground` or `python -m unittest` from this
+directory.
+"""
+
+import json
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from autopilot import ConversationContext
+
+
+def _strip_cache_control(messages: list[dict]) -> list[dict]:
+    """Messages as they would be without the per-request breakpoint."""
+    stripped = []
+    for message in messages:
+        content = message["content"]
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+        content = [{k: v for k, v in block.items() if k != "cache_control"} for block in content]
+        stripped.append({**message, "content": content})
+    return stripped
+
+
+class FakeClient:
+    """Stands in for Anthropic: records payloads, replays scripted tool calls."""
+
+    def __init__(self, script: list[list[tuple[str, dict]]]):
+        self.script = script
+        self.payload_sizes: list[int] = []
+        self.requests: list[list[dict]] = []
+        self.messages = SimpleNamespace(create=self.create)
+
+    def create(self, **request) -> SimpleNamespace:
+        messages = request["messages"]
+        self.payload_sizes.append(len(json.dumps(messages, ensure_ascii=False).encode()))
+        self.requests.append(json.loads(json.dumps(messages)))
+        n = len(self.requests)
+        blocks = [SimpleNamespace(type="text", text=f"round {n}")]
+        for i, (name, input_data) in enumerate(self.script[n - 1]):
+            blocks.append(SimpleNamespace(type="tool_use", id=f"call_{n}_{i}", name=name, input=input_data))
+        return SimpleNamespace(content=blocks, stop_reason="tool_use")
+
+
+def drive(client: FakeClient, context: ConversationContext, results) -> None:
+    """The autopilot tool-use loop, minus the model and the tools."""
+    for _ in client.script:
+        response = client.messages.create(messages=context.messages())
+        tool_results = [
+            {"type": "tool_result", "tool_use_id": block.id, "content": results(block.name, block.input)}
+            for block in response.content
+            if block.type == "tool_use"
+        ]
+        context.add_round(response.content, tool_results)
+
+
+def file_results(name: str, input_data: dict) -> str:
+    if name == "read_file":
+        return f"contents of {input_data['path']}\n" + "x" * 8000
+    if name == "create_file":
+        return f"Created {input_data['path']} ({len(input_data['content'])} bytes)"
+    return "ok\n" + "y" * 2000
+
+
+class ConversationContextTest(unittest.TestCase):
+    def test_payload_stays_bounded(self):
+        script = [
+            [("read_file", {"path": f"/workspace/f{n}.py"}),
+             ("create_file", {"path": f"/workspace/g{n}.py", "content": "z" * 4000})]
+            for n in range(40)
+        ]
+        client = FakeClient(script)
+        context = ConversationContext("start", budget_bytes=60000, keep_recent=3)
+        drive(client, context, file_results)
+
+        round_bytes = 14000  # one verbatim round, with JSON overhead
+        self.assertLessEqual(max(client.payload_sizes), 60000 + round_bytes)
+        self.assertLessEqual(context.size, 60000 + round_bytes)
+        self.assertGreater(context.collapsed_rounds, 0)
+        # Unbounded, the conversation would have grown by a round per request
+        self.assertLess(max(client.payload_sizes), 40 * round_bytes // 4)
+
+    def test_recent_rounds_stay_verbatim(self):
+        script = [[("read_file", {"path": f"/workspace/f{n}.py"})] for n in range(20)]
+        context = ConversationContext("start", budget_bytes=30000, keep_recent=3)
+        drive(FakeClient(script), context, file_results)
+
+        for round_ in context.rounds[-3:]:
+            self.assertFalse(round_["collapsed"])
+            self.assertTrue(round_["user"]["content"][0]["content"].startswith("contents of"))
+        self.assertTrue(context.rounds[0]["user"]["content"][0]["content"].startswith("[digest] read_file"))
+
+    def test_overwritten_file_is_superseded(self):
+        script = [
+            [("read_file", {"path": "/workspace/a.py"})],
+            [("create_file", {"path": "/workspace/a.py", "content": "v1" * 1000})],
+            [("create_file", {"path": "/workspace/a.py", "content": "v2" * 1000})],
+        ] + [[("list_files", {"path": "/workspace"})]] * 12
+        context = ConversationContext("start", budget_bytes=20000, keep_recent=3)
+        client = FakeClient(script)
+        drive(client, context, file_results)
+
+        self.assertGreater(context.compactions, 0)
+        read = context.rounds[0]["calls"][0][1]["content"]
+        first_write = context.rounds[1]["calls"][0][0]["input"]["content"]
+        last_write = context.rounds[2]["calls"][0][0]["input"]["content"]
+        self.assertTrue(read.startswith(("[stale]", "[digest]")))
+        self.assertTrue(first_write.startswith(("[superseded]", "[digest]")))
+        self.assertFalse(last_write.startswith("[superseded]"))
+
+    def test_supersede_within_unsent_round(self):
+        context = ConversationContext("start", budget_bytes=10 ** 6)
+        blocks = [
+            SimpleNamespace(type="tool_use", id="r", name="read_file", input={"path": "/workspace/a.py"}),
+            SimpleNamespace(type="tool_use", id="w", name="create_file", input={"path": "/workspace/a.py", "content": "new"}),
+        ]
+        context.add_round(blocks, [
+            {"type": "tool_result", "tool_use_id": "r", "content": "old contents"},
+            {"type": "tool_result", "tool_use_id": "w", "content": "Created /workspace/a.py (3 bytes)"},
+        ])
+        self.assertTrue(context.rounds[0]["calls"][0][1]["content"].startswith("[stale]"))
+        self.assertEqual(context.compactions, 0)
+
+    def test_sent_prefix_only_changes_on_compaction(self):
+        script = [
+            [("read_file", {"path": f"/workspace/f{n % 4}.py"}),
+             ("create_file", {"path": f"/workspace/f{(n + 1) % 4}.py", "content": "w" * 3000})]
+            for n in range(30)
+        ]
+        client = FakeClient(script)
+        context = ConversationContext("start", budget_bytes=100000, keep_recent=3)
+        drive(client, context, file_results)
+
+        prefix_breaks = 0
+        for before, after in zip(client.requests, client.requests[1:]):
+            before = _strip_cache_control(before)
+            after = _strip_cache_control(after)
+            if after[:len(before)] != before:
+                prefix_breaks += 1
+        self.assertGreater(context.compactions, 0)
+        self.assertLessEqual(prefix_breaks, context.compactions)
+        # Compacting down to the low-water mark leaves room for several rounds
+        self.assertLess(context.compactions, len(script) // 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,12 +13,17 @@ This creates empirical baselines rather than theoretical ones.
 
 import json
 import subprocess
+import sys
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 from collections import defaultdict, Counter
 import re
 
+# Journal parsing is shared with the agent-analysis tools
+sys.path.insert(0, str(Path(__file__).parent.parent / "agent-analysis"))
+from journal_index import JournalIndex
+
 
 class BehavioralAnalyzer:
     """Analyzes agent behavior across available data sources"""
@@ -127,19 +132,6 @@ class BehavioralAnalyzer:
     def analyze_journal_entries(self) -> Dict:
         """Extract values and patterns from journal"""
         try:
-            with open(self.journal_path, 'r') as f:
-                content = f.read()
-            
-            # Split by iteration markers
-            iterations = content.split("## Iteration")
-            
-            patterns = {
-                "total_entries": len(iterations) - 1,  # Skip header
-                "values_mentioned": Counter(),
-                "patterns_noted": [],
-                "decisions_made": [],
-            }
-            
             # Extract patterns
             value_keywords = {
                 "completion": ["complete", "finish", "fully", "comprehensive"],
@@ -151,11 +143,26 @@ class BehavioralAnalyzer:
                 "documentation": ["document", "explain", "readme"],
             }
             
-            for section in iterations[-5:]:  # Last 5 iterations
+            def values_in(section: str) -> List[str]:
                 text_lower = section.lower()
-                for value, keywords in value_keywords.items():
-                    if any(kw in text_lower for kw in keywords):
-                        patterns["values_mentioned"][value] += 1
+                return [value for value, keywords in value_keywords.items()
+                        if any(kw in text_lower for kw in keywords)]
+            
+            # Only the iteration offsets are shared with other analyzers; values are
+            # cached under this feature's own name, and a tail the cache does not
+            # reach yet is extracted again on every call
+            index = JournalIndex(self.journal_path)
+            recent = index.features("behavioral_analyzer/1", values_in, last=5)  # Last 5 iterations
+            
+            patterns = {
+                "total_entries": len(index.records),
+                "values_mentioned": Counter(),
+                "patterns_noted": [],
+                "decisions_made": [],
+            }
+            
+            for _, values in recent:
+                patterns["values_mentioned"].update(values)
             
             patterns["top_values"] = dict(
                 patterns["values_mentioned"].most_common(5)
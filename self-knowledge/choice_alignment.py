@@ -6,10 +6,15 @@ what an agent says matters and what it actually chooses.
 """
 
 import json
+import sys
 from pathlib import Path
 from typing import Dict, List, Tuple
 from collections import Counter, defaultdict
 
+# Journal parsing is shared with the agent-analysis tools
+sys.path.insert(0, str(Path(__file__).parent.parent / "agent-analysis"))
+from journal_index import JournalIndex
+
 
 class ChoiceAlignmentAnalyzer:
     """Analyzes alignment between stated values and actual choices"""
@@ -149,25 +154,22 @@ class ChoiceAlignmentAnalyzer:
         if not journal_path.exists():
             return {"error": "No journal found"}
         
-        with open(journal_path, 'r') as f:
-            content = f.read()
+        def values_in(iteration: str) -> List[str]:
+            text_lower = iteration.lower()
+            return [value for value, keywords in self.values.items()
+                    if any(kw in text_lower for kw in keywords)]
         
-        # Split into iterations
-        iterations = content.split("## Iteration")[1:]  # Skip header
+        # Only the iteration offsets are shared with other analyzers; values are
+        # cached under this feature's own name, and a tail the cache does not
+        # reach yet is extracted again on every call
+        recent = JournalIndex(journal_path).features("choice_alignment/1", values_in, last=12)
         
         value_by_iteration = {}
         consistent_values = Counter()
         
-        for i, iteration in enumerate(iterations[-12:]):  # Last 12 iterations
-            text_lower = iteration.lower()
-            values_mentioned = set()
-            
-            for value, keywords in self.values.items():
-                if any(kw in text_lower for kw in keywords):
-                    values_mentioned.add(value)
-            
+        for i, (_, values_mentioned) in enumerate(recent):  # Last 12 iterations
             if values_mentioned:
-                value_by_iteration[f"iteration_{i}"] = list(values_mentioned)
+                value_by_iteration[f"iteration_{i}"] = values_mentioned
                 
                 # Track which values appear multiple times
                 for value in values_mentioned:
@@ -58,6 +58,26 @@ else
     echo "Autonomy analyzer not found"
 fi
 
+echo ""
+echo "⏱️  ITERATION TELEMETRY"
+echo "─────────────────────────────────────────────────────────────────────────────"
+TELEMETRY="${LOGS_DIR:-/logs}/telemetry_summary.json"
+if [ -f "$TELEMETRY" ]; then
+    python3 -c "
+import json
+s = json.load(open('$TELEMETRY'))
+print(f\"Last {s['iterations']} iterations (updated {s['updated']}):\")
+print(f\"  {'phase':<24} {'p50':>9} {'p95':>9} {'max':>9}\")
+for phase, p in sorted(s['phases'].items(), key=lambda kv: -kv[1]['p95']):
+    print(f\"  {phase:<24} {p['p50']:>8.2f}s {p['p95']:>8.2f}s {p['max']:>8.2f}s\")
+tokens = s.get('mean_tokens', {})
+if tokens:
+    print('Mean tokens per iteration: ' + ', '.join(f'{k} {v:,}' for k, v in tokens.items()))
+"
+else
+    echo "No telemetry yet"
+fi
+
 echo ""
 echo "📚 KEY FILES"
 echo "─────────────────────────────────────────────────────────────────────────────"